@@ -4,12 +4,13 @@ from .models import CustomUser
 
 class CustomUserAdmin(UserAdmin):
     model = CustomUser
-    list_display = ['username', 'email', 'first_name', 'last_name', 'role', 'is_approved', 'is_staff']
+    list_display = ['username', 'email', 'first_name', 'last_name', 'role', 'school', 'is_approved', 'is_staff']
+    list_filter = UserAdmin.list_filter + ('school',)
     fieldsets = UserAdmin.fieldsets + (
-        (None, {'fields': ('role', 'is_approved')}),
+        (None, {'fields': ('role', 'is_approved', 'school')}),
     )
     add_fieldsets = UserAdmin.add_fieldsets + (
-        (None, {'fields': ('role', 'is_approved')}),
+        (None, {'fields': ('role', 'is_approved', 'school')}),
     )
 
 admin.site.register(CustomUser, CustomUserAdmin)
\ No newline at end of file
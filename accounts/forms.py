@@ -3,6 +3,8 @@ from django.contrib.auth import get_user_model
 from django import forms
 
 from accounts.models import CustomUser
+from core.models import School
+from core.tenancy import current_school
 
 class TeacherRegistrationForm(UserCreationForm):
     """
@@ -12,10 +14,19 @@ class TeacherRegistrationForm(UserCreationForm):
     """
     class Meta(UserCreationForm.Meta):
         model = get_user_model()
-        fields = ('username', 'first_name', 'last_name', 'email')
+        fields = ('username', 'first_name', 'last_name', 'email', 'school')
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+
+        # สมัครผ่านโดเมนของโรงเรียน: เป็นครูของโรงเรียนนั้น ไม่ต้องเลือก
+        # ไม่มีโรงเรียนในระบบเลย (ใช้งานโรงเรียนเดียว): ไม่ต้องเลือกเช่นกัน
+        if current_school() is not None or not School.objects.exists():
+            del self.fields['school']
+        else:
+            self.fields['school'].required = True
+            self.fields['school'].empty_label = 'เลือกโรงเรียน'
+            self.fields['school'].widget.attrs['class'] = 'w-full px-3 py-2 border border-gray-300 rounded-md shadow-sm focus:outline-none focus:ring-blue-500 focus:border-blue-500'
         
         # Define placeholders and classes for each field to be styled
         placeholders = {
@@ -43,6 +54,15 @@ class TeacherRegistrationForm(UserCreationForm):
         self.fields['password2'].widget.attrs['placeholder'] = 'ยืนยันรหัสผ่านอีกครั้ง'
         self.fields['password2'].widget.attrs['class'] = widget_class
 
+    def save(self, commit=True):
+        user = super().save(commit=False)
+        if 'school' not in self.fields:
+            user.school = current_school()
+        if commit:
+            user.save()
+            self.save_m2m()
+        return user
+
 class LoginForm(AuthenticationForm):
     """
     A custom login form that uses styled widgets for username and password fields.
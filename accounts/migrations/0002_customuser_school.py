@@ -0,0 +1,29 @@
+# Generated by Django 5.0.6 on 2026-10-19 15:17
+
+import accounts.models
+import django.contrib.auth.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('core', '0002_schools'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='customuser',
+            managers=[
+                ('objects', accounts.models.CustomUserManager()),
+                ('unscoped', django.contrib.auth.models.UserManager()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='school',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='users', to='core.school', verbose_name='โรงเรียน'),
+        ),
+    ]
@@ -1,6 +1,11 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
 
+from core.tenancy import TenantManager
+
+class CustomUserManager(TenantManager, UserManager):
+    """UserManager that only returns the current school's users (see core.tenancy)."""
+
 # Create your models here.
 class CustomUser(AbstractUser):
     class Role(models.TextChoices):
@@ -8,4 +13,12 @@ class CustomUser(AbstractUser):
         TEACHER = 'TEACHER', 'Teacher'
 
     role = models.CharField(max_length=50, choices=Role.choices, default=Role.TEACHER)
-    is_approved = models.BooleanField(default=False, help_text="Designates whether the teacher is approved by an admin.")
\ No newline at end of file
+    is_approved = models.BooleanField(default=False, help_text="Designates whether the teacher is approved by an admin.")
+    # ไม่มี FK constraint เหมือน core.models.TenantModel; ผู้ใช้ที่ไม่มีโรงเรียนเห็นข้อมูลทุกโรงเรียน
+    school = models.ForeignKey(
+        'core.School', on_delete=models.SET_NULL, null=True, blank=True, db_constraint=False,
+        related_name='users', verbose_name="โรงเรียน",
+    )
+
+    objects = CustomUserManager()
+    unscoped = UserManager()
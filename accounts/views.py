@@ -1,6 +1,4 @@
 from django.http import Http404
-from multiprocessing import context
-from pyexpat.errors import messages
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout, views as auth_views
 from django.views.generic import CreateView
@@ -1,5 +1,14 @@
 from django.contrib import admin
-from .models import LearningArea, SubjectTemplate, GradeLevel, Course, LearningUnit
+from .models import LearningArea, SubjectTemplate, GradeLevel, Course, LearningUnit, School
+
+@admin.register(School)
+class SchoolAdmin(admin.ModelAdmin):
+    """
+    Admin interface for School model (tenants, see core.tenancy).
+    """
+    list_display = ('name', 'code', 'domain', 'database')
+    search_fields = ('name', 'code', 'domain')
+    prepopulated_fields = {'code': ('name',)}
 
 @admin.register(LearningArea)
 class LearningAreaAdmin(admin.ModelAdmin):
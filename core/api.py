@@ -0,0 +1,190 @@
+"""
+Async read-only JSON API (AJAX lookups of the teacher pages).
+
+These views are ``async def`` and use the async ORM and cache API, so under
+an ASGI server (see ``exam_bank_project/asgi.py``) a dropdown change is a
+coroutine on the event loop instead of a blocked worker. Every lookup is
+cache-first; the caches are versioned per namespace (``core.lookup_cache``)
+and invalidated by ``core.signals`` when the data changes.
+"""
+from functools import wraps
+
+from django.core.cache import cache
+from django.db.models import Case, Count, Value, When
+from django.http import JsonResponse
+
+from exam_management.models import Question
+from .lookup_cache import LOOKUP_CACHE_TIMEOUT, aget_version, lookup_key, question_namespace, units_namespace
+from .models import LearningArea, SubjectTemplate, GradeLevel, LearningUnit, Course
+from .tenancy import current_school_id
+
+MAX_UNITS_PER_REQUEST = 100
+
+# ช่วงความยากเดียวกับที่ใช้ในการสุ่มข้อสอบอัตโนมัติและตัวกรองคลังข้อสอบ
+DIFFICULTY_BANDS = ('EASY', 'MEDIUM', 'HARD')
+DIFFICULTY_BAND = Case(
+    When(difficulty_level__gte=0.70, then=Value('EASY')),
+    When(difficulty_level__gte=0.30, then=Value('MEDIUM')),
+    default=Value('HARD'),
+)
+
+# ==============================================================================
+# Helpers
+# ==============================================================================
+
+def api_login_required(view):
+    """Async counterpart of ``login_required`` that answers 401 JSON instead of redirecting."""
+    @wraps(view)
+    async def wrap(request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated or not (user.role == 'ADMIN' or user.is_approved):
+            return JsonResponse({'error': 'authentication required'}, status=401)
+        return await view(request, user, *args, **kwargs)
+    return wrap
+
+
+async def _cached(key, build):
+    value = await cache.aget(key)
+    if value is None:
+        value = await build()
+        await cache.aset(key, value, LOOKUP_CACHE_TIMEOUT)
+    return value
+
+
+async def cached_learning_units(course_id):
+    """``{"teacher_id", "units"}`` of a course, cached until a unit or course of the current school changes."""
+    async def build():
+        teacher_id = await Course.objects.filter(pk=course_id).values_list('teacher_id', flat=True).afirst()
+        units = [unit async for unit in LearningUnit.objects.filter(course_id=course_id).values('id', 'unit_name')]
+        return {'teacher_id': teacher_id, 'units': units}
+
+    namespace = units_namespace(current_school_id())
+    version = await aget_version(namespace)
+    return await _cached(lookup_key(namespace, version, course_id), build)
+
+
+async def cached_taxonomy():
+    async def build():
+        return {
+            'learning_areas': [row async for row in LearningArea.objects.values('id', 'area_name')],
+            'subject_templates': [
+                row async for row in SubjectTemplate.objects.values('id', 'subject_name', 'learning_area_id')
+            ],
+            'grade_levels': [row async for row in GradeLevel.objects.values('id', 'grade_name')],
+        }
+
+    version = await aget_version('taxonomy')
+    return await _cached(lookup_key('taxonomy', version), build)
+
+
+def _int_list(values):
+    ids = []
+    for value in values:
+        for part in value.split(','):
+            if part.strip().isdigit():
+                ids.append(int(part))
+    return sorted(set(ids))
+
+# ==============================================================================
+# Endpoints
+# ==============================================================================
+
+@api_login_required
+async def learning_units_api(request, user):
+    """
+    ``?course_id=<id>`` -> ``[{"id", "unit_name"}, ...]``.
+    Used in the "Auto Generate Exam" form.
+    """
+    course_id = request.GET.get('course_id', '')
+    if not course_id.isdigit():
+        return JsonResponse([], safe=False)
+
+    data = await cached_learning_units(course_id)
+    if data['teacher_id'] is None or (user.role != 'ADMIN' and data['teacher_id'] != user.pk):
+        return JsonResponse([], safe=False)
+    return JsonResponse(data['units'], safe=False)
+
+
+@api_login_required
+async def question_counts_api(request, user):
+    """
+    ``?unit=<id>&unit=<id>`` (or ``?unit=1,2``) -> the user's question counts
+    per difficulty band: ``{"<unit id>": {"EASY": n, "MEDIUM": n, "HARD": n}}``.
+    One grouped query per cache miss.
+    """
+    unit_ids = _int_list(request.GET.getlist('unit'))[:MAX_UNITS_PER_REQUEST]
+    if not unit_ids:
+        return JsonResponse({})
+
+    async def build():
+        counts = {str(unit_id): dict.fromkeys(DIFFICULTY_BANDS, 0) for unit_id in unit_ids}
+        rows = (
+            Question.objects.filter(created_by_id=user.pk, learning_unit_id__in=unit_ids)
+            .annotate(band=DIFFICULTY_BAND)
+            .values('learning_unit_id', 'band')
+            .annotate(total=Count('id'))
+            .order_by()
+        )
+        async for row in rows:
+            counts[str(row['learning_unit_id'])][row['band']] = row['total']
+        return counts
+
+    namespace = question_namespace(user.pk)
+    version = await aget_version(namespace)
+    key = lookup_key(namespace, version, 'bands', ','.join(map(str, unit_ids)))
+    return JsonResponse(await _cached(key, build))
+
+
+@api_login_required
+async def question_availability_api(request, user):
+    """
+    ``?course_id=<id>&unit=<id>,<id>`` -> how many of the user's questions in
+    those units of the course are available per difficulty band and Bloom
+    level, so the auto-generate form can show capacity before submitting::
+
+        {"total": n, "bands": {"EASY": n, ...}, "blooms": {"REMEMBER": n, ...},
+         "matrix": {"EASY": {"REMEMBER": n, ...}, ...},
+         "bloom_levels": [["REMEMBER", "<label>"], ...]}
+
+    One grouped query per cache miss; cached per teacher and invalidated
+    when any of their questions is saved or deleted.
+    """
+    course_id = request.GET.get('course_id', '')
+    unit_ids = _int_list(request.GET.getlist('unit'))[:MAX_UNITS_PER_REQUEST]
+    blooms = [value for value, _ in Question.BloomLevel.choices]
+
+    async def build():
+        matrix = {band: dict.fromkeys(blooms, 0) for band in DIFFICULTY_BANDS}
+        if course_id.isdigit() and unit_ids:
+            rows = (
+                Question.objects.filter(
+                    created_by_id=user.pk,
+                    learning_unit_id__in=unit_ids,
+                    learning_unit__course_id=course_id,
+                    learning_unit__course__teacher_id=user.pk,
+                )
+                .annotate(band=DIFFICULTY_BAND)
+                .values('band', 'bloom_level')
+                .annotate(total=Count('id'))
+                .order_by()
+            )
+            async for row in rows:
+                matrix[row['band']][row['bloom_level']] = row['total']
+        return {
+            'total': sum(sum(counts.values()) for counts in matrix.values()),
+            'bands': {band: sum(counts.values()) for band, counts in matrix.items()},
+            'blooms': {bloom: sum(matrix[band][bloom] for band in DIFFICULTY_BANDS) for bloom in blooms},
+            'matrix': matrix,
+            'bloom_levels': [[value, str(label)] for value, label in Question.BloomLevel.choices],
+        }
+
+    namespace = question_namespace(user.pk)
+    version = await aget_version(namespace)
+    key = lookup_key(namespace, version, 'availability', course_id, ','.join(map(str, unit_ids)))
+    return JsonResponse(await _cached(key, build))
+
+
+@api_login_required
+async def taxonomy_api(request, user):
+    """Learning areas, subject templates and grade levels, for dropdowns."""
+    return JsonResponse(await cached_taxonomy())
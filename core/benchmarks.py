@@ -0,0 +1,221 @@
+"""
+Hot-path benchmark scenarios used by ``manage.py benchmark_hot_paths``.
+
+Each scenario is a function registered with ``@scenario(name)`` that receives a
+BenchmarkContext and performs ONE timed iteration. Optional setup/teardown
+hooks run outside the timed section. Data comes from ``manage.py seed_exam_bank``.
+"""
+import time
+import statistics
+from dataclasses import dataclass, field
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import CustomUser
+from core.models import Course
+from exam_management.models import Exam, Question
+
+SCENARIOS = {}
+
+
+def scenario(name, setup=None, teardown=None):
+    """Registers a benchmark scenario under ``name``."""
+    def decorator(func):
+        SCENARIOS[name] = {'run': func, 'setup': setup, 'teardown': teardown, 'doc': (func.__doc__ or '').strip()}
+        return func
+    return decorator
+
+
+@dataclass
+class BenchmarkContext:
+    teacher: CustomUser
+    admin: CustomUser
+    course: Course
+    exam: Exam
+    teacher_client: Client = field(default_factory=Client)
+    admin_client: Client = field(default_factory=Client)
+    state: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_seeded_data(cls):
+        teacher = (
+            CustomUser.objects.filter(role='TEACHER', username__startswith='bench_')
+            .order_by('username').first()
+        )
+        admin = CustomUser.objects.filter(role='ADMIN', username__startswith='bench_').first()
+        if teacher is None or admin is None:
+            raise LookupError('No seeded data found. Run "manage.py seed_exam_bank" first.')
+        course = Course.objects.filter(teacher=teacher).order_by('course_code').first()
+        exam = Exam.objects.filter(created_by=teacher).order_by('id').first()
+        context = cls(teacher=teacher, admin=admin, course=course, exam=exam)
+        context.teacher_client.force_login(teacher)
+        context.admin_client.force_login(admin)
+        return context
+
+
+def run_scenario(name, context, iterations, warmup=1):
+    """Runs one scenario and returns timing statistics in milliseconds."""
+    spec = SCENARIOS[name]
+    if spec['setup']:
+        spec['setup'](context)
+    try:
+        for _ in range(warmup):
+            spec['run'](context)
+        timings, query_counts = [], []
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                spec['run'](context)
+                timings.append((time.perf_counter() - started) * 1000)
+            query_counts.append(len(queries))
+    finally:
+        if spec['teardown']:
+            spec['teardown'](context)
+
+    timings.sort()
+    return {
+        'iterations': iterations,
+        'min_ms': round(timings[0], 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        'max_ms': round(timings[-1], 3),
+        'queries': max(query_counts),
+    }
+
+
+def _get(client, url, **params):
+    response = client.get(url, params)
+    assert response.status_code == 200, f'{url} returned {response.status_code}'
+    if response.streaming:
+        b''.join(response.streaming_content)
+    return response
+
+# ==============================================================================
+# Scenarios
+# ==============================================================================
+
+@scenario('question_list')
+def bench_question_list(ctx):
+    """Teacher question bank, no filters."""
+    _get(ctx.teacher_client, '/teacher/questions/')
+
+
+@scenario('question_list_filtered')
+def bench_question_list_filtered(ctx):
+    """Teacher question bank filtered by course search and difficulty."""
+    _get(ctx.teacher_client, '/teacher/questions/', course_search=ctx.course.course_code, difficulty='MEDIUM')
+
+
+def _remember_exam_ids(ctx):
+    ctx.state['exam_ids'] = set(Exam.objects.filter(created_by=ctx.teacher).values_list('id', flat=True))
+
+
+def _delete_generated_exams(ctx):
+    Exam.objects.filter(created_by=ctx.teacher).exclude(id__in=ctx.state.pop('exam_ids', set())).delete()
+
+
+@scenario('create_exam_auto', setup=_remember_exam_ids, teardown=_delete_generated_exams)
+def bench_create_exam_auto(ctx):
+    """Auto-generate a 30-question exam from every unit of one course."""
+    unit_ids = list(ctx.course.units.values_list('id', flat=True))
+    response = ctx.teacher_client.post('/exam/create/auto/', {
+        'exam_name': 'benchmark', 'course': ctx.course.pk, 'learning_units': unit_ids,
+        'num_easy': 10, 'num_medium': 10, 'num_hard': 10,
+    })
+    assert response.status_code == 302, f'create_exam_auto returned {response.status_code}'
+
+
+@scenario('exam_detail')
+def bench_exam_detail(ctx):
+    """Exam detail page with all questions and choices."""
+    _get(ctx.teacher_client, f'/exam/{ctx.exam.pk}/')
+
+
+@scenario('export_pdf')
+def bench_export_pdf(ctx):
+    """PDF export of one seeded exam."""
+    _get(ctx.teacher_client, f'/exam/{ctx.exam.pk}/export/pdf/')
+
+
+@scenario('export_word')
+def bench_export_word(ctx):
+    """Word export of one seeded exam."""
+    _get(ctx.teacher_client, f'/exam/{ctx.exam.pk}/export/word/')
+
+
+LARGE_EXAM_QUESTIONS = 300
+
+
+def _create_large_exam(ctx):
+    """One exam with the teacher's first LARGE_EXAM_QUESTIONS questions, images first, published."""
+    from exam_management.snapshots import publish_exam
+
+    questions = list(
+        Question.objects.filter(created_by=ctx.teacher)
+        .order_by('-image', 'id').values_list('id', flat=True)[:LARGE_EXAM_QUESTIONS]
+    )
+    exam = Exam.objects.create(exam_name='benchmark large', course=ctx.course, created_by=ctx.teacher)
+    exam.questions.set(questions)
+    publish_exam(exam)
+    ctx.state['large_exam'] = exam
+
+
+def _delete_large_exam(ctx):
+    ctx.state.pop('large_exam').delete()
+
+
+@scenario('export_word_large', setup=_create_large_exam, teardown=_delete_large_exam)
+def bench_export_word_large(ctx):
+    """Word export of a 300-question exam (questions with images included)."""
+    _get(ctx.teacher_client, f"/exam/{ctx.state['large_exam'].pk}/export/word/")
+
+
+@scenario('export_pdf_large', setup=_create_large_exam, teardown=_delete_large_exam)
+def bench_export_pdf_large(ctx):
+    """PDF export (default layout) of a 300-question exam (questions with images included)."""
+    _get(ctx.teacher_client, f"/exam/{ctx.state['large_exam'].pk}/export/pdf/")
+
+
+@scenario('survey_results')
+def bench_survey_results(ctx):
+    """Admin survey results dashboard."""
+    _get(ctx.admin_client, '/admin/surveys/')
+
+
+@scenario('usage_log')
+def bench_usage_log(ctx):
+    """Admin usage log, first page."""
+    _get(ctx.admin_client, '/admin/logs/')
+
+
+@scenario('usage_log_filtered')
+def bench_usage_log_filtered(ctx):
+    """Admin usage log filtered by one user."""
+    _get(ctx.admin_client, '/admin/logs/', user=ctx.teacher.pk)
+
+
+@scenario('export_logs_excel')
+def bench_export_logs_excel(ctx):
+    """Excel export of one teacher's usage logs."""
+    _get(ctx.admin_client, '/admin/logs/export/excel/', user=ctx.teacher.pk)
+
+
+@scenario('export_surveys_excel')
+def bench_export_surveys_excel(ctx):
+    """Excel export of every survey response."""
+    _get(ctx.admin_client, '/admin/surveys/export/excel/')
+
+
+def dataset_summary():
+    """Row counts stored with the results so runs on different data are not compared by mistake."""
+    from feedback.models import UsageLog, SurveyResponse
+    return {
+        'questions': Question.objects.count(),
+        'exams': Exam.objects.count(),
+        'courses': Course.objects.count(),
+        'usage_logs': UsageLog.objects.count(),
+        'survey_responses': SurveyResponse.objects.count(),
+    }
@@ -0,0 +1,7 @@
+"""
+PostgreSQL database backend with an in-process connection pool.
+
+Enabled by ``DB_POOL_MAX_SIZE`` in the settings: ``ENGINE`` becomes
+``core.db_pool`` and ``OPTIONS['pool']`` holds the pool options (see
+``core.db_pool.pool.ConnectionPool``).
+"""
@@ -0,0 +1,240 @@
+"""
+A small thread-safe connection pool.
+
+Django opens a connection per thread and, with ``CONN_MAX_AGE = 0``, closes
+it at the end of every request. With this pool "closing" returns the
+connection, and the next request (of any thread of the process) takes it
+back instead of paying a new connection and TLS handshake. At most
+``max_size`` connections are open per process, so a burst of requests waits
+up to ``timeout`` seconds for a free connection instead of exhausting the
+server's ``max_connections``.
+
+* Health: a connection idle longer than ``check_after`` seconds is checked
+  before it is handed out; a broken one is replaced transparently.
+* Recycling: connections idle longer than ``max_idle`` or older than
+  ``max_lifetime`` seconds are closed.
+* Instrumentation: ``stats()`` counts checkouts, waits, wait time and
+  timeouts; waits longer than ``slow_wait`` seconds are logged.
+
+Pools are per process: after a fork (gunicorn ``--preload``) the child starts
+with empty pools and never touches the parent's sockets.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, name, max_size=10, timeout=10.0, max_idle=600.0, max_lifetime=3600.0,
+                 check_after=30.0, slow_wait=0.5):
+        self.name = name
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check_after = check_after
+        self.slow_wait = slow_wait
+
+        self._condition = threading.Condition()
+        self._idle = deque()  # (connection, created_at, returned_at); ขวาสุดคือตัวที่เพิ่งคืนมา
+        self._created_at = {}
+        self._size = 0
+        self._counters = dict.fromkeys(
+            ('checkouts', 'waits', 'timeouts', 'created', 'closed', 'failed_checks'), 0,
+        )
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    # --------------------------------------------------------------------------
+    # Checkout / return
+    # --------------------------------------------------------------------------
+
+    def getconn(self, connect, check=None):
+        """
+        A connection from the pool, or a new one from ``connect()`` while fewer
+        than ``max_size`` are open. ``check(connection)`` must return False
+        for a broken connection. Raises PoolTimeout after ``timeout`` seconds.
+        """
+        started = time.monotonic()
+        deadline = started + self.timeout
+        waited = False
+        while True:
+            connection, returned_at = None, None
+            with self._condition:
+                while True:
+                    connection, returned_at = self._take_idle()
+                    if connection is not None:
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counters['timeouts'] += 1
+                        self._wait_max = max(self._wait_max, time.monotonic() - started)
+                        raise PoolTimeout(
+                            f'No free database connection in pool "{self.name}" '
+                            f'after {self.timeout:g}s ({self.max_size} in use)'
+                        )
+                    waited = True
+                    self._condition.wait(remaining)
+
+            if connection is None:
+                connection = self._open(connect)
+            elif check and time.monotonic() - returned_at > self.check_after and not self._healthy(connection, check):
+                self._discard(connection)
+                continue
+
+            wait = time.monotonic() - started
+            with self._condition:
+                self._counters['checkouts'] += 1
+                if waited:
+                    self._counters['waits'] += 1
+                self._record_wait(wait)
+            if wait > self.slow_wait:
+                logger.warning('Waited %.0f ms for a connection from pool "%s"', wait * 1000, self.name)
+            return connection
+
+    def putconn(self, connection, reset=None):
+        """
+        Returns ``connection`` to the pool. ``reset(connection)`` must bring it
+        back to a clean state (no open transaction) or return False to have
+        it closed instead.
+        """
+        created_at = self._created_at.get(id(connection), 0)
+        reusable = not getattr(connection, 'closed', False) and time.monotonic() - created_at < self.max_lifetime
+        if reusable and reset is not None:
+            try:
+                reusable = reset(connection) is not False
+            except Exception:
+                reusable = False
+        if not reusable:
+            self._discard(connection)
+            return
+        with self._condition:
+            self._idle.append((connection, created_at, time.monotonic()))
+            self._condition.notify()
+
+    def close(self):
+        """Closes every idle connection (connections in use are closed when returned)."""
+        with self._condition:
+            idle, self._idle = list(self._idle), deque()
+        for connection, _, _ in idle:
+            self._discard(connection)
+
+    # --------------------------------------------------------------------------
+    # Instrumentation
+    # --------------------------------------------------------------------------
+
+    def stats(self):
+        with self._condition:
+            checkouts = self._counters['checkouts']
+            return {
+                'name': self.name,
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                **self._counters,
+                'wait_avg_ms': round(self._wait_total * 1000 / checkouts, 3) if checkouts else 0,
+                'wait_max_ms': round(self._wait_max * 1000, 3),
+            }
+
+    # --------------------------------------------------------------------------
+    # Internals
+    # --------------------------------------------------------------------------
+
+    def _record_wait(self, wait):
+        self._wait_total += wait
+        self._wait_max = max(self._wait_max, wait)
+
+    def _take_idle(self):
+        """Most recently returned usable connection (called with the lock held)."""
+        now = time.monotonic()
+        while self._idle:
+            connection, created_at, returned_at = self._idle.pop()
+            if now - returned_at > self.max_idle or now - created_at > self.max_lifetime:
+                self._close_locked(connection)
+                continue
+            return connection, returned_at
+        return None, None
+
+    def _open(self, connect):
+        try:
+            connection = connect()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._created_at[id(connection)] = time.monotonic()
+            self._counters['created'] += 1
+        return connection
+
+    def _healthy(self, connection, check):
+        try:
+            if check(connection) is not False:
+                return True
+        except Exception:
+            pass
+        with self._condition:
+            self._counters['failed_checks'] += 1
+        return False
+
+    def _close_locked(self, connection):
+        self._size -= 1
+        self._counters['closed'] += 1
+        self._created_at.pop(id(connection), None)
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _discard(self, connection):
+        with self._condition:
+            self._close_locked(connection)
+            self._condition.notify()
+
+# ==============================================================================
+# Per-process registry
+# ==============================================================================
+
+_pools = {}
+_pools_pid = None
+_registry_lock = threading.Lock()
+
+
+def get_pool(key, options):
+    """The pool for ``key`` (alias and connection target) in this process, created from ``options``."""
+    global _pools, _pools_pid
+    with _registry_lock:
+        if _pools_pid != os.getpid():
+            # process ลูกหลัง fork: ห้ามใช้ connection ของ process แม่ร่วมกัน
+            _pools, _pools_pid = {}, os.getpid()
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(key[0], **options)
+        return pool
+
+
+def close_pools():
+    with _registry_lock:
+        pools = list(_pools.values()) if _pools_pid == os.getpid() else []
+    for pool in pools:
+        pool.close()
+
+
+def pool_stats():
+    """``stats()`` of every pool of this process."""
+    with _registry_lock:
+        pools = list(_pools.values()) if _pools_pid == os.getpid() else []
+    return [pool.stats() for pool in pools]
@@ -0,0 +1,109 @@
+"""
+Caching of rendered page fragments (and the values pages are built from).
+
+A fragment is cached under the current versions of the namespaces it depends
+on (``core.lookup_cache``), e.g. the teacher dashboard under ``exams:<id>``,
+``courses:<id>`` and ``questions:<id>``. ``core.signals`` bumps those
+versions on save/delete, so a changed exam or question invalidates exactly
+the fragments that show it, without knowing their keys.
+
+The context of a fragment is built by a callable that only runs on a miss:
+a repeat view skips both the queries and the template rendering.
+
+Fragments are rendered without the request (no context processors and no
+CSRF token), so they must not contain forms or per-session data.
+
+Hits and misses are counted per fragment in the cache, for the admin page
+``feedback:cache_stats``.
+
+Fragments are only cached when ``settings.FRAGMENT_CACHE`` is on (by default
+with a cache shared by all workers): with a per-process cache, a version bump
+on one worker would leave the others serving stale fragments.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .lookup_cache import get_version
+
+FRAGMENT_CACHE_TIMEOUT = 24 * 60 * 60
+
+# ชื่อ fragment ทั้งหมดที่ใช้ในระบบ (ใช้แสดงในหน้าสถิติของผู้ดูแลระบบ)
+FRAGMENTS = {
+    'teacher-dashboard': 'หน้าหลักของครู (สถิติและรายการชุดข้อสอบ)',
+    'exam-header': 'หัวข้อหน้ารายละเอียดชุดข้อสอบ',
+    'exam-unpublished': 'สถานะการแก้ไขหลังเผยแพร่',
+    'exam-questions': 'รายการคำถามของฉบับที่เผยแพร่',
+}
+
+# ==============================================================================
+# Statistics
+# ==============================================================================
+
+def _stat_key(name, outcome):
+    return f'fragment-stats:{name}:{outcome}'
+
+
+def _count(name, outcome):
+    try:
+        cache.incr(_stat_key(name, outcome))
+    except ValueError:
+        cache.set(_stat_key(name, outcome), 1, None)
+
+
+def fragment_stats():
+    """``[{"name", "label", "hits", "misses", "total", "hit_rate"}, ...]`` for every known fragment."""
+    keys = [_stat_key(name, outcome) for name in FRAGMENTS for outcome in ('hits', 'misses')]
+    values = cache.get_many(keys)
+    stats = []
+    for name, label in FRAGMENTS.items():
+        hits = values.get(_stat_key(name, 'hits'), 0)
+        misses = values.get(_stat_key(name, 'misses'), 0)
+        total = hits + misses
+        stats.append({
+            'name': name,
+            'label': label,
+            'hits': hits,
+            'misses': misses,
+            'total': total,
+            'hit_rate': round(hits * 100 / total, 1) if total else None,
+        })
+    return stats
+
+
+def reset_fragment_stats():
+    cache.delete_many([_stat_key(name, outcome) for name in FRAGMENTS for outcome in ('hits', 'misses')])
+
+# ==============================================================================
+# Cached Values & Fragments
+# ==============================================================================
+
+def fragment_key(name, namespaces=(), parts=()):
+    versions = [f'{namespace}={get_version(namespace)}' for namespace in namespaces]
+    return ':'.join(['fragment', name, *versions, *map(str, parts)])
+
+
+def cached_value(name, build, namespaces=(), parts=(), timeout=None):
+    """
+    ``build()``, cached until one of ``namespaces`` is bumped. ``parts``
+    distinguish variants (object ids, options). Counts as fragment ``name``.
+    ``timeout`` shortens ``FRAGMENT_CACHE_TIMEOUT`` (e.g. for expiring URLs).
+    """
+    if not settings.FRAGMENT_CACHE:
+        return build()
+    key = fragment_key(name, namespaces, parts)
+    value = cache.get(key)
+    if value is None:
+        _count(name, 'misses')
+        value = build()
+        cache.set(key, value, min(timeout or FRAGMENT_CACHE_TIMEOUT, FRAGMENT_CACHE_TIMEOUT))
+    else:
+        _count(name, 'hits')
+    return value
+
+
+def cached_fragment(name, template_name, get_context, namespaces=(), parts=(), timeout=None):
+    """``template_name`` rendered with ``get_context()``, cached like ``cached_value``."""
+    html = cached_value(name, lambda: render_to_string(template_name, get_context()), namespaces, parts, timeout)
+    return mark_safe(html)
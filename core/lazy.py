@@ -0,0 +1,27 @@
+"""
+Deferred imports.
+
+``np = lazy_import('numpy')`` binds a module object whose real import runs on
+first attribute access. Modules that only use a heavy library inside their
+functions can keep a module-level name for it without paying the import when
+they are merely imported (URLconf, management commands, worker boot).
+Annotations that mention the module must not be evaluated at import time
+(``from __future__ import annotations``).
+"""
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f'No module named {name!r}', name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,108 @@
+"""
+Versioned cache namespaces for read-only lookups.
+
+Cached lookups put the namespace version into their cache keys. Changing the
+underlying data bumps the version (see ``core.signals``), so every entry of
+the namespace is invalidated at once without knowing or deleting its keys;
+old entries simply expire.
+
+Namespaces:
+
+* ``units``                    learning units of every course
+* ``units:<school id>``        learning units of one school's courses
+* ``taxonomy``                 learning areas, subject templates, grade levels
+* ``schools``                  the school registry (``core.tenancy``)
+* ``questions:<teacher id>``   a teacher's questions (counts, dashboard)
+* ``courses:<teacher id>``     a teacher's courses
+* ``exams:<teacher id>``       a teacher's exams (dashboard list)
+* ``exam:<exam id>``           one exam (name, questions, publication)
+
+Rendered page fragments are cached the same way (``core.fragment_cache``).
+
+Lookups read within a school use that school's namespace where one exists
+(``units_namespace``), so a change in one school does not invalidate the
+others; changes always bump the shared namespace too, for readers that see
+every school.
+
+Key scheme: ``lookup:<namespace>:<version>:<parts>`` for lookups and
+``fragment:<name>:<namespace>=<version>...:<parts>`` for fragments; the
+backend adds ``CACHE_KEY_PREFIX`` and the global ``CACHE_VERSION``
+(settings), which drops every entry at once when raised.
+"""
+import time
+
+from django.core.cache import cache
+
+LOOKUP_CACHE_TIMEOUT = 60 * 60
+
+
+def _version_key(namespace):
+    return f'lookup-version:{namespace}'
+
+
+def _fresh_version():
+    # ไม่เริ่มที่ 1 ทุกครั้ง: ถ้า key ของ version ถูก evict ไป จะไม่ย้อนกลับไปใช้ version เก่าที่ยังค้างใน cache
+    return time.time_ns() // 1000
+
+
+def get_version(namespace):
+    version = cache.get(_version_key(namespace))
+    if version is None:
+        version = _fresh_version()
+        cache.add(_version_key(namespace), version, None)
+        version = cache.get(_version_key(namespace), version)
+    return version
+
+
+async def aget_version(namespace):
+    version = await cache.aget(_version_key(namespace))
+    if version is None:
+        version = _fresh_version()
+        await cache.aadd(_version_key(namespace), version, None)
+        version = await cache.aget(_version_key(namespace), version)
+    return version
+
+
+def bump_version(namespace):
+    """Invalidates every cached lookup of ``namespace``."""
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:
+        cache.set(_version_key(namespace), _fresh_version(), None)
+
+
+def units_namespace(school_id=None):
+    return f'units:{school_id}' if school_id else 'units'
+
+
+def invalidate_units(school_ids):
+    """Bumps ``units`` and the units namespace of each of ``school_ids``."""
+    bump_version(units_namespace())
+    for school_id in set(school_ids) - {None}:
+        bump_version(units_namespace(school_id))
+
+
+def question_namespace(teacher_id):
+    return f'questions:{teacher_id}'
+
+
+def course_namespace(teacher_id):
+    return f'courses:{teacher_id}'
+
+
+def exams_namespace(teacher_id):
+    return f'exams:{teacher_id}'
+
+
+def exam_namespace(exam_id):
+    return f'exam:{exam_id}'
+
+
+def invalidate_question_counts(teacher_ids):
+    """For bulk writes that bypass model signals (``update``/``bulk_update``)."""
+    for teacher_id in set(teacher_ids):
+        bump_version(question_namespace(teacher_id))
+
+
+def lookup_key(namespace, version, *parts):
+    return ':'.join(['lookup', namespace, str(version), *map(str, parts)])
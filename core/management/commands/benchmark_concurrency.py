@@ -0,0 +1,180 @@
+import json
+import os
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser
+
+MODES = ('off', 'on')
+STARTUP_TIMEOUT = 30
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures request throughput of several gunicorn workers sharing the SQLite database, '
+        'with SQLite production mode off and on (WAL, busy timeout, write queue). '
+        'Every request of a logged-in teacher also writes a usage log. Needs data from "seed_exam_bank".'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='gunicorn worker processes.')
+        parser.add_argument('--clients', type=int, default=16, help='Concurrent client threads.')
+        parser.add_argument('--seconds', type=float, default=10, help='Duration of each run.')
+        parser.add_argument('--mode', choices=MODES, action='append', help='Run only this mode (repeatable).')
+        parser.add_argument(
+            '--path', action='append',
+            help='URL path to request (repeatable; default: the taxonomy API, dashboard and course list).',
+        )
+        parser.add_argument('--output', help='Also write the results as JSON to this path.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('This benchmark is for SQLite deployments; DATABASES["default"] is not SQLite.')
+        teacher = (
+            CustomUser.objects.filter(role='TEACHER', is_approved=True, username__startswith='bench_')
+            .order_by('username').first()
+        )
+        if teacher is None:
+            raise CommandError('No seeded data found. Run "manage.py seed_exam_bank" first.')
+
+        session_key = self.login_session(teacher)
+        # ค่าเริ่มต้นเน้นหน้าที่เบา: แต่ละ request จึงใช้เวลาส่วนใหญ่กับการเขียน log ซึ่งเป็นจุดที่ติด lock
+        paths = options['path'] or [reverse('api_taxonomy'), reverse('teacher_dashboard'), reverse('course_list')]
+        results = {}
+        for mode in options['mode'] or MODES:
+            self.stdout.write(f'Mode {mode}: {options["workers"]} workers, {options["clients"]} clients, '
+                              f'{options["seconds"]:g}s ...')
+            results[mode] = self.run_mode(mode, session_key, paths, options)
+            row = results[mode]
+            self.stdout.write(
+                f"  {row['requests_per_second']:8.1f} req/s   p50 {row['p50_ms']:7.1f} ms   "
+                f"p95 {row['p95_ms']:7.1f} ms   errors {row['errors']} / {row['requests']}"
+            )
+
+        if options['output']:
+            payload = {
+                'created_at': timezone.now().isoformat(),
+                'workers': options['workers'],
+                'clients': options['clients'],
+                'seconds': options['seconds'],
+                'paths': paths,
+                'results': results,
+            }
+            Path(options['output']).write_text(json.dumps(payload, indent=2))
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def login_session(self, user):
+        session = SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        return session.session_key
+
+    def set_journal_mode(self, mode):
+        # WAL ถูกบันทึกไว้ในไฟล์ฐานข้อมูล: ต้องตั้งกลับเป็น DELETE เพื่อวัดโหมดปิดให้ถูกต้อง
+        connection.close()
+        with sqlite3.connect(settings.DATABASES['default']['NAME']) as db:
+            db.execute(f'PRAGMA journal_mode={mode}')
+
+    def run_mode(self, mode, session_key, paths, options):
+        self.set_journal_mode('WAL' if mode == 'on' else 'DELETE')
+        port = free_port()
+        env = {
+            **os.environ,
+            'SQLITE_PRODUCTION_MODE': 'True' if mode == 'on' else 'False',
+            'ALLOWED_HOSTS': '127.0.0.1',
+            'DEBUG': 'False',
+        }
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', 'exam_bank_project.wsgi:application',
+             '--workers', str(options['workers']), '--bind', f'127.0.0.1:{port}', '--log-level', 'warning'],
+            cwd=settings.BASE_DIR, env=env,
+        )
+        base_url = f'http://127.0.0.1:{port}'
+        try:
+            self.wait_until_ready(base_url, server)
+            return self.load(base_url, session_key, paths, options['clients'], options['seconds'])
+        finally:
+            server.terminate()
+            server.wait(30)
+
+    def wait_until_ready(self, base_url, server):
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError('gunicorn exited during startup.')
+            try:
+                urllib.request.urlopen(base_url + '/', timeout=1)
+                return
+            except urllib.error.HTTPError:
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError('gunicorn did not start in time.')
+
+    def load(self, base_url, session_key, paths, clients, seconds):
+        latencies, errors = [], []
+        lock = threading.Lock()
+        stop_at = time.monotonic() + seconds
+
+        def client(index):
+            opener = urllib.request.build_opener()
+            opener.addheaders = [('Cookie', f'{settings.SESSION_COOKIE_NAME}={session_key}')]
+            count = index
+            while time.monotonic() < stop_at:
+                path = paths[count % len(paths)]
+                count += 1
+                started = time.perf_counter()
+                try:
+                    with opener.open(base_url + path, timeout=30) as response:
+                        response.read()
+                    failed = None
+                except (urllib.error.URLError, OSError) as exc:
+                    failed = str(exc)
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    latencies.append(elapsed)
+                    if failed:
+                        errors.append(failed)
+
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        latencies.sort()
+        ok = len(latencies) - len(errors)
+        return {
+            'requests': len(latencies),
+            'errors': len(errors),
+            'requests_per_second': round(ok / elapsed, 1),
+            'p50_ms': round(statistics.median(latencies), 1) if latencies else 0,
+            'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1], 1) if latencies else 0,
+            'error_samples': sorted(set(errors))[:5],
+        }
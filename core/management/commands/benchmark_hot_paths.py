@@ -0,0 +1,79 @@
+import json
+import platform
+import subprocess
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from core.benchmarks import SCENARIOS, BenchmarkContext, run_scenario, dataset_summary
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+class Command(BaseCommand):
+    help = (
+        'Times the hot paths (question list, auto generation, exports, admin reports) '
+        'against data created by "seed_exam_bank" and writes the results as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenarios', nargs='*', help='Scenario names to run (default: all).')
+        parser.add_argument('--iterations', type=int, default=5)
+        parser.add_argument('--warmup', type=int, default=1)
+        parser.add_argument('--output', help='JSON output path (default: bench_results/<time>-<commit>.json).')
+        parser.add_argument('--list', action='store_true', help='List available scenarios and exit.')
+
+    def handle(self, *args, **options):
+        if options['list']:
+            for name, spec in SCENARIOS.items():
+                self.stdout.write(f"{name:28} {spec['doc']}")
+            return
+
+        names = options['scenarios'] or list(SCENARIOS)
+        unknown = [name for name in names if name not in SCENARIOS]
+        if unknown:
+            raise CommandError(f"Unknown scenario(s): {', '.join(unknown)}. Use --list to see them.")
+
+        # Django test client ส่ง request ด้วย host "testserver"
+        if 'testserver' not in settings.ALLOWED_HOSTS:
+            settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+
+        try:
+            context = BenchmarkContext.from_seeded_data()
+        except LookupError as exc:
+            raise CommandError(str(exc))
+
+        commit = current_commit()
+        results = {}
+        for name in names:
+            results[name] = run_scenario(name, context, options['iterations'], options['warmup'])
+            stats = results[name]
+            self.stdout.write(
+                f"{name:28} median {stats['median_ms']:>10.2f} ms   p95 {stats['p95_ms']:>10.2f} ms   "
+                f"queries {stats['queries']}"
+            )
+
+        report = {
+            'commit': commit,
+            'timestamp': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'dataset': dataset_summary(),
+            'results': results,
+        }
+        output = Path(options['output'] or Path(settings.BASE_DIR) / 'bench_results' /
+                      f"{timezone.now():%Y%m%d-%H%M%S}-{commit}.json")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+        self.stdout.write(self.style.SUCCESS(f'Results written to {output}'))
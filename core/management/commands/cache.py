@@ -0,0 +1,93 @@
+import time
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from accounts.models import CustomUser
+from core.api import cached_learning_units, cached_taxonomy
+from core.fragment_cache import fragment_stats
+from core.models import Course
+from exam_management.models import Exam
+from exam_management.snapshots import load_snapshot
+from exam_management.views import teacher_dashboard_content
+
+LATENCY_SAMPLES = 200
+
+
+class Command(BaseCommand):
+    help = (
+        'Inspects and maintains the cache: "info" shows the configured backend and measures its latency, '
+        '"stats" shows fragment hit rates, "warm" fills the lookup, snapshot and dashboard caches, '
+        '"clear" empties the cache.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['info', 'stats', 'warm', 'clear'])
+        parser.add_argument('--alias', default='default', help='Cache alias in settings.CACHES.')
+
+    def handle(self, *args, **options):
+        alias = options['alias']
+        if alias not in settings.CACHES:
+            raise CommandError(f"Unknown cache alias '{alias}'. Configured: {', '.join(settings.CACHES)}")
+        cache = caches[alias]
+        getattr(self, options['action'])(cache, alias)
+
+    def info(self, cache, alias):
+        config = settings.CACHES[alias]
+        self.stdout.write(f"Backend:   {config['BACKEND']}")
+        self.stdout.write(f"Location:  {config.get('LOCATION', '')}")
+        self.stdout.write(f"Keys:      {cache.make_key('<key>')}")
+        self.stdout.write(f"Timeout:   {cache.default_timeout}")
+        self.stdout.write(f"Sessions:  {settings.SESSION_ENGINE}")
+        self.stdout.write(f"Fragments: {'cached' if settings.FRAGMENT_CACHE else 'not cached (FRAGMENT_CACHE=0)'}")
+        if config['BACKEND'].endswith('LocMemCache'):
+            self.stdout.write(self.style.WARNING(
+                'LocMemCache is private to each process: workers do not share entries, '
+                'and "warm"/"clear" from this command do not reach a running server.'
+            ))
+        if config['BACKEND'].endswith('DatabaseCache') and config['LOCATION'] not in connection.introspection.table_names():
+            raise CommandError(f"Cache table '{config['LOCATION']}' does not exist. Run: manage.py createcachetable")
+
+        key = 'cache-command:latency'
+        started = time.perf_counter()
+        for i in range(LATENCY_SAMPLES):
+            cache.set(key, i)
+            cache.get(key)
+        elapsed = time.perf_counter() - started
+        cache.delete(key)
+        self.stdout.write(self.style.SUCCESS(
+            f'set+get round trip: {elapsed * 1000 / LATENCY_SAMPLES:.3f} ms (average of {LATENCY_SAMPLES})'
+        ))
+
+    def stats(self, cache, alias):
+        for row in fragment_stats():
+            rate = f"{row['hit_rate']}%" if row['hit_rate'] is not None else '-'
+            self.stdout.write(f"{row['name']:20} hits {row['hits']:>8}  misses {row['misses']:>8}  hit rate {rate:>6}")
+
+    def warm(self, cache, alias):
+        if alias != 'default':
+            raise CommandError('Only the default cache is used by the application and can be warmed.')
+        started = time.perf_counter()
+        async_to_sync(cached_taxonomy)()
+        course_ids = list(Course.objects.values_list('pk', flat=True))
+        for course_id in course_ids:
+            async_to_sync(cached_learning_units)(str(course_id))
+        snapshot_ids = set(Exam.objects.filter(snapshot__isnull=False).values_list('snapshot_id', flat=True))
+        for snapshot_id in snapshot_ids:
+            load_snapshot(snapshot_id)
+        teachers = CustomUser.objects.filter(role='TEACHER', is_approved=True)
+        dashboards = 0
+        for teacher in teachers.iterator():
+            teacher_dashboard_content(teacher)
+            dashboards += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Warmed taxonomy, {len(course_ids)} course unit list(s), {len(snapshot_ids)} snapshot(s) '
+            f'and {dashboards} dashboard(s) in {time.perf_counter() - started:.1f} s.'
+        ))
+
+    def clear(self, cache, alias):
+        cache.clear()
+        self.stdout.write(self.style.SUCCESS(f"Cleared cache '{alias}'."))
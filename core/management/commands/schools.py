@@ -0,0 +1,80 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from accounts.models import CustomUser
+from core.lookup_cache import invalidate_units
+from core.models import Course, School
+from exam_management.models import Exam, Question
+from feedback.models import SurveyResponse, UsageLog, UsageLogDailyRollup
+
+# ตารางของโรงเรียน: (ชื่อที่แสดง, model, เส้นทางจากแถวไปยังผู้ใช้เจ้าของ)
+TENANT_TABLES = [
+    ('courses', Course, 'teacher'),
+    ('questions', Question, 'learning_unit__course__teacher'),
+    ('exams', Exam, 'course__teacher'),
+    ('usage logs', UsageLog, 'user'),
+    ('usage rollups', UsageLogDailyRollup, 'user'),
+    ('surveys', SurveyResponse, 'user'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        '"list" shows every school with its database and row counts (and the rows without a school); '
+        '"assign" moves users into a school and gives their courses, questions, exams, usage logs (and '
+        'their daily rollups) and survey responses the same school.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['list', 'assign'])
+        parser.add_argument('school', nargs='?', help='assign: code of the school.')
+        parser.add_argument('usernames', nargs='*', help='assign: users to move into the school.')
+        parser.add_argument(
+            '--unassigned', action='store_true',
+            help='assign: also every user without a school (e.g. when a single-school deployment gets its first school).',
+        )
+
+    def handle(self, *args, **options):
+        getattr(self, options['action'])(options)
+
+    def list(self, options):
+        rows = [(None, DEFAULT_DB_ALIAS)] + [(school, school.database or DEFAULT_DB_ALIAS) for school in School.objects.all()]
+        for school, database in rows:
+            counts = [('users', CustomUser.unscoped.using(database).filter(school=school).count())]
+            counts += [(label, model.unscoped.using(database).filter(school=school).count()) for label, model, _ in TENANT_TABLES]
+            name = f'{school.code} ({school.name})' if school else '(no school)'
+            where = f' domain {school.domain}' if school and school.domain else ''
+            self.stdout.write(f'{name}: database {database}{where}')
+            self.stdout.write('    ' + ', '.join(f'{label} {count}' for label, count in counts))
+
+    def assign(self, options):
+        if not options['school']:
+            raise CommandError('Give the code of the school.')
+        try:
+            school = School.objects.get(code=options['school'])
+        except School.DoesNotExist:
+            raise CommandError(f"School {options['school']} does not exist.")
+        if school.database:
+            raise CommandError(f'{school} has its own database; copy its data there instead.')
+
+        users = CustomUser.unscoped.filter(username__in=options['usernames'])
+        missing = set(options['usernames']) - set(users.values_list('username', flat=True))
+        if missing:
+            raise CommandError(f"Users not found: {', '.join(sorted(missing))}.")
+        user_ids = set(users.values_list('pk', flat=True))
+        if options['unassigned']:
+            user_ids |= set(CustomUser.unscoped.filter(school=None).values_list('pk', flat=True))
+        if not user_ids:
+            raise CommandError('No users given; pass usernames or --unassigned.')
+
+        with transaction.atomic():
+            counts = [('users', CustomUser.unscoped.filter(pk__in=user_ids).update(school=school))]
+            # update() ไม่ส่ง signal และไม่ผ่าน save(): กำหนดโรงเรียนตรงตามผู้ใช้เจ้าของแถว
+            for label, model, owner in TENANT_TABLES:
+                updated = model.unscoped.filter(**{f'{owner}__in': user_ids}).update(school=school)
+                counts.append((label, updated))
+            transaction.on_commit(lambda: invalidate_units([school.pk]))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Assigned to {school}: ' + ', '.join(f'{label} {count}' for label, count in counts) + '.'
+        ))
@@ -0,0 +1,258 @@
+import io
+import random
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, ImageDraw
+
+from accounts.models import CustomUser
+from core.lookup_cache import invalidate_question_counts, invalidate_units
+from core.models import LearningArea, SubjectTemplate, GradeLevel, Course, LearningUnit
+from exam_management.models import Question, Choice, ShortAnswer, Exam
+from feedback.forms import SURVEY_QUESTIONS
+from feedback.models import UsageLog, SurveyResponse, SurveyRating
+
+SEED_PREFIX = 'bench'
+BATCH_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = (
+        'Seeds the database with a synthetic, reproducible question bank '
+        '(areas -> templates -> courses -> units -> questions with choices and images) '
+        'plus usage logs and survey responses, for benchmarking.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (same seed = same data).')
+        parser.add_argument('--teachers', type=int, default=5)
+        parser.add_argument('--areas', type=int, default=4)
+        parser.add_argument('--templates-per-area', type=int, default=3)
+        parser.add_argument('--grades', type=int, default=6)
+        parser.add_argument('--courses-per-teacher', type=int, default=4)
+        parser.add_argument('--units-per-course', type=int, default=8)
+        parser.add_argument('--questions-per-unit', type=int, default=50)
+        parser.add_argument('--choices', type=int, default=4, help='Choices per MCQ question.')
+        parser.add_argument('--short-ratio', type=float, default=0.1, help='Fraction of SHORT questions.')
+        parser.add_argument('--image-ratio', type=float, default=0.05, help='Fraction of questions with an image.')
+        parser.add_argument('--distinct-images', type=int, default=10, help='Size of the shared image pool.')
+        parser.add_argument('--exams-per-course', type=int, default=2)
+        parser.add_argument('--questions-per-exam', type=int, default=40)
+        parser.add_argument('--usage-logs', type=int, default=20000)
+        parser.add_argument('--log-days', type=int, default=90, help='Spread usage logs over this many days.')
+        parser.add_argument('--surveys', type=int, default=200)
+        parser.add_argument('--flush', action='store_true', help='Delete previously seeded data first.')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        if options['flush']:
+            self.flush()
+
+        with transaction.atomic():
+            teachers = self.create_teachers(options['teachers'])
+            templates, grades = self.create_taxonomy(options)
+            courses = self.create_courses(teachers, templates, grades, options['courses_per_teacher'])
+            units = self.create_units(courses, options['units_per_course'])
+            image_names = self.create_image_pool(options['distinct_images'])
+            self.create_questions(units, image_names, options)
+            self.create_exams(courses, options)
+            self.create_surveys(teachers, options['surveys'])
+        self.create_usage_logs(teachers, options['usage_logs'], options['log_days'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(teachers)} teachers, {len(courses)} courses, {len(units)} units, "
+            f"{Question.objects.filter(created_by__in=teachers).count()} questions, "
+            f"{Exam.objects.filter(created_by__in=teachers).count()} exams."
+        ))
+
+    # --------------------------------------------------------------------------
+    # Steps
+    # --------------------------------------------------------------------------
+
+    def flush(self):
+        seeded_users = CustomUser.objects.filter(username__startswith=f'{SEED_PREFIX}_')
+        UsageLog.objects.filter(user__in=seeded_users).delete()
+        SurveyResponse.objects.filter(user__in=seeded_users).delete()
+        seeded_users.delete()  # cascades to courses, units, questions and exams
+        SubjectTemplate.objects.filter(subject_name__startswith=f'{SEED_PREFIX} ').delete()
+        LearningArea.objects.filter(area_name__startswith=f'{SEED_PREFIX} ').delete()
+        GradeLevel.objects.filter(grade_name__startswith=f'{SEED_PREFIX} ').delete()
+        self.stdout.write(self.style.WARNING('Removed previously seeded data.'))
+
+    def create_teachers(self, count):
+        teachers = []
+        for i in range(count):
+            teacher, created = CustomUser.objects.get_or_create(
+                username=f'{SEED_PREFIX}_teacher_{i}',
+                defaults={'role': CustomUser.Role.TEACHER, 'is_approved': True, 'email': f'{SEED_PREFIX}{i}@example.com'},
+            )
+            if created:
+                teacher.set_password(f'{SEED_PREFIX}-password')
+                teacher.save(update_fields=['password'])
+            teachers.append(teacher)
+        CustomUser.objects.get_or_create(
+            username=f'{SEED_PREFIX}_admin',
+            defaults={'role': CustomUser.Role.ADMIN, 'is_approved': True},
+        )
+        return teachers
+
+    def create_taxonomy(self, options):
+        templates = []
+        for a in range(options['areas']):
+            area, _ = LearningArea.objects.get_or_create(area_name=f'{SEED_PREFIX} กลุ่มสาระ {a + 1}')
+            for t in range(options['templates_per_area']):
+                template, _ = SubjectTemplate.objects.get_or_create(
+                    subject_name=f'{SEED_PREFIX} รายวิชา {a + 1}.{t + 1}', learning_area=area,
+                )
+                templates.append(template)
+        grades = [
+            GradeLevel.objects.get_or_create(grade_name=f'{SEED_PREFIX} ม.{g + 1}')[0]
+            for g in range(options['grades'])
+        ]
+        return templates, grades
+
+    def create_courses(self, teachers, templates, grades, per_teacher):
+        courses = []
+        for teacher in teachers:
+            for c in range(per_teacher):
+                course, _ = Course.objects.get_or_create(
+                    course_code=f'B{c + 1:04d}', teacher=teacher,
+                    defaults={
+                        'subject_template': self.rng.choice(templates),
+                        'grade_level': self.rng.choice(grades),
+                    },
+                )
+                courses.append(course)
+        return courses
+
+    def create_units(self, courses, per_course):
+        existing = set(LearningUnit.objects.filter(course__in=courses).values_list('course_id', 'unit_name'))
+        new_units = [
+            LearningUnit(course=course, unit_name=f'หน่วยที่ {u + 1}')
+            for course in courses for u in range(per_course)
+            if (course.id, f'หน่วยที่ {u + 1}') not in existing
+        ]
+        LearningUnit.objects.bulk_create(new_units, batch_size=BATCH_SIZE)
+        invalidate_units(course.school_id for course in courses)
+        return list(LearningUnit.objects.filter(course__in=courses).select_related('course'))
+
+    def create_image_pool(self, count):
+        storage = Question._meta.get_field('image').storage
+        names = []
+        for i in range(count):
+            image = Image.new('RGB', (480, 320), color=(255, 255, 255))
+            draw = ImageDraw.Draw(image)
+            for _ in range(12):
+                x0, y0 = self.rng.randint(0, 400), self.rng.randint(0, 240)
+                draw.rectangle([x0, y0, x0 + 80, y0 + 80], outline=(0, 0, 0), width=3)
+            draw.text((10, 10), f'Figure {i + 1}', fill=(0, 0, 0))
+            buffer = io.BytesIO()
+            image.save(buffer, format='PNG')
+            # ที่เก็บรูปอ้างอิงตามเนื้อไฟล์: seed ซ้ำได้ชื่อเดิมและไม่เขียนไฟล์ซ้ำ
+            names.append(storage.save(f'question_images/figure_{i + 1}.png', ContentFile(buffer.getvalue())))
+        return names
+
+    def create_questions(self, units, image_names, options):
+        blooms = [value for value, _ in Question.BloomLevel.choices]
+        seeded_unit_ids = set(Question.objects.filter(learning_unit__in=units).values_list('learning_unit_id', flat=True))
+        questions = []
+        for unit in units:
+            if unit.id in seeded_unit_ids:
+                continue
+            for n in range(options['questions_per_unit']):
+                is_short = self.rng.random() < options['short_ratio']
+                has_image = image_names and self.rng.random() < options['image_ratio']
+                questions.append(Question(
+                    question_text=f'{unit.unit_name} ข้อ {n + 1}: ' + self.sentence(),
+                    question_type=Question.QuestionType.SHORT if is_short else Question.QuestionType.MCQ,
+                    difficulty_level=round(self.rng.betavariate(2, 2), 2),
+                    bloom_level=self.rng.choice(blooms),
+                    image=self.rng.choice(image_names) if has_image else None,
+                    explanation=self.sentence() if self.rng.random() < 0.5 else None,
+                    learning_unit=unit,
+                    created_by=unit.course.teacher,
+                ))
+        Question.objects.bulk_create(questions, batch_size=BATCH_SIZE)
+        invalidate_question_counts(question.created_by_id for question in questions)
+
+        created = Question.objects.filter(learning_unit__in=units, choices__isnull=True, short_answer__isnull=True)
+        choices, short_answers = [], []
+        for question_id, question_type in created.values_list('id', 'question_type').iterator(chunk_size=BATCH_SIZE):
+            if question_type == Question.QuestionType.SHORT:
+                short_answers.append(ShortAnswer(question_id=question_id, answer_text=self.word()))
+                continue
+            correct = self.rng.randrange(options['choices'])
+            choices.extend(
+                Choice(question_id=question_id, choice_text=self.sentence(4), is_correct=(c == correct))
+                for c in range(options['choices'])
+            )
+        Choice.objects.bulk_create(choices, batch_size=BATCH_SIZE)
+        ShortAnswer.objects.bulk_create(short_answers, batch_size=BATCH_SIZE)
+
+    def create_exams(self, courses, options):
+        for course in courses:
+            existing = Exam.objects.filter(course=course).count()
+            question_ids = list(Question.objects.filter(learning_unit__course=course).values_list('id', flat=True))
+            for e in range(existing, options['exams_per_course']):
+                exam = Exam.objects.create(
+                    exam_name=f'{SEED_PREFIX} สอบ {course.course_code} ชุดที่ {e + 1}',
+                    course=course, created_by=course.teacher,
+                )
+                exam.questions.set(self.rng.sample(question_ids, min(len(question_ids), options['questions_per_exam'])))
+
+    def create_surveys(self, teachers, count):
+        existing = SurveyResponse.objects.filter(user__in=teachers).count()
+        codes = [code for questions in SURVEY_QUESTIONS.values() for code, _ in questions]
+        for i in range(existing, count):
+            response = SurveyResponse.objects.create(
+                user=self.rng.choice(teachers),
+                school_name=f'โรงเรียนทดสอบ {self.rng.randint(1, 50)}',
+                learning_area='วิทยาศาสตร์และเทคโนโลยี',
+                teaching_level=self.rng.choice(['ประถม', 'มัธยมต้น', 'มัธยมปลาย']),
+                teaching_experience=self.rng.choice(['0–5', '6–10', '11–15']),
+                usage_duration=self.rng.choice(['<10 นาที', '10–30 นาที']),
+                suggestion_likes=self.sentence(),
+            )
+            SurveyRating.objects.bulk_create([
+                SurveyRating(response=response, question_code=code, rating=self.rng.randint(1, 5))
+                for code in codes
+            ])
+
+    def create_usage_logs(self, teachers, count, days):
+        existing = UsageLog.objects.filter(user__in=teachers).count()
+        paths = ['/teacher/dashboard/', '/teacher/questions/', '/exam/create/auto/', '/teacher/courses/', '/teacher/units/']
+        now = timezone.now()
+        remaining = count - existing
+        while remaining > 0:
+            size = min(BATCH_SIZE, remaining)
+            with transaction.atomic():
+                logs = UsageLog.objects.bulk_create([
+                    UsageLog(
+                        user=self.rng.choice(teachers),
+                        action=f'GET on {path}',
+                        path=path,
+                        ip_address=f'10.0.{self.rng.randint(0, 255)}.{self.rng.randint(1, 254)}',
+                    )
+                    for path in (self.rng.choice(paths) for _ in range(size))
+                ])
+                # action_time เป็น auto_now_add จึงต้องอัปเดตย้อนหลังเพื่อกระจายเวลา
+                for log in logs:
+                    log.action_time = now - timedelta(seconds=self.rng.randint(0, days * 86400))
+                UsageLog.objects.bulk_update(logs, ['action_time'], batch_size=500)
+            remaining -= size
+
+    # --------------------------------------------------------------------------
+    # Text helpers
+    # --------------------------------------------------------------------------
+
+    WORDS = ['พลังงาน', 'แรง', 'สมการ', 'เซลล์', 'ระบบนิเวศ', 'อะตอม', 'ความเร็ว', 'ปริมาตร',
+             'พื้นที่', 'ประชากร', 'การทดลอง', 'ตัวแปร', 'สาร', 'วงจร', 'แม่เหล็ก', 'ความร้อน']
+
+    def word(self):
+        return self.rng.choice(self.WORDS)
+
+    def sentence(self, length=12):
+        return ' '.join(self.word() for _ in range(self.rng.randint(length // 2, length))) + ' ใช่หรือไม่'
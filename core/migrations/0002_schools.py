@@ -0,0 +1,40 @@
+# Generated by Django 5.0.6 on 2026-10-19 15:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='School',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='ชื่อโรงเรียน')),
+                ('code', models.SlugField(unique=True, verbose_name='รหัสโรงเรียน')),
+                ('domain', models.CharField(blank=True, default='', help_text='ชื่อโฮสต์ของโรงเรียน (ถ้ามี) เช่น school-a.example.com', max_length=255, verbose_name='โดเมน')),
+                ('database', models.CharField(blank=True, default='', help_text='alias ใน TENANT_DATABASES สำหรับโรงเรียนขนาดใหญ่ที่แยกฐานข้อมูล (ต้องกำหนดโดเมนด้วย)', max_length=50, verbose_name='ฐานข้อมูล')),
+            ],
+            options={
+                'verbose_name': 'โรงเรียน',
+                'verbose_name_plural': 'โรงเรียน',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='school',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.school', verbose_name='โรงเรียน'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['school', 'teacher'], name='course_school_teacher_idx'),
+        ),
+    ]
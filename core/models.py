@@ -1,5 +1,66 @@
 from django.db import models
 from accounts.models import CustomUser
+from .tenancy import TenantManager, fill_schools
+
+class School(models.Model):
+    """
+    A school using the system (a tenant). Its users, courses, questions,
+    exams and logs are only visible within the school; see core.tenancy.
+    """
+    name = models.CharField(max_length=255, unique=True, verbose_name="ชื่อโรงเรียน")
+    code = models.SlugField(max_length=50, unique=True, verbose_name="รหัสโรงเรียน")
+    domain = models.CharField(
+        max_length=255, blank=True, default='', verbose_name="โดเมน",
+        help_text="ชื่อโฮสต์ของโรงเรียน (ถ้ามี) เช่น school-a.example.com",
+    )
+    database = models.CharField(
+        max_length=50, blank=True, default='', verbose_name="ฐานข้อมูล",
+        help_text="alias ใน TENANT_DATABASES สำหรับโรงเรียนขนาดใหญ่ที่แยกฐานข้อมูล (ต้องกำหนดโดเมนด้วย)",
+    )
+
+    class Meta:
+        verbose_name = "โรงเรียน"
+        verbose_name_plural = "โรงเรียน"
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+    def clean(self):
+        from django.conf import settings
+        from django.core.exceptions import ValidationError
+
+        if self.database and self.database not in settings.TENANT_DATABASES:
+            raise ValidationError({'database': f'ไม่มีฐานข้อมูล "{self.database}" ใน TENANT_DATABASES'})
+        if self.database and not self.domain:
+            raise ValidationError({'domain': 'โรงเรียนที่แยกฐานข้อมูลต้องเข้าใช้งานผ่านโดเมนของตนเอง'})
+
+class TenantModel(models.Model):
+    """
+    Base of the tables holding a school's own data. ``school`` is filled on
+    save from ``school_source`` (the path to the school of the parent row) or
+    the current school. ``objects`` only returns the current school's rows;
+    ``unscoped`` returns every row.
+    """
+    # ไม่มี FK constraint: ตาราง School อยู่ในฐานข้อมูลหลักแม้ข้อมูลของโรงเรียนจะอยู่อีกฐานข้อมูล
+    # ไม่สร้าง index เดี่ยว: แต่ละตารางมี composite index ที่ขึ้นต้นด้วย school แทน
+    school = models.ForeignKey(
+        School, on_delete=models.CASCADE, null=True, blank=True, editable=False,
+        db_constraint=False, db_index=False, related_name='+', verbose_name="โรงเรียน",
+    )
+
+    school_source = None
+
+    objects = TenantManager()
+    unscoped = models.Manager()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if self.school_id is None:
+            fill_schools(type(self), [self])
+        super().save(*args, **kwargs)
 
 class LearningArea(models.Model):
     """
@@ -49,7 +110,7 @@ class GradeLevel(models.Model):
     def __str__(self): 
         return self.grade_name
 
-class Course(models.Model):
+class Course(TenantModel):
     """
     Represents a specific course taught by a teacher.
     This links a SubjectTemplate with a GradeLevel, a teacher-defined course code,
@@ -60,9 +121,12 @@ class Course(models.Model):
     grade_level = models.ForeignKey(GradeLevel, on_delete=models.CASCADE, related_name='courses', verbose_name="ระดับชั้น")
     teacher = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='courses', verbose_name="ครูผู้สอน")
 
+    school_source = 'teacher__school'
+
     class Meta:
         # Prevents the same teacher from creating the same course code twice.
         unique_together = ('course_code', 'teacher')
+        indexes = [models.Index(fields=['school', 'teacher'], name='course_school_teacher_idx')]
         verbose_name = "รายวิชาของครู"
         verbose_name_plural = "รายวิชาของครู"
         ordering = ['teacher', 'course_code']
@@ -0,0 +1,74 @@
+"""
+Invalidates the cached API lookups (``core.lookup_cache``) and page fragments
+(``core.fragment_cache``) when their data changes.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from exam_management.models import Exam, ExamRevision, Question
+from .lookup_cache import (
+    bump_version, question_namespace, course_namespace, exams_namespace, exam_namespace, invalidate_units,
+)
+from .models import LearningArea, SubjectTemplate, GradeLevel, LearningUnit, Course, School
+from .tenancy import use_school
+
+
+@receiver([post_save, post_delete], sender=Course)
+def invalidate_course_units(sender, instance, **kwargs):
+    invalidate_units([instance.school_id])
+
+
+@receiver([post_save, post_delete], sender=LearningUnit)
+def invalidate_unit(sender, instance, **kwargs):
+    school_id = Course.unscoped.filter(pk=instance.course_id).values_list('school_id', flat=True).first()
+    invalidate_units([school_id])
+
+
+@receiver([post_save, post_delete], sender=School)
+def invalidate_schools(sender, **kwargs):
+    # version ของทะเบียนโรงเรียนอยู่นอก partition ของโรงเรียนใด (core.tenancy.schools)
+    with use_school(None):
+        bump_version('schools')
+
+
+@receiver([post_save, post_delete], sender=Course)
+def invalidate_courses(sender, instance, **kwargs):
+    bump_version(course_namespace(instance.teacher_id))
+
+
+@receiver([post_save, post_delete], sender=LearningArea)
+@receiver([post_save, post_delete], sender=SubjectTemplate)
+@receiver([post_save, post_delete], sender=GradeLevel)
+def invalidate_taxonomy(sender, **kwargs):
+    bump_version('taxonomy')
+
+
+@receiver([post_save, post_delete], sender=Question)
+def invalidate_question_counts(sender, instance, **kwargs):
+    if instance.created_by_id:
+        bump_version(question_namespace(instance.created_by_id))
+
+
+@receiver([post_save, post_delete], sender=Exam)
+def invalidate_exam(sender, instance, **kwargs):
+    bump_version(exam_namespace(instance.pk))
+    bump_version(exams_namespace(instance.created_by_id))
+
+
+@receiver([post_save, post_delete], sender=ExamRevision)
+def invalidate_exam_revisions(sender, instance, **kwargs):
+    bump_version(exam_namespace(instance.exam_id))
+
+
+@receiver(m2m_changed, sender=Exam.questions.through)
+def invalidate_exam_questions(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        bump_version(exam_namespace(instance.pk))
+    elif action == 'post_clear':
+        # question.exams.clear(): ไม่รู้ว่าเคยอยู่ในชุดข้อสอบใด จึงล้างทั้งครู (ชุดข้อสอบใช้คำถามของครูเจ้าของเท่านั้น)
+        bump_version(question_namespace(instance.created_by_id))
+    else:
+        for exam_id in pk_set or ():
+            bump_version(exam_namespace(exam_id))
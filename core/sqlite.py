@@ -0,0 +1,37 @@
+"""
+SQLite production mode (``SQLITE_PRODUCTION_MODE``).
+
+Every new SQLite connection is tuned for several gunicorn workers sharing one
+database file:
+
+* ``journal_mode=WAL``: readers no longer block the writer and vice versa.
+* ``synchronous=NORMAL``: with WAL, still safe against application crashes;
+  only a power loss can lose the last transactions.
+* ``busy_timeout``: a writer waits for the lock instead of failing at once
+  with "database is locked".
+* ``mmap_size``: reads go through the OS page cache without copying.
+
+Writes that happen on every request (usage logs) or in bursts (survey
+ratings) are additionally funnelled through ``core.write_queue``.
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def tuning_pragmas():
+    return [
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        f'PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}',
+        f'PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}',
+    ]
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite' or not settings.SQLITE_PRODUCTION_MODE:
+        return
+    with connection.cursor() as cursor:
+        for pragma in tuning_pragmas():
+            cursor.execute(pragma)
@@ -0,0 +1,281 @@
+"""
+School tenancy: one deployment serving many schools.
+
+Every school is a ``core.models.School``. The tables holding a school's own
+data (users, courses, questions, exams, usage logs and their daily rollups,
+survey responses) have a ``school`` column and a default manager
+(``TenantManager``) that only returns the rows of the *current school*:
+
+* ``TenantMiddleware`` sets the current school of a request from its host
+  (``School.domain``), ``UserTenantMiddleware`` else from the school of the
+  logged-in user. Users without a school (the superuser, single-school
+  deployments) are not scoped.
+* Code outside requests (management commands, the write queue) is not scoped
+  either unless it runs inside ``use_school(school)``.
+* ``Model.unscoped`` is the plain manager, for work across schools.
+
+``TenantModel`` rows take their school from the row they belong to on
+``save()`` and ``bulk_create()`` (``school_source``), so code that creates
+courses, questions or exams does not need to know about schools.
+
+Large schools can have their own database: ``School.database`` names an alias
+of ``settings.TENANT_DATABASES``, and ``TenantRouter`` sends every query of
+that school there (sessions and users included), so such a school must be
+reached through its own domain. The school registry stays in the default
+database. Ids are only unique per database, so the cache keys of those
+schools are kept apart as well (``tenant_cache_key``).
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.db import DEFAULT_DB_ALIAS, models
+
+_current_school = ContextVar('current_school', default=None)
+
+
+def current_school():
+    """The School whose data the current request (or ``use_school`` block) works on, or None."""
+    return _current_school.get()
+
+
+def current_school_id():
+    school = _current_school.get()
+    return school.pk if school is not None else None
+
+
+def current_database():
+    """The database alias of the current school (``default`` unless it has its own database)."""
+    school = _current_school.get()
+    return (school.database or DEFAULT_DB_ALIAS) if school is not None else DEFAULT_DB_ALIAS
+
+
+def set_current_school(school):
+    return _current_school.set(school)
+
+
+@contextmanager
+def use_school(school):
+    """Runs the block as ``school`` (None: every school), e.g. in management commands."""
+    token = _current_school.set(school)
+    try:
+        yield school
+    finally:
+        _current_school.reset(token)
+
+# ==============================================================================
+# Managers
+# ==============================================================================
+
+class TenantQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        fill_schools(self.model, objs)
+        return super().bulk_create(objs, *args, **kwargs)
+
+
+class TenantManager(models.Manager.from_queryset(TenantQuerySet)):
+    """Default manager of tenant tables: only the current school's rows when a school is set."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        school_id = current_school_id()
+        if school_id is not None:
+            queryset = queryset.filter(school_id=school_id)
+        return queryset
+
+
+def fill_schools(model, objs):
+    """
+    Sets ``school`` of the unsaved ``objs`` that have none: the current
+    school, or else the school of the row named by ``model.school_source``
+    (one query per batch).
+    """
+    missing = [obj for obj in objs if obj.school_id is None]
+    if not missing:
+        return
+    source = getattr(model, 'school_source', None)
+    school_id = current_school_id()
+    if school_id is not None or not source:
+        for obj in missing:
+            obj.school_id = school_id
+        return
+
+    field_name, _, path = source.partition('__')
+    field = model._meta.get_field(field_name)
+    parent_ids = {getattr(obj, field.attname) for obj in missing} - {None}
+    if not parent_ids:
+        return
+    schools = dict(
+        field.related_model._base_manager.filter(pk__in=parent_ids).values_list('pk', path or 'school')
+    )
+    for obj in missing:
+        obj.school_id = schools.get(getattr(obj, field.attname))
+
+# ==============================================================================
+# Schools & Middleware
+# ==============================================================================
+
+def schools():
+    """``{id: School}`` of every school, cached until a school is saved (namespace ``schools``)."""
+    from django.core.cache import cache
+
+    from .lookup_cache import LOOKUP_CACHE_TIMEOUT, get_version, lookup_key
+    from .models import School
+
+    # ทะเบียนโรงเรียนอยู่ในฐานข้อมูลหลักเสมอ และ cache ไว้นอก partition ของโรงเรียนใด
+    with use_school(None):
+        key = lookup_key('schools', get_version('schools'))
+        registry = cache.get(key)
+        if registry is None:
+            registry = {school.pk: school for school in School.objects.using(DEFAULT_DB_ALIAS)}
+            cache.set(key, registry, LOOKUP_CACHE_TIMEOUT)
+    return registry
+
+
+def school_for_host(host):
+    host = host.split(':')[0].lower()
+    for school in schools().values():
+        if school.domain and school.domain.lower() == host:
+            return school
+    return None
+
+
+def _iterate_in_school(school, content):
+    iterator = iter(content)
+    while True:
+        with use_school(school):
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+        yield chunk
+
+
+async def _aiterate_in_school(school, content):
+    iterator = aiter(content)
+    while True:
+        with use_school(school):
+            try:
+                chunk = await anext(iterator)
+            except StopAsyncIteration:
+                return
+        yield chunk
+
+
+def _streamed_in_school(response, school):
+    """A streamed body is produced after the middleware returns: each chunk is read as ``school`` again."""
+    if response.streaming:
+        if response.is_async:
+            response.streaming_content = _aiterate_in_school(school, response.streaming_content)
+        else:
+            response.streaming_content = _iterate_in_school(school, response.streaming_content)
+    return response
+
+
+class _SchoolMiddleware:
+    """Runs the rest of the request (and its streamed body) as the school ``resolve`` returns, if any."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def resolve(self, request):
+        raise NotImplementedError
+
+    async def aresolve(self, request):
+        return await sync_to_async(self.resolve)(request)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        school = self.resolve(request)
+        request.school = school or getattr(request, 'school', None)
+        if school is None:
+            return self.get_response(request)
+        with use_school(school):
+            response = self.get_response(request)
+        return _streamed_in_school(response, school)
+
+    async def __acall__(self, request):
+        school = await self.aresolve(request)
+        request.school = school or getattr(request, 'school', None)
+        if school is None:
+            return await self.get_response(request)
+        with use_school(school):
+            response = await self.get_response(request)
+        return _streamed_in_school(response, school)
+
+
+class TenantMiddleware(_SchoolMiddleware):
+    """
+    The school of the request's host (``School.domain``). Must come before
+    SessionMiddleware: the session and the user of a school with its own
+    database are read from and saved to that database.
+    """
+
+    def resolve(self, request):
+        return school_for_host(request.get_host())
+
+
+class UserTenantMiddleware(_SchoolMiddleware):
+    """
+    The school of the logged-in user, for requests whose host does not
+    belong to a school. Must come after AuthenticationMiddleware.
+    """
+
+    def resolve(self, request):
+        if current_school() is not None or not request.user.is_authenticated or not request.user.school_id:
+            return None
+        return schools().get(request.user.school_id)
+
+    async def aresolve(self, request):
+        if current_school() is not None:
+            return None
+        user = await request.auser()
+        if not user.is_authenticated or not user.school_id:
+            return None
+        return (await sync_to_async(schools)()).get(user.school_id)
+
+# ==============================================================================
+# Separate Databases
+# ==============================================================================
+
+class TenantRouter:
+    """
+    Sends the queries of a school with its own database (``School.database``)
+    to that database. Enabled when ``settings.TENANT_DATABASES`` is set.
+    """
+
+    def _db(self, model, instance=None, **hints):
+        if model._meta.label == 'core.School':
+            return DEFAULT_DB_ALIAS
+        # แถวที่อ่านมาจากฐานข้อมูลใด บันทึก/อ่านความสัมพันธ์กลับไปที่ฐานข้อมูลนั้น
+        # (ยกเว้นโรงเรียน ซึ่งอยู่ในฐานข้อมูลหลักเสมอ เช่น User(school=school) ต้องไม่ถูกส่งไปฐานข้อมูลหลัก)
+        if instance is not None and instance._state.db and instance._meta.label != 'core.School':
+            return instance._state.db
+        return current_database()
+
+    def db_for_read(self, model, **hints):
+        return self._db(model, **hints)
+
+    def db_for_write(self, model, **hints):
+        return self._db(model, **hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # โรงเรียนอยู่ในฐานข้อมูลหลัก แต่ถูกอ้างถึงจากข้อมูลในฐานข้อมูลของโรงเรียน (FK ไม่มี constraint)
+        if 'core.School' in (obj1._meta.label, obj2._meta.label):
+            return True
+        return None
+
+
+def tenant_cache_key(key, key_prefix, version):
+    """Cache KEY_FUNCTION: entries of schools with their own database get a partition of their own."""
+    database = current_database()
+    if database == DEFAULT_DB_ALIAS:
+        return f'{key_prefix}:{version}:{key}'
+    return f'{key_prefix}:{database}:{version}:{key}'
@@ -1,3 +1,154 @@
-from django.test import TestCase
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import timedelta
 
-# Create your tests here.
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from core.models import Course, GradeLevel, LearningArea, LearningUnit, School, SubjectTemplate
+from core.tenancy import use_school
+from exam_management.models import Question
+from feedback.models import UsageLog, UsageLogDailyRollup
+from feedback.pagination import rollup_estimate
+from feedback.retention import clear_all_usage_logs, rollup_usage_logs
+
+# สิ่งที่ worker โหลดตอนเริ่ม: WSGI application (settings, apps, middleware) และ URLconf (views ทั้งหมด)
+STARTUP_SCRIPT = 'import exam_bank_project.wsgi, exam_bank_project.urls'
+
+# Export/report stacks that must only be imported when they are used.
+LAZY_MODULES = ('numpy', 'reportlab', 'docx', 'openpyxl', 'PIL', 'lxml')
+
+# Total import time of STARTUP_SCRIPT. Override on slow machines with IMPORT_TIME_BUDGET_MS.
+IMPORT_TIME_BUDGET_MS = int(os.environ.get('IMPORT_TIME_BUDGET_MS', '700'))
+
+
+def startup_import_times():
+    """``{module: self time in microseconds}`` from ``python -X importtime`` of a cold worker start."""
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'exam_bank_project.settings'}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(self_us)
+    return times
+
+
+class StartupImportTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.times = startup_import_times()
+
+    def test_export_stacks_are_not_imported_at_startup(self):
+        loaded = sorted({name.split('.')[0] for name in self.times} & set(LAZY_MODULES))
+        self.assertEqual(loaded, [], f'Imported at startup: {", ".join(loaded)}. Import them lazily.')
+
+    def test_startup_import_time_within_budget(self):
+        total_ms = sum(self.times.values()) / 1000
+        slowest = sorted(self.times.items(), key=lambda item: item[1], reverse=True)[:10]
+        self.assertLessEqual(
+            total_ms, IMPORT_TIME_BUDGET_MS,
+            f'Startup imports took {total_ms:.0f} ms (budget {IMPORT_TIME_BUDGET_MS} ms). '
+            f'Slowest: {", ".join(f"{name} {us // 1000} ms" for name, us in slowest)}',
+        )
+
+
+class TenancyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        area = LearningArea.objects.create(area_name='วิทยาศาสตร์')
+        cls.subject = SubjectTemplate.objects.create(subject_name='วิทยาศาสตร์พื้นฐาน', learning_area=area)
+        cls.grade = GradeLevel.objects.create(grade_name='ม.1')
+        cls.school_a = School.objects.create(name='โรงเรียน A', code='a')
+        cls.school_b = School.objects.create(name='โรงเรียน B', code='b', domain='b.example.com')
+        cls.teacher_a = cls._teacher('teacher_a', cls.school_a)
+        cls.teacher_b = cls._teacher('teacher_b', cls.school_b)
+        cls.unit_a = cls._unit(cls.teacher_a)
+        cls.unit_b = cls._unit(cls.teacher_b)
+        Question.objects.bulk_create([
+            Question(question_text=f'ข้อ {i}', question_type='SHORT', learning_unit=unit, created_by=unit.course.teacher)
+            for i, unit in enumerate([cls.unit_a, cls.unit_a, cls.unit_b])
+        ])
+
+    @classmethod
+    def _teacher(cls, username, school):
+        return CustomUser.objects.create_user(
+            username, password='secret-pass', role='TEACHER', is_approved=True, school=school,
+        )
+
+    @classmethod
+    def _unit(cls, teacher):
+        course = Course.objects.create(
+            course_code='ว21101', subject_template=cls.subject, grade_level=cls.grade, teacher=teacher,
+        )
+        return LearningUnit.objects.create(course=course, unit_name='หน่วยที่ 1')
+
+    def test_school_is_taken_from_the_parent_row(self):
+        self.assertEqual(self.unit_a.course.school, self.school_a)
+        self.assertEqual(
+            sorted(Question.objects.values_list('school__code', flat=True)), ['a', 'a', 'b'],
+        )
+
+    def test_managers_return_only_the_current_school(self):
+        self.assertEqual(Question.objects.count(), 3)
+        with use_school(self.school_a):
+            self.assertEqual(Question.objects.count(), 2)
+            self.assertEqual(list(CustomUser.objects.values_list('username', flat=True)), ['teacher_a'])
+            self.assertEqual(Question.unscoped.count(), 3)
+
+    def test_requests_are_scoped_by_user_and_by_host(self):
+        self.client.force_login(self.teacher_a)
+        response = self.client.get(reverse('question_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.school, self.school_a)
+
+        # โดเมนของโรงเรียน B: ผู้ใช้ของโรงเรียน A ไม่มีอยู่ในโรงเรียนนั้น
+        with self.settings(ALLOWED_HOSTS=['b.example.com']):
+            response = self.client.get(reverse('question_list'), HTTP_HOST='b.example.com')
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.wsgi_request.school, self.school_b)
+
+    def test_shared_image_is_kept_while_another_school_uses_it(self):
+        with tempfile.TemporaryDirectory() as media_root, self.settings(MEDIA_ROOT=media_root):
+            storage = Question._meta.get_field('image').storage
+            name = storage.save('question_images/figure.png', ContentFile(b'same figure'))
+            question_a = Question.unscoped.filter(school=self.school_a).first()
+            question_b = Question.unscoped.filter(school=self.school_b).first()
+            Question.unscoped.filter(pk__in=[question_a.pk, question_b.pk]).update(image=name)
+
+            with use_school(self.school_a), self.captureOnCommitCallbacks(execute=True):
+                Question.objects.get(pk=question_a.pk).delete()
+            self.assertTrue(storage.exists(name))
+
+            with use_school(self.school_b), self.captureOnCommitCallbacks(execute=True):
+                Question.objects.get(pk=question_b.pk).delete()
+            self.assertFalse(storage.exists(name))
+
+    def test_usage_logs_are_rolled_up_per_school(self):
+        yesterday = timezone.now() - timedelta(days=1)
+        for teacher in (self.teacher_a, self.teacher_b):
+            UsageLog.objects.bulk_create([UsageLog(user=teacher, action='GET', path='/') for _ in range(3)])
+        UsageLog.unscoped.update(action_time=yesterday)
+
+        # ผู้ดูแลของโรงเรียน A ล้าง log: rollup เฉพาะของ A และไม่แตะของ B
+        with use_school(self.school_a):
+            clear_all_usage_logs()
+        rollup_usage_logs()
+        self.assertEqual(
+            sorted(UsageLogDailyRollup.unscoped.values_list('school__code', 'user__username', 'count')),
+            [('a', 'teacher_a', 3), ('b', 'teacher_b', 3)],
+        )
+        with use_school(self.school_b):
+            self.assertEqual(rollup_estimate(), (3, False))
+        self.assertEqual(rollup_estimate(), (6, False))
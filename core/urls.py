@@ -1,8 +1,8 @@
 from django.urls import path
+from .api import learning_units_api, question_counts_api, question_availability_api, taxonomy_api
 from .views import (
     index_view,
     dashboard_redirect_view,
-    get_learning_units_api,
     
     LearningAreaListView, 
     LearningAreaCreateView, 
@@ -29,7 +29,10 @@ urlpatterns = [
     # General Redirects and API
     path('', index_view, name='home'),
     path('dashboard/', dashboard_redirect_view, name='dashboard_redirect'),
-    path('api/get-learning-units/', get_learning_units_api, name='api_get_learning_units'),
+    path('api/get-learning-units/', learning_units_api, name='api_get_learning_units'),
+    path('api/question-counts/', question_counts_api, name='api_question_counts'),
+    path('api/question-availability/', question_availability_api, name='api_question_availability'),
+    path('api/taxonomy/', taxonomy_api, name='api_taxonomy'),
     
     # --- Admin Management URLs ---
     
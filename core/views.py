@@ -3,9 +3,8 @@ from django.contrib.auth.decorators import login_required
 from django.urls import reverse_lazy
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import UserPassesTestMixin
-from django.http import JsonResponse
-from .models import LearningArea, SubjectTemplate, GradeLevel, LearningUnit, Course
-from .forms import LearningAreaForm, SubjectTemplateForm, GradeLevelForm, LearningUnitForm
+from .models import LearningArea, SubjectTemplate, GradeLevel, LearningUnit
+from .forms import LearningAreaForm, SubjectTemplateForm, GradeLevelForm
 
 # ==============================================================================
 # View สำหรับ Redirect และตรวจสอบสิทธิ์
@@ -184,16 +183,3 @@ class LearningUnitListView(BaseListView):
         return context
 
 # Note: Create, Update, Delete for LearningUnit should be handled by Teachers.
-
-# ==============================================================================
-# API Views (สำหรับ JavaScript/AJAX)
-# ==============================================================================
-
-def get_learning_units_api(request):
-    """
-    API endpoint to fetch Learning Units based on a Course ID.
-    Used in the "Auto Generate Exam" form.
-    """
-    course_id = request.GET.get('course_id')
-    units = LearningUnit.objects.filter(course_id=course_id).values('id', 'unit_name')
-    return JsonResponse(list(units), safe=False)
\ No newline at end of file
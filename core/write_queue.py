@@ -0,0 +1,196 @@
+"""
+Single-writer queue for frequent small writes.
+
+On SQLite only one connection can write at a time. When every request of every
+worker inserts a usage log in its own transaction, concurrent requests fight
+for the write lock and some fail with "database is locked". With
+``SQLITE_WRITE_QUEUE`` enabled, each process has one writer thread:
+
+* ``save_later(obj)`` queues a model instance and returns at once; the writer
+  inserts queued rows with one ``bulk_create`` per model and batch, so a
+  worker takes the write lock once per batch instead of once per request.
+* ``run_serialized(func)`` runs ``func`` in a transaction on the writer thread
+  and waits for its result, so the writes of one process never compete with
+  each other (e.g. a survey with its ratings).
+
+Locked-database errors are retried with backoff. Queued rows are flushed at
+exit; rows still queued when a process is killed are lost, which is accepted
+for usage logs. When the queue is disabled (the default, and always on
+PostgreSQL), both helpers write immediately in the calling thread.
+"""
+import atexit
+import contextvars
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.db import OperationalError, connections, router, transaction
+
+from .tenancy import current_database
+
+logger = logging.getLogger(__name__)
+
+LOCK_RETRIES = 5
+LOCK_BACKOFF = 0.05
+_STOP = object()
+
+
+def _is_lock_error(exc):
+    return isinstance(exc, OperationalError) and 'locked' in str(exc).lower()
+
+
+def with_lock_retries(func, using=None):
+    """``func()`` in a transaction, retried while the database is locked."""
+    for attempt in range(LOCK_RETRIES + 1):
+        try:
+            with transaction.atomic(using=using):
+                return func()
+        except OperationalError as exc:
+            if not _is_lock_error(exc) or attempt == LOCK_RETRIES:
+                raise
+            time.sleep(LOCK_BACKOFF * 2 ** attempt)
+
+
+class WriteQueue:
+    def __init__(self, batch_size=200, flush_interval=0.5, max_pending=10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------------------------
+    # Producers
+    # --------------------------------------------------------------------------
+
+    def add(self, obj):
+        self._ensure_started()
+        # เลือกฐานข้อมูลตอนนี้ (ตามโรงเรียนของคำขอ, core.tenancy) เพราะ writer thread ไม่รู้ว่าเป็นของโรงเรียนใด
+        obj._state.db = router.db_for_write(type(obj), instance=obj)
+        try:
+            self._queue.put_nowait(obj)
+        except queue.Full:
+            # writer ตามไม่ทัน: เขียนเองใน thread นี้แทนการทิ้งข้อมูล
+            with_lock_retries(obj.save)
+
+    def run(self, func):
+        self._ensure_started()
+        future = Future()
+        # รันใน writer thread ด้วย context ของผู้เรียก จึงเขียนลงฐานข้อมูลของโรงเรียนเดียวกัน
+        context = contextvars.copy_context()
+        self._queue.put((lambda: context.run(func), future, current_database()))
+        return future.result()
+
+    def flush(self, timeout=10):
+        """Blocks until everything queued so far is written."""
+        if self._thread is not None and self._pid == os.getpid():
+            future = Future()
+            self._queue.put((lambda: None, future, None))
+            future.result(timeout)
+
+    def stop(self):
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(10)
+
+    # --------------------------------------------------------------------------
+    # Writer thread
+    # --------------------------------------------------------------------------
+
+    def _ensure_started(self):
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                # process ลูกหลัง fork: ไม่มี thread ของ process แม่ติดมา และต้องไม่เขียนรายการของแม่ซ้ำ
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='write-queue', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+                pending = defaultdict(list)
+                count = 0
+                while item is not None:
+                    if item is _STOP:
+                        self._write(pending)
+                        return
+                    if isinstance(item, tuple):
+                        # งานที่รอผล: เขียนรายการที่ค้างก่อน เพื่อให้ลำดับการเขียนตรงกับลำดับที่ส่งเข้ามา
+                        self._write(pending)
+                        pending, count = defaultdict(list), 0
+                        self._call(*item)
+                    else:
+                        pending[type(item), item._state.db].append(item)
+                        count += 1
+                        if count >= self.batch_size:
+                            self._write(pending)
+                            pending, count = defaultdict(list), 0
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        item = None
+                self._write(pending)
+        finally:
+            connections.close_all()
+
+    def _write(self, pending):
+        for (model, using), objects in pending.items():
+            try:
+                with_lock_retries(
+                    lambda: model.objects.using(using).bulk_create(objects, batch_size=self.batch_size), using,
+                )
+            except Exception:
+                logger.exception('Dropped %d queued %s row(s)', len(objects), model._meta.label)
+
+    def _call(self, func, future, using):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(with_lock_retries(func, using))
+        except BaseException as exc:
+            future.set_exception(exc)
+
+
+writer = WriteQueue(
+    batch_size=settings.WRITE_QUEUE_BATCH_SIZE,
+    flush_interval=settings.WRITE_QUEUE_FLUSH_INTERVAL,
+)
+atexit.register(writer.stop)
+
+
+def save_later(obj):
+    """Inserts the unsaved model instance ``obj``, through the writer when the queue is enabled."""
+    if settings.SQLITE_WRITE_QUEUE:
+        writer.add(obj)
+    else:
+        obj.save()
+
+
+async def asave_later(obj):
+    if settings.SQLITE_WRITE_QUEUE:
+        writer.add(obj)
+    else:
+        await obj.asave()
+
+
+def run_serialized(func):
+    """``func()`` in a transaction, on the writer thread when the queue is enabled. Returns its result."""
+    if settings.SQLITE_WRITE_QUEUE:
+        return writer.run(func)
+    with transaction.atomic(using=current_database()):
+        return func()
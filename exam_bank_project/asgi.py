@@ -3,6 +3,21 @@ ASGI config for exam_bank_project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The async read API (``/api/...``, see ``core/api.py``) is meant to be served
+from this entry point, next to the regular sync WSGI workers that handle
+pages and heavy exports, e.g.::
+
+    gunicorn exam_bank_project.wsgi:application --workers 4
+    gunicorn exam_bank_project.asgi:application -k uvicorn.workers.UvicornWorker --workers 2 --bind :8001
+
+with the reverse proxy sending ``/api/`` to the second one. Under ASGI the
+async views and the async-capable middleware run on the event loop, so many
+light lookups share a worker instead of each holding one.
+
+Persistent connections are closed per request under ASGI (below); set
+``DB_POOL_MAX_SIZE`` to reuse them through the connection pool
+(``core.db_pool``) instead of reconnecting for every request.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -12,5 +27,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'exam_bank_project.settings')
+# Persistent DB connections are not reused across async requests; close them per request.
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
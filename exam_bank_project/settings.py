@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 import os
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 from pathlib import Path # เพิ่มบรรทัดนี้
 
@@ -44,17 +45,21 @@ INSTALLED_APPS = [
     'core',
     'exam_management',
     'feedback',
+    'grading',
+    'online_exams',
      # Third-party apps
     'django_filters',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware', # ต้องอยู่ตรงนี้
+    'core.middleware.AsyncWhiteNoiseMiddleware', # WhiteNoise ที่รองรับ ASGI, ต้องอยู่ตรงนี้
+    'core.tenancy.TenantMiddleware', # โรงเรียนตามโดเมน ต้องอยู่ก่อน SessionMiddleware
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.tenancy.UserTenantMiddleware', # โรงเรียนของผู้ใช้ ต้องอยู่หลัง AuthenticationMiddleware
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'feedback.middleware.UsageLogMiddleware', # Middleware สำหรับ Logs
@@ -87,10 +92,121 @@ WSGI_APPLICATION = 'exam_bank_project.wsgi.application'
 DATABASES = {
     'default': dj_database_url.config(
         default=f"sqlite:///{os.path.join(BASE_DIR, 'db.sqlite3')}",
-        conn_max_age=600
+        # ภายใต้ ASGI ควรปิด persistent connection (asgi.py ตั้ง DB_CONN_MAX_AGE=0 ให้)
+        conn_max_age=int(os.environ.get('DB_CONN_MAX_AGE', '600')),
+        # ตรวจว่า persistent connection ยังใช้ได้ก่อนเริ่มแต่ละ request (หลัง database restart/failover)
+        conn_health_checks=True,
     )
 }
 
+# --- SQLite production mode (core.sqlite, core.write_queue) ---
+# For deployments that keep the SQLite file with several workers: tunes every
+# connection (WAL, synchronous=NORMAL, busy timeout, mmap) and writes usage
+# logs and survey ratings through one writer thread per process.
+# Compare with `manage.py benchmark_concurrency`.
+_USES_SQLITE = DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3'
+SQLITE_PRODUCTION_MODE = _USES_SQLITE and os.environ.get('SQLITE_PRODUCTION_MODE', 'False').lower() == 'true'
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+SQLITE_WRITE_QUEUE = SQLITE_PRODUCTION_MODE and os.environ.get('SQLITE_WRITE_QUEUE', 'True').lower() == 'true'
+WRITE_QUEUE_BATCH_SIZE = int(os.environ.get('WRITE_QUEUE_BATCH_SIZE', '200'))
+WRITE_QUEUE_FLUSH_INTERVAL = float(os.environ.get('WRITE_QUEUE_FLUSH_INTERVAL', '0.5'))
+
+# --- Database connection pool (core.db_pool; PostgreSQL only) ---
+# DB_POOL_MAX_SIZE > 0 enables an in-process pool of at most that many
+# connections per worker process: requests return their connection to the
+# pool instead of closing it (also under ASGI), waiting up to DB_POOL_TIMEOUT
+# seconds when all are busy. Keep workers x DB_POOL_MAX_SIZE below the
+# server's max_connections. Pool statistics are shown on admin/cache/.
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', '0'))
+if DB_POOL_MAX_SIZE and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    DATABASES['default']['ENGINE'] = 'core.db_pool'
+    DATABASES['default']['CONN_MAX_AGE'] = 0  # Django "ปิด" connection ทุก request = คืนให้ pool
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'max_size': DB_POOL_MAX_SIZE,
+        'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+        'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', '600')),
+        'max_lifetime': float(os.environ.get('DB_POOL_MAX_LIFETIME', '3600')),
+        'check_after': float(os.environ.get('DB_POOL_CHECK_AFTER', '30')),
+        'slow_wait': float(os.environ.get('DB_POOL_SLOW_WAIT', '0.5')),
+    }
+
+
+# --- Cache (core.lookup_cache, core.fragment_cache, sessions; manage.py cache) ---
+# CACHE_BACKEND selects the backend:
+#   locmem  per-process memory (default; each worker has its own cache)
+#   file    files below CACHE_LOCATION (shared by the workers of one machine)
+#   redis   a Redis server at CACHE_LOCATION (or any Redis-compatible local
+#           stand-in such as Valkey/KeyDB); needs `pip install redis`
+#   db      the database table CACHE_LOCATION; run `manage.py createcachetable`
+# Every key is stored as "<CACHE_KEY_PREFIX>:<CACHE_VERSION>:<key>". Raise
+# CACHE_VERSION to drop every entry at once (e.g. when cached data changes
+# shape); individual namespaces are versioned by core.lookup_cache.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem').lower()
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'exam-bank'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', os.path.join(BASE_DIR, '.cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+    'db': ('django.core.cache.backends.db.DatabaseCache', 'django_cache'),
+}
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise ImproperlyConfigured(f"CACHE_BACKEND must be one of: {', '.join(CACHE_BACKENDS)}")
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': os.environ.get('CACHE_LOCATION', CACHE_BACKENDS[CACHE_BACKEND][1]),
+        # ค่าเริ่มต้นของ entry ที่ไม่ได้ระบุ timeout; ข้อมูลที่ต้องอยู่ถาวร (เช่น version) ระบุ None เอง
+        'TIMEOUT': int(os.environ.get('CACHE_TIMEOUT', '3600')),
+        'KEY_PREFIX': os.environ.get('CACHE_KEY_PREFIX', 'exam-bank'),
+        'VERSION': int(os.environ.get('CACHE_VERSION', '1')),
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', '10000'))},
+    }
+}
+if CACHE_BACKEND == 'redis':
+    # RedisCache ไม่รองรับ MAX_ENTRIES (Redis จัดการหน่วยความจำเองด้วย maxmemory-policy)
+    CACHES['default']['OPTIONS'] = {}
+
+# Rendered page fragments (core.fragment_cache) are invalidated by version
+# bumps stored in the cache. With locmem a bump on one worker is not seen by
+# the others, which would keep serving stale dashboards and exam pages, so
+# fragments are only cached with a shared backend. Set FRAGMENT_CACHE=1 to
+# cache them in locmem anyway when a single process serves every request.
+FRAGMENT_CACHE = os.environ.get('FRAGMENT_CACHE', '0' if CACHE_BACKEND == 'locmem' else '1') == '1'
+
+# With a shared cache (file, redis, db) sessions are read from the cache and
+# written through to the database, so a request no longer queries
+# django_session, and clearing or losing the cache never logs anybody out.
+# cached_db needs a cache every worker shares: with locmem a logout on one
+# worker would leave the session alive in the others' caches, so sessions
+# stay in the database there.
+SESSION_ENGINE = os.environ.get(
+    'SESSION_ENGINE',
+    'django.contrib.sessions.backends.db' if CACHE_BACKEND == 'locmem' else 'django.contrib.sessions.backends.cached_db',
+)
+
+# --- School tenancy (core.tenancy; manage.py schools) ---
+# Schools whose data should live in a database of their own, as
+# TENANT_DATABASES="<alias>=<database url> <alias>=<database url>". Create
+# each with `manage.py migrate --database <alias>`, then set the alias as
+# School.database (the school also needs a domain). With at least one alias
+# the tenant router and per-database cache keys are enabled; otherwise every
+# school shares the default database.
+TENANT_DATABASES = {
+    alias: dj_database_url.parse(
+        url,
+        conn_max_age=int(os.environ.get('DB_CONN_MAX_AGE', '600')),
+        conn_health_checks=True,
+    )
+    for alias, _, url in (
+        item.partition('=') for item in os.environ.get('TENANT_DATABASES', '').split()
+    )
+}
+if TENANT_DATABASES:
+    DATABASES.update(TENANT_DATABASES)
+    DATABASE_ROUTERS = ['core.tenancy.TenantRouter']
+    CACHES['default']['KEY_FUNCTION'] = 'core.tenancy.tenant_cache_key'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -157,3 +273,38 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 # URL that handles the media served from MEDIA_ROOT.
 MEDIA_URL = '/media/'
 
+# Question images are served by exam_management.media (permission check, ETag,
+# cache headers). Set MEDIA_SENDFILE_HEADER to let the front-end server send
+# the file after the check: 'X-Accel-Redirect' (nginx, with an internal
+# location at MEDIA_SENDFILE_PREFIX aliased to MEDIA_ROOT) or 'X-Sendfile'.
+MEDIA_SENDFILE_HEADER = os.environ.get('MEDIA_SENDFILE_HEADER', '')
+MEDIA_SENDFILE_PREFIX = os.environ.get('MEDIA_SENDFILE_PREFIX', '/protected-media/')
+# Signed image URLs (pages a user may see carry them) expire after this many
+# seconds; they are re-issued every half of it, so a page shows the same URL
+# (and the browser reuses its cached image) for that long. Rendered fragments
+# holding image URLs are cached for at most half of it.
+QUESTION_IMAGE_URL_MAX_AGE = int(os.environ.get('QUESTION_IMAGE_URL_MAX_AGE', str(2 * 24 * 60 * 60)))
+
+# --- Word export (exam_management.word_export) ---
+# Optional school template (.docx) for exported exams: page setup, header and
+# footer, fonts and any letterhead in the body are kept and the exam is
+# appended. The styles the export uses (Exam Question, Exam Choice, Exam
+# Spacer) are added to it when missing. Loaded once per process.
+WORD_EXAM_TEMPLATE = os.environ.get('WORD_EXAM_TEMPLATE', '')
+
+
+# --- Profiling (feedback.profiling) ---
+# Admins can force profiling with ?profile=1 or the "X-Profile: 1" header.
+# PROFILING_SAMPLE_RATE additionally profiles a random fraction (0.0 - 1.0) of requests.
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_SAMPLE_INTERVAL = float(os.environ.get('PROFILING_SAMPLE_INTERVAL', '0.005'))
+
+# --- Usage log retention (feedback.retention, manage.py prune_usage_logs) ---
+# Raw UsageLog rows older than this are purged after being rolled up per day.
+USAGE_LOG_RETENTION_DAYS = int(os.environ.get('USAGE_LOG_RETENTION_DAYS', '180'))
+USAGE_LOG_PURGE_BATCH_SIZE = int(os.environ.get('USAGE_LOG_PURGE_BATCH_SIZE', '5000'))
+
+# --- Item analysis (grading.analysis, manage.py analyze_items) ---
+# Question.difficulty_level is only overwritten from real responses once at
+# least this many students have answered the question.
+ITEM_ANALYSIS_MIN_STUDENTS = int(os.environ.get('ITEM_ANALYSIS_MIN_STUDENTS', '30'))
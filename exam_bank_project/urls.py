@@ -17,7 +17,8 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings # <-- 1. เพิ่ม import
-from django.conf.urls.static import static # <-- 2. เพิ่ม import
+
+from exam_management.media import serve_question_image
 
 urlpatterns = [
     # 1. ใส่ URL ของแอปฯ ที่เราสร้างเองทั้งหมดไว้ก่อน
@@ -25,10 +26,12 @@ urlpatterns = [
     path('', include('core.urls')),
     path('', include('exam_management.urls')),
     path('', include('feedback.urls')),
+    path('', include('grading.urls')),
+    path('', include('online_exams.urls')),
 
     # 2. ใส่ URL ของ Django Admin สำเร็จรูปไว้ล่างสุด
     path('admin/', admin.site.urls),
-]
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    # 3. รูปประกอบคำถาม (ตรวจสิทธิ์ + cache headers) ใช้ได้ทั้งตอน DEBUG และ production
+    path(f"{settings.MEDIA_URL.lstrip('/')}<path:name>", serve_question_image, name='question_image'),
+]
\ No newline at end of file
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Question, Choice, ShortAnswer, Exam
+from .models import Question, Choice, ShortAnswer, Exam, ExamRevision
 
 class ChoiceInline(admin.TabularInline):
     model = Choice
@@ -17,6 +17,12 @@ class QuestionAdmin(admin.ModelAdmin):
     def get_course_code(self, obj):
         return obj.learning_unit.course.course_code
 
+class ExamRevisionInline(admin.TabularInline):
+    model = ExamRevision
+    extra = 0
+    can_delete = False
+    readonly_fields = ('number', 'snapshot', 'published_by', 'published_at')
+
 @admin.register(Exam)
 class ExamAdmin(admin.ModelAdmin):
     # --- อัปเดต list_display และ list_filter ---
@@ -24,6 +30,8 @@ class ExamAdmin(admin.ModelAdmin):
     list_filter = ('course__subject_template', 'course__grade_level', 'created_by')
     search_fields = ('exam_name', 'course__course_code')
     filter_horizontal = ('questions',)
+    readonly_fields = ('snapshot', 'published_at')
+    inlines = [ExamRevisionInline]
 
     @admin.display(description='รหัสวิชา', ordering='course__course_code')
     def get_course_code(self, obj):
@@ -0,0 +1,358 @@
+"""
+Backup and restore of question banks as one compressed archive (.tar.gz).
+
+Members, in this order, so a restore can read the archive as a stream::
+
+    manifest.json           format, time, scope and row counts
+    media/<storage name>    every image used by an exported question, once
+    data/<table>.jsonl      one JSON object per row, parent tables first
+
+The archive holds the taxonomy (learning areas, subject templates, grade
+levels), the teachers' usernames and their courses, learning units,
+questions, choices, short answers and exams with their question lists.
+
+Export reads every table with a chunked iterator into a temporary file (a tar
+member needs its size before its data), so memory does not depend on the size
+of the bank. Restore reads the rows in batches of ``BACKUP_BATCH_SIZE``,
+inserts them with ``bulk_create`` and maps the archived ids to the new ones
+by position, like ``cloning``. Everything is created anew except the
+taxonomy, which is matched by name, and the users, which are matched by
+username (or all replaced by one owner). Images go through the
+content-addressed storage, so files that are already stored are not written
+again.
+
+Published snapshots and revisions are not archived: restored exams are
+published from their restored questions on first access.
+"""
+import io
+import json
+import posixpath
+import tarfile
+import tempfile
+import time
+from dataclasses import dataclass, field
+
+from django.core.files.base import ContentFile
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from core.lookup_cache import bump_version, course_namespace, exams_namespace, invalidate_question_counts, invalidate_units
+from core.models import Course, GradeLevel, LearningArea, LearningUnit, SubjectTemplate
+from core.tenancy import current_database
+from .models import Choice, Exam, Question, ShortAnswer
+from .snapshots import image_storage
+
+BACKUP_FORMAT = 1
+BACKUP_BATCH_SIZE = 1000
+
+# ตารางในไฟล์สำรอง เรียงจากตารางแม่ไปตารางลูก: (ชื่อ, model, ฟิลด์)
+TABLES = [
+    ('learning_areas', LearningArea, ('id', 'area_name')),
+    ('subject_templates', SubjectTemplate, ('id', 'subject_name', 'learning_area_id')),
+    ('grade_levels', GradeLevel, ('id', 'grade_name')),
+    ('users', CustomUser, ('id', 'username')),
+    ('courses', Course, ('id', 'course_code', 'subject_template_id', 'grade_level_id', 'teacher_id')),
+    ('units', LearningUnit, ('id', 'unit_name', 'course_id')),
+    ('questions', Question, (
+        'id', 'question_text', 'question_type', 'difficulty_level', 'bloom_level', 'image', 'explanation',
+        'learning_unit_id', 'created_by_id',
+    )),
+    ('choices', Choice, ('question_id', 'choice_text', 'is_correct')),
+    ('short_answers', ShortAnswer, ('question_id', 'answer_text')),
+    ('exams', Exam, ('id', 'exam_name', 'course_id', 'created_by_id')),
+    ('exam_questions', Exam.questions.through, ('exam_id', 'question_id')),
+]
+
+# foreign key -> the table whose id map translates it
+REFERENCES = {
+    'learning_area_id': 'learning_areas',
+    'subject_template_id': 'subject_templates',
+    'grade_level_id': 'grade_levels',
+    'teacher_id': 'users',
+    'created_by_id': 'users',
+    'course_id': 'courses',
+    'learning_unit_id': 'units',
+    'question_id': 'questions',
+    'exam_id': 'exams',
+}
+
+
+class BackupError(Exception):
+    pass
+
+
+@dataclass
+class BackupResult:
+    counts: dict = field(default_factory=dict)
+    images: int = 0
+    seconds: float = 0.0
+
+# ==============================================================================
+# Export
+# ==============================================================================
+
+def _scoped_querysets(teachers=None):
+    """``{table: queryset}`` of everything owned by ``teachers`` (all teachers when None)."""
+    courses = Course.objects.all() if teachers is None else Course.objects.filter(teacher__in=teachers)
+    questions = Question.objects.filter(learning_unit__course__in=courses)
+    exams = Exam.objects.filter(course__in=courses)
+    return {
+        'learning_areas': LearningArea.objects.all(),
+        'subject_templates': SubjectTemplate.objects.all(),
+        'grade_levels': GradeLevel.objects.all(),
+        'users': CustomUser.objects.filter(
+            Q(pk__in=courses.values('teacher')) | Q(pk__in=questions.values('created_by'))
+            | Q(pk__in=exams.values('created_by'))
+        ),
+        'courses': courses,
+        'units': LearningUnit.objects.filter(course__in=courses),
+        'questions': questions,
+        'choices': Choice.objects.filter(question__in=questions),
+        'short_answers': ShortAnswer.objects.filter(question__in=questions),
+        'exams': exams,
+        'exam_questions': Exam.questions.through.objects.filter(exam__in=exams, question__in=questions),
+    }
+
+
+def _spool_rows(queryset, fields):
+    """The rows of ``queryset`` as JSON Lines in a temporary file. Returns ``(file, size, count)``."""
+    spool = tempfile.TemporaryFile()
+    count = 0
+    for row in queryset.order_by('pk').values(*fields).iterator(chunk_size=BACKUP_BATCH_SIZE):
+        spool.write(json.dumps(row, ensure_ascii=False, cls=DjangoJSONEncoder).encode() + b'\n')
+        count += 1
+    size = spool.tell()
+    spool.seek(0)
+    return spool, size, count
+
+
+def _add_member(archive, name, fileobj, size):
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mtime = int(time.time())
+    archive.addfile(info, fileobj)
+
+
+def export_backup(fileobj, teachers=None):
+    """
+    Writes the bank of ``teachers`` (every teacher when None) to the binary
+    ``fileobj`` as a .tar.gz archive. ``fileobj`` may be a stream (stdout).
+    """
+    started = time.perf_counter()
+    querysets = _scoped_querysets(teachers)
+    result = BackupResult()
+    spools = []
+    try:
+        for name, model, fields in TABLES:
+            spool, size, count = _spool_rows(querysets[name], fields)
+            spools.append((name, spool, size))
+            result.counts[name] = count
+
+        storage = image_storage()
+        image_names = sorted(
+            querysets['questions'].exclude(image='').exclude(image__isnull=True)
+            .values_list('image', flat=True).distinct()
+        )
+        manifest = {
+            'format': BACKUP_FORMAT,
+            'created_at': timezone.now().isoformat(),
+            'teachers': None if teachers is None else sorted(teacher.username for teacher in teachers),
+            'counts': result.counts,
+            'images': len(image_names),
+        }
+
+        with tarfile.open(fileobj=fileobj, mode='w|gz') as archive:
+            data = json.dumps(manifest, ensure_ascii=False, indent=2).encode()
+            _add_member(archive, 'manifest.json', io.BytesIO(data), len(data))
+
+            for image_name in image_names:
+                try:
+                    size = storage.size(image_name)
+                    with storage.open(image_name) as image:
+                        _add_member(archive, f'media/{image_name}', image, size)
+                    result.images += 1
+                except OSError:
+                    # ไฟล์รูปหายจากที่เก็บ: คำถามยังกู้คืนได้ แต่จะไม่มีรูป
+                    continue
+
+            for name, spool, size in spools:
+                _add_member(archive, f'data/{name}.jsonl', spool, size)
+    finally:
+        for _, spool, _ in spools:
+            spool.close()
+
+    result.seconds = time.perf_counter() - started
+    return result
+
+# ==============================================================================
+# Restore
+# ==============================================================================
+
+def _read_rows(fileobj):
+    for line in fileobj:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _batches(rows, size=BACKUP_BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _restore_taxonomy(name, rows, maps):
+    """Matches learning areas, subject templates and grade levels by name, creating the missing ones."""
+    for row in rows:
+        if name == 'learning_areas':
+            obj, _ = LearningArea.objects.get_or_create(area_name=row['area_name'])
+        elif name == 'subject_templates':
+            obj, _ = SubjectTemplate.objects.get_or_create(
+                subject_name=row['subject_name'], learning_area_id=maps['learning_areas'][row['learning_area_id']],
+            )
+        else:
+            obj, _ = GradeLevel.objects.get_or_create(grade_name=row['grade_name'])
+        maps[name][row['id']] = obj.pk
+
+
+def _restore_users(rows, maps, owner):
+    rows = list(rows)
+    if owner is not None:
+        maps['users'] = {row['id']: owner.pk for row in rows}
+        return
+    users = dict(CustomUser.objects.filter(username__in=[row['username'] for row in rows]).values_list('username', 'pk'))
+    missing = sorted(row['username'] for row in rows if row['username'] not in users)
+    if missing:
+        raise BackupError(f"Users not found: {', '.join(missing)}. Create them first or restore into one owner.")
+    maps['users'] = {row['id']: users[row['username']] for row in rows}
+
+
+def _check_course_codes(objects):
+    """Course codes are unique per teacher: in the database and, after ``owner`` merged teachers, in the batch."""
+    seen, duplicates = set(), set()
+    for course in objects:
+        if (course.teacher_id, course.course_code) in seen:
+            duplicates.add(course.course_code)
+        seen.add((course.teacher_id, course.course_code))
+    if duplicates:
+        raise BackupError(
+            f"Course(s) {', '.join(sorted(duplicates))} appear more than once for the same teacher "
+            f"(several archived teachers restored into one owner). Restore without an owner instead."
+        )
+    existing = set(
+        Course.objects.filter(
+            teacher_id__in={course.teacher_id for course in objects},
+            course_code__in={course.course_code for course in objects},
+        ).values_list('teacher_id', 'course_code')
+    )
+    conflicts = sorted(course.course_code for course in objects if (course.teacher_id, course.course_code) in existing)
+    if conflicts:
+        raise BackupError(f"The teacher already has course(s) {', '.join(conflicts)}.")
+
+
+def _restore_table(name, model, rows, maps, image_map):
+    """Bulk-inserts ``rows`` with their references translated. Returns the number of rows created."""
+    created = 0
+    for batch in _batches(rows):
+        old_ids, objects = [], []
+        for row in batch:
+            old_id = row.pop('id', None)
+            try:
+                for key, value in row.items():
+                    if key in REFERENCES:
+                        row[key] = maps[REFERENCES[key]][value]
+            except KeyError:
+                # อ้างถึงแถวที่ไม่ได้อยู่ในไฟล์สำรอง (เช่น ข้อสอบที่ใช้คำถามจากรายวิชาอื่น)
+                continue
+            if name == 'questions':
+                row['image'] = image_map.get(row['image'], row['image']) or None
+            old_ids.append(old_id)
+            objects.append(model(**row))
+        if name == 'courses':
+            _check_course_codes(objects)
+        objects = model.objects.bulk_create(objects, batch_size=BACKUP_BATCH_SIZE)
+        if name in maps:
+            maps[name].update((old_id, obj.pk) for old_id, obj in zip(old_ids, objects))
+        created += len(objects)
+    return created
+
+
+def restore_backup(fileobj, owner=None):
+    """
+    Restores an archive written by ``export_backup`` from the binary
+    ``fileobj`` (may be a stream), in one transaction. With ``owner`` every
+    course, question and exam belongs to that user; otherwise users are
+    matched by username. Raises BackupError.
+    """
+    started = time.perf_counter()
+    models = {name: model for name, model, _ in TABLES}
+    maps = {name: {} for name in ('learning_areas', 'subject_templates', 'grade_levels', 'users', 'courses', 'units', 'questions', 'exams')}
+    image_map = {}
+    result = BackupResult()
+    storage = image_storage()
+    upload_to = Question._meta.get_field('image').upload_to
+
+    try:
+        archive = tarfile.open(fileobj=fileobj, mode='r|*')
+    except tarfile.TarError as exc:
+        raise BackupError(f'Not a backup archive: {exc}')
+
+    with archive, transaction.atomic(using=current_database()):
+        manifest = None
+        for member in archive:
+            if not member.isfile():
+                continue
+            content = archive.extractfile(member)
+            if member.name == 'manifest.json':
+                manifest = json.load(content)
+                if manifest.get('format') != BACKUP_FORMAT:
+                    raise BackupError(f"Unsupported backup format {manifest.get('format')}.")
+                continue
+            if manifest is None:
+                raise BackupError('Not a backup archive: manifest.json must come first.')
+
+            if member.name.startswith('media/'):
+                # บันทึกผ่าน storage แบบ content-addressed: ได้ชื่อตาม hash ของเนื้อไฟล์ และไม่เขียนซ้ำถ้ามีอยู่แล้ว
+                image_name = member.name[len('media/'):]
+                upload_name = posixpath.join(upload_to, posixpath.basename(image_name))
+                image_map[image_name] = storage.save(upload_name, ContentFile(content.read(), name=upload_name))
+                result.images += 1
+            elif member.name.startswith('data/') and member.name.endswith('.jsonl'):
+                name = member.name[len('data/'):-len('.jsonl')]
+                if name not in models:
+                    continue
+                rows = _read_rows(content)
+                if name in ('learning_areas', 'subject_templates', 'grade_levels'):
+                    _restore_taxonomy(name, rows, maps)
+                    result.counts[name] = len(maps[name])
+                elif name == 'users':
+                    _restore_users(rows, maps, owner)
+                    result.counts[name] = len(maps[name])
+                else:
+                    result.counts[name] = _restore_table(name, models[name], rows, maps, image_map)
+
+        if manifest is None:
+            raise BackupError('Not a backup archive: manifest.json is missing.')
+
+        # bulk_create ไม่ส่ง signal: ล้าง cache ของครูที่ได้รับข้อมูลเมื่อ transaction สำเร็จ
+        teacher_ids = set(maps['users'].values())
+        school_ids = set(Course.unscoped.filter(pk__in=maps['courses'].values()).values_list('school_id', flat=True))
+
+        def invalidate():
+            invalidate_units(school_ids)
+            invalidate_question_counts(teacher_ids)
+            for teacher_id in teacher_ids:
+                bump_version(course_namespace(teacher_id))
+                bump_version(exams_namespace(teacher_id))
+
+        transaction.on_commit(invalidate, using=current_database())
+
+    result.seconds = time.perf_counter() - started
+    return result
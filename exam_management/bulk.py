@@ -0,0 +1,100 @@
+"""
+Bulk question operations.
+
+A selection (ticked ids or the current question-list filter) is resolved once
+into a BulkQuestionJob. The job is then applied in chunks of
+``BULK_CHUNK_SIZE`` ids, each chunk a single ``UPDATE`` or ``DELETE`` in its
+own transaction, so a very large selection neither holds one huge lock nor
+needs a page load per question, and the progress page can poll between
+chunks.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from core.lookup_cache import invalidate_question_counts
+from core.tenancy import current_database
+from .filters import QuestionFilter
+from .models import BulkQuestionJob, Question
+
+BULK_CHUNK_SIZE = 500
+
+# ==============================================================================
+# Selection
+# ==============================================================================
+
+def selected_questions(user, question_ids=None, filter_params=None):
+    """
+    The user's questions to act on: either the explicit ``question_ids`` or
+    everything matching the question-list filter ``filter_params``.
+    """
+    queryset = Question.objects.filter(created_by=user)
+    if filter_params is not None:
+        return QuestionFilter(filter_params, queryset=queryset, user=user).qs
+    return queryset.filter(pk__in=question_ids or [])
+
+
+def create_bulk_job(user, action, value, queryset):
+    question_ids = list(queryset.order_by('pk').values_list('pk', flat=True).distinct())
+    return BulkQuestionJob.objects.create(
+        created_by=user, action=action, value=value, question_ids=question_ids, total=len(question_ids),
+    )
+
+# ==============================================================================
+# Execution
+# ==============================================================================
+
+def _update_fields(job):
+    if job.action == BulkQuestionJob.Action.MOVE:
+        return {'learning_unit_id': job.value}
+    if job.action == BulkQuestionJob.Action.BLOOM:
+        return {'bloom_level': job.value}
+    if job.action == BulkQuestionJob.Action.DIFFICULTY:
+        return {'difficulty_level': job.value}
+    raise ValueError(f'Unknown bulk action: {job.action}')
+
+
+def run_bulk_chunk(job, chunk_size=BULK_CHUNK_SIZE):
+    """
+    Applies the next chunk of the job and returns the refreshed job.
+    The job row is locked while the chunk runs, so concurrent calls never
+    apply the same chunk twice.
+    """
+    with transaction.atomic(using=current_database()):
+        job = BulkQuestionJob.objects.select_for_update().get(pk=job.pk)
+        if job.is_done:
+            return job
+        chunk = job.question_ids[job.processed:job.processed + chunk_size]
+        questions = Question.objects.filter(pk__in=chunk, created_by_id=job.created_by_id)
+        if job.action == BulkQuestionJob.Action.DELETE:
+            _, deleted = questions.delete()
+            affected = deleted.get(Question._meta.label, 0)
+        else:
+            # update() ไม่เรียก auto_now: ตั้ง updated_at เอง เพื่อให้ชุดข้อสอบรู้ว่ามีการแก้ไขหลังเผยแพร่
+            affected = questions.update(updated_at=timezone.now(), **_update_fields(job))
+        job.processed += len(chunk)
+        job.affected += affected
+        if job.is_done:
+            job.finished_at = timezone.now()
+        job.save(update_fields=['processed', 'affected', 'finished_at'])
+    # update() ไม่ส่ง signal: ล้าง cache จำนวนข้อสอบของครูเอง
+    invalidate_question_counts([job.created_by_id])
+    return job
+
+
+def run_bulk_job(job, chunk_size=BULK_CHUNK_SIZE):
+    """Runs the job to completion in the current request."""
+    while not job.is_done:
+        job = run_bulk_chunk(job, chunk_size)
+    return job
+
+
+def job_status(job):
+    return {
+        'id': job.pk,
+        'action': job.action,
+        'total': job.total,
+        'processed': job.processed,
+        'affected': job.affected,
+        'percent': job.percent,
+        'done': job.is_done,
+    }
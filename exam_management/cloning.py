@@ -0,0 +1,107 @@
+"""
+Deep copy of a course's question bank: Course -> LearningUnits -> Questions
+-> Choices / ShortAnswers, into another course of the same or another teacher.
+
+Each level is written with one ``bulk_create`` per batch and the new ids
+(returned by the INSERT on PostgreSQL and SQLite) are mapped back to the old
+ones by position, so cloning a course costs a handful of queries per level
+instead of several per question. Image files are not
+copied: the cloned questions reference the same stored file (question images
+are never modified in place, only replaced by a new upload).
+"""
+import time
+from dataclasses import dataclass
+
+from django.db import transaction
+
+from core.lookup_cache import invalidate_question_counts, invalidate_units
+from core.models import Course, LearningUnit
+from core.tenancy import current_database
+from .models import Question, Choice, ShortAnswer
+
+CLONE_BATCH_SIZE = 1000
+
+@dataclass
+class CloneResult:
+    course: Course
+    units: int
+    questions: int
+    choices: int
+    short_answers: int
+    seconds: float
+
+# ==============================================================================
+# Cloning
+# ==============================================================================
+
+def clone_course_content(source, target):
+    """
+    Copies every learning unit of ``source`` (with its questions, choices and
+    short answers) into the existing course ``target``. The copies belong to
+    ``target.teacher``. Returns a CloneResult.
+    """
+    started = time.perf_counter()
+    with transaction.atomic(using=current_database()):
+        source_units = list(LearningUnit.objects.filter(course=source).order_by('id').values_list('id', 'unit_name'))
+        new_units = LearningUnit.objects.bulk_create(
+            [LearningUnit(course=target, unit_name=name) for _, name in source_units], batch_size=CLONE_BATCH_SIZE,
+        )
+        unit_map = {old_id: unit.pk for (old_id, _), unit in zip(source_units, new_units)}
+
+        fields = ('id', 'question_text', 'question_type', 'difficulty_level', 'bloom_level', 'image', 'explanation', 'learning_unit_id')
+        source_questions = list(
+            Question.objects.filter(learning_unit__course=source).order_by('id').values_list(*fields)
+        )
+        new_questions = Question.objects.bulk_create(
+            [
+                Question(
+                    question_text=text, question_type=question_type, difficulty_level=difficulty,
+                    bloom_level=bloom, image=image or None, explanation=explanation,
+                    learning_unit_id=unit_map[unit_id], created_by_id=target.teacher_id,
+                )
+                for _, text, question_type, difficulty, bloom, image, explanation, unit_id in source_questions
+            ],
+            batch_size=CLONE_BATCH_SIZE,
+        )
+        question_map = {row[0]: question.pk for row, question in zip(source_questions, new_questions)}
+
+        choices = [
+            Choice(question_id=question_map[question_id], choice_text=text, is_correct=is_correct)
+            for question_id, text, is_correct in Choice.objects.filter(question__learning_unit__course=source)
+            .order_by('id').values_list('question_id', 'choice_text', 'is_correct').iterator(chunk_size=CLONE_BATCH_SIZE)
+        ]
+        Choice.objects.bulk_create(choices, batch_size=CLONE_BATCH_SIZE)
+
+        short_answers = [
+            ShortAnswer(question_id=question_map[question_id], answer_text=text)
+            for question_id, text in ShortAnswer.objects.filter(question__learning_unit__course=source)
+            .values_list('question_id', 'answer_text')
+        ]
+        ShortAnswer.objects.bulk_create(short_answers, batch_size=CLONE_BATCH_SIZE)
+
+        # bulk_create ไม่ส่ง signal: ล้าง cache ของ API เอง เมื่อ transaction สำเร็จ
+        transaction.on_commit(lambda: (invalidate_units([target.school_id]), invalidate_question_counts([target.teacher_id])), using=current_database())
+
+    return CloneResult(
+        course=target,
+        units=len(new_units),
+        questions=len(new_questions),
+        choices=len(choices),
+        short_answers=len(short_answers),
+        seconds=time.perf_counter() - started,
+    )
+
+
+def clone_course(source, teacher, course_code, subject_template=None, grade_level=None):
+    """
+    Creates a new course for ``teacher`` (by default with the same subject and
+    grade as ``source``) and copies the content of ``source`` into it.
+    """
+    with transaction.atomic(using=current_database()):
+        target = Course.objects.create(
+            teacher=teacher,
+            course_code=course_code,
+            subject_template=subject_template or source.subject_template,
+            grade_level=grade_level or source.grade_level,
+        )
+        return clone_course_content(source, target)
@@ -0,0 +1,231 @@
+"""
+Exam and question bank exporters (PDF, Word, Excel, CSV, Moodle XML, JSON).
+
+Every exporter reads an ``ExportSource``: a title, a course label and an
+iterable of questions in the snapshot item layout (``snapshots.snapshot_item``).
+
+* An exam is exported from its published snapshot (``exam_source``).
+* A course's whole question bank (``course_bank_source``) is streamed from
+  the database with ``QuerySet.iterator``: questions are read in chunks of
+  ``EXPORT_CHUNK_SIZE`` with one prefetch query for their choices per chunk,
+  so memory does not grow with the size of the bank.
+
+Exporters registered with ``streaming=True`` (CSV, Moodle XML, JSON) yield the
+file in pieces, which are sent as they are produced. The others need the whole
+document (PDF, Word) or write it in one go (Excel) and return bytes.
+
+A new format is a function ``(source, options) -> bytes | iterable of str/bytes``
+decorated with ``@exporter(...)``; it then appears on the exam and course
+pages and in ``manage.py export_questions``.
+"""
+import base64
+import csv
+import io
+import json
+import posixpath
+from dataclasses import dataclass
+from typing import Iterable
+from xml.sax.saxutils import escape, quoteattr
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+from .models import Question
+from .snapshots import get_exam_snapshot, image_storage, snapshot_item, with_snapshot_data
+from .utils import DEFAULT_PDF_LAYOUT, choice_label
+
+EXPORT_CHUNK_SIZE = 500
+# คอลัมน์ตัวเลือกในไฟล์ตาราง (ข้อที่มีตัวเลือกมากกว่านี้จะต่อคอลัมน์ท้ายแถว)
+TABLE_CHOICE_COLUMNS = 6
+
+EXPORTERS = {}
+
+
+def exporter(name, label, extension, content_type, streaming=False):
+    """Registers an export format under ``name``."""
+    def decorator(func):
+        EXPORTERS[name] = {
+            'write': func, 'label': label, 'extension': extension,
+            'content_type': content_type, 'streaming': streaming,
+        }
+        return func
+    return decorator
+
+# ==============================================================================
+# Sources
+# ==============================================================================
+
+@dataclass
+class ExportSource:
+    title: str
+    course: str
+    questions: Iterable[dict]
+
+    def content(self):
+        """The source as snapshot content, for exporters that lay out the whole document at once."""
+        return {'exam_name': self.title, 'course': self.course, 'questions': list(self.questions)}
+
+
+def iter_questions(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Snapshot items of ``queryset``, read ``chunk_size`` questions (plus one choices query) at a time."""
+    for question in with_snapshot_data(queryset).iterator(chunk_size=chunk_size):
+        yield snapshot_item(question)
+
+
+def exam_source(exam):
+    content = get_exam_snapshot(exam)
+    return ExportSource(content['exam_name'], content['course'], content['questions'])
+
+
+def course_bank_source(course):
+    questions = Question.objects.filter(learning_unit__course=course)
+    return ExportSource(f'คลังข้อสอบ {course.course_code}', str(course), iter_questions(questions))
+
+# ==============================================================================
+# Output
+# ==============================================================================
+
+def export_response(source, name, filename, options=None):
+    """The download of ``source`` in format ``name``: streamed for streaming exporters."""
+    spec = EXPORTERS[name]
+    output = spec['write'](source, options or {})
+    response_class = StreamingHttpResponse if spec['streaming'] else HttpResponse
+    response = response_class(output, content_type=spec['content_type'])
+    response['Content-Disposition'] = content_disposition_header(True, f"{filename}.{spec['extension']}")
+    return response
+
+
+def export_to_file(source, name, file, options=None):
+    """Writes ``source`` in format ``name`` to the binary ``file``."""
+    output = EXPORTERS[name]['write'](source, options or {})
+    if isinstance(output, bytes):
+        output = [output]
+    for chunk in output:
+        file.write(chunk.encode() if isinstance(chunk, str) else chunk)
+
+# ==============================================================================
+# Helpers
+# ==============================================================================
+
+def _correct_label(question, choice_format):
+    if question['type'] == 'MCQ' and 0 <= question['key'] < len(question['choices']):
+        return choice_label(question['key'], choice_format)
+    return ''
+
+
+def table_rows(questions, choice_format='thai'):
+    """Header and one row per question for the spreadsheet formats; choices are the last columns."""
+    yield (
+        ['id', 'type', 'question', 'correct', 'answer', 'explanation', 'image']
+        + [f'choice_{choice_label(j, choice_format)}' for j in range(TABLE_CHOICE_COLUMNS)]
+    )
+    for question in questions:
+        yield [
+            question['id'], question['type'], question['text'], _correct_label(question, choice_format),
+            question['answer'], question['explanation'], question['image'],
+            *(choice['text'] for choice in question['choices']),
+        ]
+
+
+class _Echo:
+    """File-like object that returns what is written, so csv.writer rows can be yielded."""
+
+    def write(self, value):
+        return value
+
+# ==============================================================================
+# Exporters
+# ==============================================================================
+
+@exporter('pdf', 'PDF', 'pdf', 'application/pdf')
+def export_pdf(source, options):
+    from .pdf_export import render_pdf_exam
+
+    content = source.content()
+    layout = options.get('layout', DEFAULT_PDF_LAYOUT)
+    return render_pdf_exam(content, options.get('choice_format', 'thai'), layout, parts=['student'])['student'].getvalue()
+
+
+@exporter('docx', 'Word', 'docx', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document')
+def export_docx(source, options):
+    from .word_export import render_word_exam
+
+    return render_word_exam(source.content(), options.get('choice_format', 'thai')).getvalue()
+
+
+@exporter('xlsx', 'Excel', 'xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+def export_xlsx(source, options):
+    from openpyxl import Workbook
+
+    # write-only: แถวถูกเขียนลงไฟล์ชั่วคราวทีละแถว ไม่เก็บทั้งตารางไว้ในหน่วยความจำ
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('questions')
+    for row in table_rows(source.questions, options.get('choice_format', 'thai')):
+        sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+@exporter('csv', 'CSV', 'csv', 'text/csv; charset=utf-8', streaming=True)
+def export_csv(source, options):
+    writer = csv.writer(_Echo())
+    # BOM ให้ Excel เปิดไฟล์ภาษาไทยเป็น UTF-8
+    yield '\ufeff'
+    for row in table_rows(source.questions, options.get('choice_format', 'thai')):
+        yield writer.writerow(row)
+
+
+@exporter('json', 'JSON', 'json', 'application/json', streaming=True)
+def export_json(source, options):
+    yield '{"title": %s, "course": %s, "questions": [' % (
+        json.dumps(source.title, ensure_ascii=False), json.dumps(source.course, ensure_ascii=False)
+    )
+    for index, question in enumerate(source.questions):
+        yield (',\n' if index else '\n') + json.dumps(question, ensure_ascii=False)
+    yield '\n]}\n'
+
+
+def _moodle_text(text, image=''):
+    """A Moodle ``<text>`` (HTML format) and the embedded ``<file>`` of the image, if any."""
+    html = '<p>%s</p>' % escape(text).replace('\n', '<br>')
+    file_xml = ''
+    if image:
+        try:
+            with image_storage().open(image) as file:
+                data = base64.b64encode(file.read()).decode()
+        except OSError:
+            data = None
+        if data:
+            filename = posixpath.basename(image)
+            html += f'<p><img src="@@PLUGINFILE@@/{filename}"></p>'
+            file_xml = f'<file name={quoteattr(filename)} path="/" encoding="base64">{data}</file>'
+    return f'<text>{escape(html)}</text>{file_xml}'
+
+
+def _moodle_question(question, numbering):
+    name = f"<name><text>{escape(question['text'][:60])}</text></name>"
+    text = f'<questiontext format="html">{_moodle_text(question["text"], question["image"])}</questiontext>'
+    feedback = f'<generalfeedback format="html">{_moodle_text(question["explanation"])}</generalfeedback>' if question['explanation'] else ''
+    if question['type'] == 'MCQ':
+        answers = ''.join(
+            f'<answer fraction="{100 if j == question["key"] else 0}" format="html">{_moodle_text(choice["text"])}</answer>'
+            for j, choice in enumerate(question['choices'])
+        )
+        return (
+            f'<question type="multichoice">{name}{text}{feedback}<single>true</single>'
+            f'<shuffleanswers>false</shuffleanswers><answernumbering>{numbering}</answernumbering>{answers}</question>\n'
+        )
+    answer = f'<answer fraction="100" format="plain_text"><text>{escape(question["answer"])}</text></answer>'
+    return f'<question type="shortanswer">{name}{text}{feedback}<usecase>0</usecase>{answer}</question>\n'
+
+
+@exporter('moodle', 'Moodle XML', 'xml', 'application/xml', streaming=True)
+def export_moodle_xml(source, options):
+    # Moodle ไม่มีการลำดับตัวเลือกแบบ ก ข ค จึงไม่แสดงลำดับสำหรับรูปแบบไทย
+    numbering = 'ABCD' if options.get('choice_format') == 'eng' else 'none'
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n<quiz>\n'
+    yield f'<question type="category"><category><text>$course$/{escape(source.title)}</text></category></question>\n'
+    for question in source.questions:
+        yield _moodle_question(question, numbering)
+    yield '</quiz>\n'
@@ -2,7 +2,7 @@ from django import forms
 from django.forms import inlineformset_factory
 from django.core.exceptions import ValidationError
 
-from .models import Question, Choice, Exam
+from .models import Question, Choice, Exam, BulkQuestionJob
 from core.models import Course, LearningUnit
 
 # ==============================================================================
@@ -27,6 +27,25 @@ class CourseForm(forms.ModelForm):
             'grade_level': forms.Select(attrs={'class': 'w-full p-2 border border-gray-300 rounded-md'}),
         }
 
+class CourseCloneForm(CourseForm):
+    """
+    Form for copying one of the teacher's courses, with all its learning units
+    and questions, into a new course (e.g. for a new term).
+    """
+    def __init__(self, teacher, source, *args, **kwargs):
+        kwargs.setdefault('initial', {
+            'subject_template': source.subject_template_id,
+            'grade_level': source.grade_level_id,
+        })
+        super().__init__(*args, **kwargs)
+        self.teacher = teacher
+
+    def clean_course_code(self):
+        course_code = self.cleaned_data['course_code']
+        if Course.objects.filter(teacher=self.teacher, course_code=course_code).exists():
+            raise ValidationError('คุณมีรายวิชาที่ใช้รหัสวิชานี้อยู่แล้ว')
+        return course_code
+
 class LearningUnitForm(forms.ModelForm):
     """
     Form for Teachers to create and update their own learning units.
@@ -210,4 +229,73 @@ class AutoGenerateExamForm(forms.Form):
             if isinstance(field.widget, (forms.TextInput, forms.Select)):
                 field.widget.attrs.update({'class': 'w-full p-2 border border-gray-300 rounded-md'})
             elif isinstance(field.widget, forms.NumberInput):
-                field.widget.attrs.update({'class': 'w-full p-2 border border-gray-300 rounded-md text-center'})
\ No newline at end of file
+                field.widget.attrs.update({'class': 'w-full p-2 border border-gray-300 rounded-md text-center'})
+
+
+class IdListField(forms.Field):
+    """A list of integer ids posted as repeated fields (e.g. ticked checkboxes)."""
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        try:
+            return [int(item) for item in value or []]
+        except (TypeError, ValueError):
+            raise ValidationError('รายการคำถามไม่ถูกต้อง')
+
+
+class BulkQuestionActionForm(forms.Form):
+    """
+    Bulk action on the question list: applies one change to the ticked
+    questions (``scope=selected``) or to every question matching the current
+    filter (``scope=filter``, with the filter's query string in ``filter_query``).
+    """
+    SCOPE_SELECTED = 'selected'
+    SCOPE_FILTER = 'filter'
+
+    action = forms.ChoiceField(label="การดำเนินการ", choices=BulkQuestionJob.Action.choices)
+    scope = forms.ChoiceField(
+        choices=((SCOPE_SELECTED, 'เฉพาะข้อที่เลือก'), (SCOPE_FILTER, 'ทุกข้อที่ตรงกับตัวกรอง')),
+        initial=SCOPE_SELECTED,
+    )
+    # ความเป็นเจ้าของของ id ตรวจตอนเลือกคำถาม (bulk.selected_questions)
+    question_ids = IdListField(required=False)
+    filter_query = forms.CharField(required=False, widget=forms.HiddenInput)
+    learning_unit = forms.ModelChoiceField(
+        label="หน่วยการเรียนรู้ใหม่", queryset=LearningUnit.objects.none(), required=False,
+        empty_label="-- เลือกหน่วยการเรียนรู้ --",
+    )
+    bloom_level = forms.ChoiceField(
+        label="ระดับการเรียนรู้ใหม่", choices=[('', '-- เลือกระดับ --')] + Question.BloomLevel.choices, required=False,
+    )
+    difficulty_level = forms.FloatField(label="ค่าความยากใหม่ (p)", min_value=0.0, max_value=1.0, required=False)
+
+    def __init__(self, user, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['learning_unit'].queryset = LearningUnit.objects.filter(course__teacher=user).select_related('course')
+        for field in self.fields.values():
+            if isinstance(field.widget, (forms.Select, forms.NumberInput)):
+                field.widget.attrs.update({'class': 'w-full p-2 border border-gray-300 rounded-md'})
+
+    def clean(self):
+        cleaned_data = super().clean()
+        action = cleaned_data.get('action')
+        required = {
+            BulkQuestionJob.Action.MOVE: 'learning_unit',
+            BulkQuestionJob.Action.BLOOM: 'bloom_level',
+            BulkQuestionJob.Action.DIFFICULTY: 'difficulty_level',
+        }.get(action)
+        if required and cleaned_data.get(required) in (None, ''):
+            self.add_error(required, 'กรุณาระบุค่าใหม่สำหรับการดำเนินการนี้')
+        if cleaned_data.get('scope') == self.SCOPE_SELECTED and not cleaned_data.get('question_ids'):
+            raise ValidationError('กรุณาเลือกคำถามอย่างน้อย 1 ข้อ')
+        return cleaned_data
+
+    def job_value(self):
+        action = self.cleaned_data['action']
+        if action == BulkQuestionJob.Action.MOVE:
+            return self.cleaned_data['learning_unit'].pk
+        if action == BulkQuestionJob.Action.BLOOM:
+            return self.cleaned_data['bloom_level']
+        if action == BulkQuestionJob.Action.DIFFICULTY:
+            return round(self.cleaned_data['difficulty_level'], 2)
+        return None
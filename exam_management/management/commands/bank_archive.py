@@ -0,0 +1,59 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import CustomUser
+from exam_management.backup import BackupError, export_backup, restore_backup
+
+
+class Command(BaseCommand):
+    help = (
+        'Backs up question banks to one .tar.gz archive (taxonomy, courses, units, questions, choices, '
+        'exams as JSON Lines plus each image once) with "export", and restores such an archive with "import".'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['export', 'import'])
+        parser.add_argument('archive', help='Archive path, or "-" for standard output / input.')
+        parser.add_argument(
+            '--teacher', action='append', default=[],
+            help='export: only the bank of this teacher (username; repeatable). Default: every teacher.',
+        )
+        parser.add_argument(
+            '--owner',
+            help='import: give every restored course, question and exam to this user '
+                 '(default: match the archived usernames).',
+        )
+
+    def _user(self, username):
+        try:
+            return CustomUser.objects.get(username=username)
+        except CustomUser.DoesNotExist:
+            raise CommandError(f'User {username} does not exist.')
+
+    def handle(self, *args, **options):
+        std_stream = options['archive'] == '-'
+        # เมื่อเขียนไฟล์ออกทาง stdout ต้องส่งข้อความสรุปไปทาง stderr
+        report = self.stderr if std_stream and options['action'] == 'export' else self.stdout
+
+        try:
+            if options['action'] == 'export':
+                teachers = [self._user(username) for username in options['teacher']] or None
+                if std_stream:
+                    result = export_backup(sys.stdout.buffer, teachers)
+                else:
+                    with open(options['archive'], 'wb') as file:
+                        result = export_backup(file, teachers)
+            else:
+                owner = self._user(options['owner']) if options['owner'] else None
+                if std_stream:
+                    result = restore_backup(sys.stdin.buffer, owner)
+                else:
+                    with open(options['archive'], 'rb') as file:
+                        result = restore_backup(file, owner)
+        except BackupError as exc:
+            raise CommandError(str(exc))
+
+        counts = ', '.join(f'{name} {count}' for name, count in result.counts.items())
+        verb = 'Exported' if options['action'] == 'export' else 'Restored'
+        report.write(self.style.SUCCESS(f'{verb} {counts}; images {result.images} in {result.seconds:.1f}s.'))
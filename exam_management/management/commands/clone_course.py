@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from accounts.models import CustomUser
+from core.models import Course
+from exam_management.cloning import clone_course, clone_course_content
+
+
+class Command(BaseCommand):
+    help = (
+        'Deep-copies a course (learning units, questions, choices, short answers) into a new '
+        'course, of the same teacher or of another one, or into an existing course.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_id', type=int, help='Id of the course to copy.')
+        parser.add_argument('--teacher', help='Username of the teacher who gets the copy (default: the same teacher).')
+        parser.add_argument('--code', help='Course code of the new course (default: the same code).')
+        parser.add_argument('--into', type=int, help='Copy into this existing course instead of creating one.')
+
+    def handle(self, *args, **options):
+        try:
+            source = Course.objects.select_related('teacher', 'subject_template', 'grade_level').get(pk=options['course_id'])
+        except Course.DoesNotExist:
+            raise CommandError(f"Course {options['course_id']} does not exist.")
+
+        if options['into']:
+            try:
+                target = Course.objects.get(pk=options['into'])
+            except Course.DoesNotExist:
+                raise CommandError(f"Course {options['into']} does not exist.")
+            result = clone_course_content(source, target)
+        else:
+            teacher = source.teacher
+            if options['teacher']:
+                try:
+                    teacher = CustomUser.objects.get(username=options['teacher'])
+                except CustomUser.DoesNotExist:
+                    raise CommandError(f"User {options['teacher']} does not exist.")
+            try:
+                result = clone_course(source, teacher, options['code'] or source.course_code)
+            except IntegrityError:
+                raise CommandError(f'{teacher} already has a course with this code; pass --code.')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Copied into "{result.course}" (id {result.course.pk}): {result.units} units, '
+            f'{result.questions} questions, {result.choices} choices, {result.short_answers} short answers '
+            f'in {result.seconds:.2f}s.'
+        ))
@@ -0,0 +1,44 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Course
+from exam_management.exporters import EXPORTERS, course_bank_source, exam_source, export_to_file
+from exam_management.models import Exam
+from exam_management.utils import DEFAULT_PDF_LAYOUT, PDF_LAYOUTS
+
+
+class Command(BaseCommand):
+    help = (
+        'Exports an exam (its published snapshot) or the whole question bank of a course in one of '
+        'the registered formats. Streaming formats are written as they are read.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('format', choices=list(EXPORTERS))
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument('--exam', type=int, help='Id of the exam to export.')
+        source.add_argument('--course', type=int, help='Id of the course whose question bank is exported.')
+        parser.add_argument('--output', help='Output file (default: standard output).')
+        parser.add_argument('--choice-format', choices=['thai', 'eng'], default='thai')
+        parser.add_argument('--layout', choices=list(PDF_LAYOUTS), default=DEFAULT_PDF_LAYOUT, help='PDF layout.')
+
+    def handle(self, *args, **options):
+        if options['exam']:
+            try:
+                source = exam_source(Exam.objects.select_related('course').get(pk=options['exam']))
+            except Exam.DoesNotExist:
+                raise CommandError(f"Exam {options['exam']} does not exist.")
+        else:
+            try:
+                source = course_bank_source(Course.objects.get(pk=options['course']))
+            except Course.DoesNotExist:
+                raise CommandError(f"Course {options['course']} does not exist.")
+
+        export_options = {'choice_format': options['choice_format'], 'layout': options['layout']}
+        if options['output']:
+            with open(options['output'], 'wb') as file:
+                export_to_file(source, options['format'], file, export_options)
+            self.stdout.write(self.style.SUCCESS(f"Exported to {options['output']}"))
+        else:
+            export_to_file(source, options['format'], sys.stdout.buffer, export_options)
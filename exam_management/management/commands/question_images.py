@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from exam_management.models import Question
+from exam_management.storage import collect_orphans, migrate_legacy_images, referenced_images, stored_images
+
+
+class Command(BaseCommand):
+    help = (
+        'Maintains the content-addressed question image store: "stats" reports usage, '
+        '"migrate" moves images saved under their upload names to content-addressed names, '
+        '"gc" deletes files that no question or published exam refers to.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['stats', 'migrate', 'gc'])
+        parser.add_argument('--dry-run', action='store_true', help='gc: only list the orphaned files.')
+        parser.add_argument(
+            '--grace-hours', type=float, default=24,
+            help='gc: keep unreferenced files younger than this (uploads still in progress).',
+        )
+
+    def handle(self, *args, **options):
+        field = Question._meta.get_field('image')
+        storage, directory = field.storage, field.upload_to
+
+        if options['action'] == 'migrate':
+            updated, moved = migrate_legacy_images(storage)
+            self.stdout.write(self.style.SUCCESS(f'Moved {moved} file(s); repointed {updated} question(s).'))
+        elif options['action'] == 'gc':
+            orphans = collect_orphans(
+                storage, directory, grace_seconds=options['grace_hours'] * 3600, dry_run=options['dry_run'],
+            )
+            for name in orphans:
+                self.stdout.write(name)
+            verb = 'Found' if options['dry_run'] else 'Deleted'
+            self.stdout.write(self.style.SUCCESS(f'{verb} {len(orphans)} orphaned file(s).'))
+        else:
+            files = list(stored_images(storage, directory))
+            referenced = referenced_images()
+            size = sum(storage.size(name) for name, _ in files)
+            hashed = sum(1 for name, _ in files if storage.is_hashed_name(name))
+            unreferenced = sum(1 for name, _ in files if name not in referenced)
+            self.stdout.write(
+                f'{len(files)} file(s), {size / 1024 / 1024:.1f} MB; {hashed} content-addressed, '
+                f'{len(files) - hashed} legacy; {unreferenced} unreferenced.'
+            )
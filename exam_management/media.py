@@ -0,0 +1,162 @@
+"""
+Delivery of question images (``MEDIA_URL``), in production as well as DEBUG.
+
+* Permission: image URLs produced by ``ContentAddressedStorage.url`` carry a
+  signature, so whoever was allowed to see a page (a teacher's exam, a
+  student's online exam) can load its images without a query per image. The
+  signature expires after ``QUESTION_IMAGE_URL_MAX_AGE``, so a leaked URL
+  stops working; responses to signed URLs are cached privately for no longer.
+  Unsigned requests are only served to the admin or to the teacher whose
+  questions or published exams use the file. Only ``question_images/`` is
+  served; other uploads (e.g. grading files) are never exposed here.
+* Caching: content-addressed files never change, so they get a strong ETag
+  (the content hash), ``immutable`` and a one-year max-age; a repeat visit of
+  a page full of images costs no request at all. Legacy, upload-named files
+  get a hash ETag and a short max-age.
+* Conditional GET (If-None-Match / If-Modified-Since -> 304) and single byte
+  ranges (206) are handled here; the body goes through ``FileResponse``
+  (``wsgi.file_wrapper``/sendfile) or, with ``MEDIA_SENDFILE_HEADER``, is
+  handed to the front-end server (X-Accel-Redirect / X-Sendfile).
+"""
+import hashlib
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
+
+from .models import Question, SnapshotImage
+from .storage import has_valid_signature
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+LEGACY_MAX_AGE = 60 * 60
+RANGE_CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# ==============================================================================
+# Permission
+# ==============================================================================
+
+def user_can_view_image(user, name):
+    if not user.is_authenticated:
+        return False
+    if user.role == 'ADMIN':
+        return True
+    return (
+        Question.objects.filter(image=name, created_by=user).exists()
+        or SnapshotImage.objects.filter(name=name, snapshot__revisions__exam__created_by=user).exists()
+    )
+
+# ==============================================================================
+# Responses
+# ==============================================================================
+
+def image_etag(storage, name, stat):
+    """The SHA-256 of the content: taken from the name when content-addressed, else computed once per file version."""
+    if storage.is_hashed_name(name):
+        return os.path.splitext(os.path.basename(name))[0]
+    key = f'media-etag:{hashlib.md5(name.encode()).hexdigest()}:{stat.st_size}:{int(stat.st_mtime)}'
+    etag = cache.get(key)
+    if etag is None:
+        sha256 = hashlib.sha256()
+        with storage.open(name) as content:
+            for chunk in content.chunks():
+                sha256.update(chunk)
+        etag = sha256.hexdigest()
+        cache.set(key, etag, None)
+    return etag
+
+
+def _requested_range(request, size, etag):
+    """``(start, end)`` of a satisfiable single byte range, None for the whole file, or False if unsatisfiable."""
+    header = request.headers.get('Range', '')
+    match = RANGE_RE.match(header.strip())
+    if not match or not any(match.groups()):
+        return None
+    if_range = request.headers.get('If-Range')
+    if if_range and if_range.strip() != quote_etag(etag):
+        return None
+    first, last = match.groups()
+    if first:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    else:
+        start, end = max(size - int(last), 0), size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _file_slice(path, start, length):
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        while length > 0:
+            chunk = handle.read(min(RANGE_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _sendfile_response(storage, name):
+    header = settings.MEDIA_SENDFILE_HEADER
+    response = HttpResponse()
+    response[header] = storage.path(name) if header.lower() == 'x-sendfile' else settings.MEDIA_SENDFILE_PREFIX + name
+    return response
+
+
+@require_safe
+def serve_question_image(request, name):
+    """Serves one question image from ``MEDIA_ROOT``; see the module docstring."""
+    storage = Question._meta.get_field('image').storage
+    if not name.startswith(Question._meta.get_field('image').upload_to):
+        raise Http404
+    signed = has_valid_signature(name, request.GET.get('s'))
+    if not signed and not user_can_view_image(request.user, name):
+        raise Http404
+    try:
+        path = storage.path(name)
+        stat = os.stat(path)
+    except (SuspiciousFileOperation, FileNotFoundError, NotADirectoryError):
+        raise Http404
+
+    etag = image_etag(storage, name, stat)
+    immutable = storage.is_hashed_name(name)
+    not_modified = get_conditional_response(request, etag=quote_etag(etag), last_modified=int(stat.st_mtime))
+    if not_modified is not None:
+        response = not_modified
+    else:
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        byte_range = _requested_range(request, stat.st_size, etag)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+        elif byte_range:
+            start, end = byte_range
+            response = StreamingHttpResponse(_file_slice(path, start, end - start + 1), status=206, content_type=content_type)
+            response['Content-Length'] = end - start + 1
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        elif settings.MEDIA_SENDFILE_HEADER:
+            response = _sendfile_response(storage, name)
+            response['Content-Type'] = content_type
+        else:
+            response = FileResponse(open(path, 'rb'), content_type=content_type)
+        response['Accept-Ranges'] = 'bytes'
+        response['Last-Modified'] = http_date(stat.st_mtime)
+
+    response['ETag'] = quote_etag(etag)
+    # รูปข้อสอบเป็นข้อมูลเฉพาะผู้มีสิทธิ์: ให้ browser เก็บ cache ได้ แต่ไม่ให้ proxy กลางทางเก็บ
+    max_age = IMMUTABLE_MAX_AGE if immutable else LEGACY_MAX_AGE
+    if signed:
+        # สิทธิ์มาจากลายเซ็นที่มีอายุ: cache ใน browser ได้ไม่นานกว่าอายุของลายเซ็น
+        max_age = min(max_age, settings.QUESTION_IMAGE_URL_MAX_AGE)
+    if immutable:
+        patch_cache_control(response, private=True, max_age=max_age, immutable=True)
+    else:
+        patch_cache_control(response, private=True, max_age=max_age)
+    return response
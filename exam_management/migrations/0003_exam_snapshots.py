@@ -0,0 +1,56 @@
+# Generated by Django 5.0.6 on 2026-10-19 14:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exam_management', '0002_question_image_alter_question_question_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('data', models.BinaryField()),
+                ('size', models.PositiveIntegerField(help_text='ขนาดก่อนบีบอัด (ไบต์)')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='exam',
+            name='published_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='exam',
+            name='snapshot',
+            field=models.ForeignKey(blank=True, help_text='ฉบับที่เผยแพร่ล่าสุด ซึ่งใช้แสดงผล ส่งออก และสอบออนไลน์', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='exam_management.examsnapshot'),
+        ),
+        migrations.CreateModel(
+            name='ExamRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('published_at', models.DateTimeField(auto_now_add=True)),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='exam_management.exam')),
+                ('published_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='revisions', to='exam_management.examsnapshot')),
+            ],
+            options={
+                'ordering': ['exam', '-number'],
+                'unique_together': {('exam', 'number')},
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.6 on 2026-10-19 14:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exam_management', '0003_exam_snapshots'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BulkQuestionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('MOVE', 'ย้ายไปหน่วยการเรียนรู้'), ('BLOOM', 'เปลี่ยนระดับการเรียนรู้ (Bloom)'), ('DIFFICULTY', 'เปลี่ยนค่าความยาก (p)'), ('DELETE', 'ลบคำถาม')], max_length=20)),
+                ('value', models.JSONField(blank=True, null=True)),
+                ('question_ids', models.JSONField(default=list)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('processed', models.PositiveIntegerField(default=0)),
+                ('affected', models.PositiveIntegerField(default=0, help_text='จำนวนคำถามที่ถูกแก้ไขหรือลบจริง')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bulk_question_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
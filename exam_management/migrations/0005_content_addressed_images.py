@@ -0,0 +1,57 @@
+# Generated by Django 5.0.6 on 2026-10-19 14:46
+
+import json
+import zlib
+
+import django.db.models.deletion
+import exam_management.storage
+from django.db import migrations, models
+
+
+# Frozen copies of exam_management.snapshots.decode_snapshot() and snapshot_images(),
+# so later changes to that module cannot break this migration.
+def decode_snapshot(blob):
+    return json.loads(zlib.decompress(bytes(blob)).decode('utf-8'))
+
+
+def snapshot_images(content):
+    return {question['image'] for question in content['questions'] if question['image']}
+
+
+def index_snapshot_images(apps, schema_editor):
+    """Records the images of the snapshots published before image references were tracked."""
+    ExamSnapshot = apps.get_model('exam_management', 'ExamSnapshot')
+    SnapshotImage = apps.get_model('exam_management', 'SnapshotImage')
+    db = schema_editor.connection.alias
+    for snapshot_id, data in ExamSnapshot.objects.using(db).values_list('id', 'data').iterator(chunk_size=100):
+        names = snapshot_images(decode_snapshot(data))
+        SnapshotImage.objects.using(db).bulk_create([SnapshotImage(snapshot_id=snapshot_id, name=name) for name in names])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exam_management', '0004_bulk_question_jobs'),
+        # snapshots that online sittings created during their own migration must be indexed too
+        ('online_exams', '0002_sitting_exam_snapshot'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='question',
+            name='image',
+            field=models.ImageField(blank=True, db_index=True, null=True, storage=exam_management.storage.question_image_storage, upload_to='question_images/', verbose_name='รูปภาพประกอบ'),
+        ),
+        migrations.CreateModel(
+            name='SnapshotImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(db_index=True, max_length=255)),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='images', to='exam_management.examsnapshot')),
+            ],
+            options={
+                'unique_together': {('snapshot', 'name')},
+            },
+        ),
+        migrations.RunPython(index_snapshot_images, migrations.RunPython.noop),
+    ]
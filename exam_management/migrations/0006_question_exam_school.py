@@ -0,0 +1,39 @@
+# Generated by Django 5.0.6 on 2026-10-19 15:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_schools'),
+        ('exam_management', '0005_content_addressed_images'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='school',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.school', verbose_name='โรงเรียน'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='school',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.school', verbose_name='โรงเรียน'),
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['school', 'created_by', 'created_at'], name='exam_school_creator_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['school', 'created_by'], name='question_school_creator_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['school', 'learning_unit'], name='question_school_unit_idx'),
+        ),
+    ]
@@ -1,8 +1,9 @@
 from django.db import models
 from accounts.models import CustomUser
-from core.models import Course, LearningUnit # Updated import
+from core.models import Course, LearningUnit, TenantModel # Updated import
+from .storage import question_image_storage
 
-class Question(models.Model):
+class Question(TenantModel):
     """
     Represents a single question in the question bank.
     This model is now indirectly linked to Course via LearningUnit.
@@ -35,9 +36,11 @@ class Question(models.Model):
         verbose_name="ระดับการเรียนรู้ (Bloom)"
     )
     image = models.ImageField(
-        upload_to='question_images/', # <-- ไฟล์จะถูกเก็บใน media/question_images/
+        upload_to='question_images/', # <-- ไฟล์จะถูกเก็บใน media/question_images/<hash>
+        storage=question_image_storage, # เก็บตาม SHA-256 ของเนื้อไฟล์ รูปซ้ำเก็บครั้งเดียว
         blank=True, 
         null=True,
+        db_index=True,
         verbose_name="รูปภาพประกอบ"
     )
     explanation = models.TextField(blank=True, null=True)
@@ -48,6 +51,15 @@ class Question(models.Model):
     )
     created_by = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    school_source = 'learning_unit__course__school'
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['school', 'created_by'], name='question_school_creator_idx'),
+            models.Index(fields=['school', 'learning_unit'], name='question_school_unit_idx'),
+        ]
 
     @property
     def get_difficulty_category(self):
@@ -93,7 +105,7 @@ class ShortAnswer(models.Model):
     def __str__(self):
         return self.answer_text
 
-class Exam(models.Model):
+class Exam(TenantModel):
     """
     Represents a set of questions compiled into an exam.
     This model now directly links to a Course, which defines the
@@ -104,6 +116,101 @@ class Exam(models.Model):
     created_by = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
     questions = models.ManyToManyField(Question, related_name='exams')
+    snapshot = models.ForeignKey(
+        'ExamSnapshot', on_delete=models.PROTECT, null=True, blank=True, related_name='+',
+        help_text="ฉบับที่เผยแพร่ล่าสุด ซึ่งใช้แสดงผล ส่งออก และสอบออนไลน์",
+    )
+    published_at = models.DateTimeField(null=True, blank=True)
+
+    school_source = 'course__school'
+
+    class Meta:
+        indexes = [models.Index(fields=['school', 'created_by', 'created_at'], name='exam_school_creator_idx')]
+
+    def __str__(self):
+        return f"{self.exam_name} ({self.course.course_code})"
+
+class ExamSnapshot(models.Model):
+    """
+    A frozen, content-addressed copy of an exam's questions, choices, answers
+    and image references: zlib-compressed canonical JSON keyed by its SHA-256.
+    Identical content is stored only once, whichever exam publishes it.
+    See exam_management.snapshots.
+    """
+    digest = models.CharField(max_length=64, unique=True)
+    data = models.BinaryField()
+    size = models.PositiveIntegerField(help_text="ขนาดก่อนบีบอัด (ไบต์)")
+    created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"{self.exam_name} ({self.course.course_code})"
\ No newline at end of file
+        return self.digest[:12]
+
+class SnapshotImage(models.Model):
+    """
+    An image file referenced by an ExamSnapshot. Kept alongside the blob so
+    image garbage collection can tell which files published exams still
+    need without decoding every snapshot.
+    """
+    snapshot = models.ForeignKey(ExamSnapshot, on_delete=models.CASCADE, related_name='images')
+    name = models.CharField(max_length=255, db_index=True)
+
+    class Meta:
+        unique_together = ('snapshot', 'name')
+
+    def __str__(self):
+        return self.name
+
+class ExamRevision(models.Model):
+    """
+    Publication history of an Exam: every time its content changes and it is
+    published again, a new numbered revision points at the new snapshot.
+    """
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE, related_name='revisions')
+    snapshot = models.ForeignKey(ExamSnapshot, on_delete=models.PROTECT, related_name='revisions')
+    number = models.PositiveIntegerField()
+    published_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True)
+    published_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('exam', 'number')
+        ordering = ['exam', '-number']
+
+    def __str__(self):
+        return f"{self.exam.exam_name} r{self.number}"
+
+class BulkQuestionJob(models.Model):
+    """
+    One bulk action over a teacher's questions (move to another unit, change
+    the Bloom or difficulty level, delete). The selection is resolved to ids
+    when the job is created, then applied chunk by chunk so large selections
+    can report progress. See exam_management.bulk.
+    """
+    class Action(models.TextChoices):
+        MOVE = 'MOVE', 'ย้ายไปหน่วยการเรียนรู้'
+        BLOOM = 'BLOOM', 'เปลี่ยนระดับการเรียนรู้ (Bloom)'
+        DIFFICULTY = 'DIFFICULTY', 'เปลี่ยนค่าความยาก (p)'
+        DELETE = 'DELETE', 'ลบคำถาม'
+
+    created_by = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='bulk_question_jobs')
+    action = models.CharField(max_length=20, choices=Action.choices)
+    value = models.JSONField(null=True, blank=True)
+    question_ids = models.JSONField(default=list)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    affected = models.PositiveIntegerField(default=0, help_text="จำนวนคำถามที่ถูกแก้ไขหรือลบจริง")
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_action_display()} ({self.processed}/{self.total})"
+
+    @property
+    def is_done(self):
+        return self.processed >= self.total
+
+    @property
+    def percent(self):
+        return 100 if not self.total else int(self.processed * 100 / self.total)
@@ -0,0 +1,281 @@
+"""
+PDF export of exams with ReportLab. Imported on first use through
+``exam_management.utils``, so workers and management commands that never
+export do not load ReportLab or register the Thai fonts.
+
+Exams are laid out on A4 with platypus: every question (text, image and
+choices) is a flowable that is measured before it is placed, so a question
+moves to the next column or page only when it really does not fit. The
+layouts in ``utils.PDF_LAYOUTS`` choose one or two columns and whether short
+choices are set side by side (4 or 2 per row) instead of one per line.
+
+``render_pdf_exam`` walks the questions once and builds any of the outputs in
+``utils.PDF_PARTS`` together: the student booklet, the answer key and the
+explanation booklet. The question paragraphs (markup parsed once) and the
+measured images are shared by the booklets that show them.
+"""
+import io
+from functools import cache
+from xml.sax.saxutils import escape
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfbase import pdfmetrics
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import (
+    BaseDocTemplate, Flowable, Frame, Image as ReportLabImage, Indenter, KeepTogether, NextPageTemplate,
+    PageTemplate, Paragraph, Spacer,
+)
+from reportlab.lib.units import inch
+
+from .snapshots import NO_KEY, get_exam_snapshot, image_storage
+from .utils import DEFAULT_PDF_LAYOUT, PDF_LAYOUTS, PDF_PARTS, choice_label
+
+PAGE_SIZE = A4
+MARGIN = 0.75 * inch
+COLUMN_GAP = 0.3 * inch
+HEADER_HEIGHT = 42
+QUESTION_INDENT = 0.2 * inch
+CHOICE_INDENT = 0.4 * inch
+MAX_IMAGE_WIDTH = 3 * inch
+# ระยะห่างขั้นต่ำระหว่างตัวเลือกที่วางเรียงกันในแถวเดียว
+CHOICE_CELL_PADDING = 12
+# หน้าเฉลย: คำตอบสั้นๆ เรียง 4 คอลัมน์
+KEY_LAYOUT = {'columns': 4, 'compact_choices': False}
+PART_TITLES = {'student': 'ชุดข้อสอบ', 'key': 'เฉลยชุดข้อสอบ', 'explanations': 'คำอธิบายเฉลย'}
+
+# ==============================================================================
+# Font Setup for ReportLab (PDF Generation)
+# ==============================================================================
+
+@cache
+def register_thai_fonts():
+    """Registers 'ThaiFont' and 'ThaiFont-Bold' once per process. Returns False if the font files are missing."""
+    try:
+        font_path = 'static/fonts/THSarabunNew.ttf'
+        pdfmetrics.registerFont(TTFont('ThaiFont', font_path))
+        pdfmetrics.registerFont(TTFont('ThaiFont-Bold', font_path.replace(".ttf", " Bold.ttf")))
+        return True
+    except Exception as e:
+        print(f"Warning: Could not load Thai font for PDF generation. Error: {e}")
+        return False
+
+
+@cache
+def get_styles():
+    styles = getSampleStyleSheet()
+    if register_thai_fonts():
+        styles.add(ParagraphStyle(name='ThaiBody', fontName='ThaiFont', fontSize=12, leading=14))
+        styles.add(ParagraphStyle(name='ThaiHeader', fontName='ThaiFont-Bold', fontSize=16, leading=18, spaceAfter=6))
+        styles.add(ParagraphStyle(name='ThaiSubHeader', fontName='ThaiFont', fontSize=12, leading=14, spaceAfter=6))
+        styles.add(ParagraphStyle(name='ThaiQuestion', fontName='ThaiFont', fontSize=12, leading=14, leftIndent=inch*0.2))
+        styles.add(ParagraphStyle(name='ThaiChoice', fontName='ThaiFont', fontSize=12, leading=14, leftIndent=inch*0.4))
+        styles.add(ParagraphStyle(name='ThaiChoiceCell', fontName='ThaiFont', fontSize=12, leading=14))
+        styles.add(ParagraphStyle(name='ThaiAnswer', fontName='ThaiFont-Bold', fontSize=12, leading=14, leftIndent=inch*0.4))
+        styles.add(ParagraphStyle(name='ThaiExplanation', fontName='ThaiFont', fontSize=12, leading=14, leftIndent=inch*0.4))
+    else:
+        styles.add(ParagraphStyle(name='ThaiBody', parent=styles['BodyText']))
+        styles.add(ParagraphStyle(name='ThaiHeader', parent=styles['h2']))
+        styles.add(ParagraphStyle(name='ThaiSubHeader', parent=styles['h3']))
+        styles.add(ParagraphStyle(name='ThaiQuestion', parent=styles['BodyText'], leftIndent=inch*0.2))
+        styles.add(ParagraphStyle(name='ThaiChoice', parent=styles['BodyText'], leftIndent=inch*0.4))
+        styles.add(ParagraphStyle(name='ThaiChoiceCell', parent=styles['BodyText']))
+        styles.add(ParagraphStyle(name='ThaiAnswer', parent=styles['BodyText'], fontName='Helvetica-Bold', leftIndent=inch*0.4))
+        styles.add(ParagraphStyle(name='ThaiExplanation', parent=styles['BodyText'], leftIndent=inch*0.4))
+    return styles
+
+# ==============================================================================
+# PDF Layout
+# ==============================================================================
+
+def _frames(layout, header_height=0):
+    """The column frames of one page, below a first-page header of ``header_height``."""
+    width, height = PAGE_SIZE
+    columns = layout['columns']
+    column_width = (width - 2 * MARGIN - (columns - 1) * COLUMN_GAP) / columns
+    frame_height = height - 2 * MARGIN - header_height
+    return [
+        Frame(MARGIN + i * (column_width + COLUMN_GAP), MARGIN, column_width, frame_height,
+              id=f'column{i}', leftPadding=0, rightPadding=0, topPadding=0, bottomPadding=0)
+        for i in range(columns)
+    ]
+
+
+def _indented(flowables, indent):
+    return [Indenter(left=indent), *flowables, Indenter(left=-indent)]
+
+
+class _ChoiceGrid(Flowable):
+    """Short choices in ``per_row`` columns, drawn as plain strings: each was measured to fit its cell on one line."""
+
+    def __init__(self, labels, per_row, cell_width, style):
+        super().__init__()
+        self.rows = [labels[k:k + per_row] for k in range(0, len(labels), per_row)]
+        self.cell_width = cell_width
+        self.style = style
+
+    def wrap(self, available_width, available_height):
+        self.width = self.cell_width * len(self.rows[0])
+        self.height = self.style.leading * len(self.rows)
+        return self.width, self.height
+
+    def draw(self):
+        self.canv.setFont(self.style.fontName, self.style.fontSize)
+        for r, row in enumerate(self.rows):
+            y = self.height - r * self.style.leading - self.style.fontSize
+            for c, label in enumerate(row):
+                self.canv.drawString(c * self.cell_width, y, label)
+
+
+def _choice_flowables(labels, styles, width, compact):
+    """
+    One paragraph per choice, or with ``compact`` 4 (or 2) choices per row
+    when the widest choice fits its cell on one line.
+    """
+    if compact and len(labels) > 1:
+        style = styles['ThaiChoiceCell']
+        widest = max(pdfmetrics.stringWidth(label, style.fontName, style.fontSize) for label in labels)
+        available = width - CHOICE_INDENT
+        for per_row in sorted({min(len(labels), 4), 2}, reverse=True):
+            if widest + CHOICE_CELL_PADDING <= available / per_row:
+                return _indented([_ChoiceGrid(labels, per_row, available / per_row, style)], CHOICE_INDENT)
+    return [Paragraph(escape(label), styles['ThaiChoice']) for label in labels]
+
+
+class _FileImage(ReportLabImage):
+    """Drawn by file name: the canvas then embeds each file once, however many questions use it."""
+
+    def draw(self):
+        self.canv.drawImage(
+            self.filename, getattr(self, '_offs_x', 0), getattr(self, '_offs_y', 0),
+            self.drawWidth, self.drawHeight, mask=self._mask,
+        )
+
+
+class _Images:
+    """Measures each image once per export and scales it to the column width, keeping its aspect ratio."""
+
+    def __init__(self, width):
+        self.storage = image_storage()
+        self.width = min(MAX_IMAGE_WIDTH, width - QUESTION_INDENT)
+        self.sizes = {}
+
+    def flowable(self, name):
+        if name not in self.sizes:
+            path = self.storage.path(name)
+            image_width, image_height = ImageReader(path).getSize()
+            self.sizes[name] = (path, image_height / image_width)
+        path, ratio = self.sizes[name]
+        image = _FileImage(path, width=self.width, height=self.width * ratio)
+        image.hAlign = 'LEFT'
+        return image
+
+# ==============================================================================
+# PDF Generation
+# ==============================================================================
+
+def _answer_text(question, choice_format, with_choice_text=True):
+    """The correct choice (label, and its text with ``with_choice_text``) or the short answer; "-" when there is none."""
+    if question['type'] == 'MCQ':
+        key = question['key']
+        if key == NO_KEY or key >= len(question['choices']):
+            return '-'
+        label = choice_label(key, choice_format)
+        return f"{label}. {question['choices'][key]['text']}" if with_choice_text else label
+    return question['answer'] or '-'
+
+
+def _multiline(text):
+    return escape(text).replace('\n', '<br/>')
+
+
+def render_pdf_exam(content, choice_format='thai', layout=DEFAULT_PDF_LAYOUT, parts=tuple(PDF_PARTS)):
+    """
+    Renders ``parts`` (keys of ``PDF_PARTS``) of the snapshot ``content`` as
+    A4 PDFs in one walk over the questions. Returns ``{part: BytesIO}``.
+    Unknown layouts use the default layout.
+    """
+    layout = PDF_LAYOUTS.get(layout, PDF_LAYOUTS[DEFAULT_PDF_LAYOUT])
+    fonts_ok = register_thai_fonts()
+    styles = get_styles()
+    font = 'ThaiFont' if fonts_ok else 'Helvetica'
+    bold_font = 'ThaiFont-Bold' if fonts_ok else 'Helvetica-Bold'
+    width, height = PAGE_SIZE
+
+    def draw_page_number(p, doc):
+        p.setFont(font, 10)
+        p.drawRightString(width - MARGIN, MARGIN / 2, f"หน้า {doc.page}")
+
+    def make_document(part, part_layout):
+        def draw_header(p, doc):
+            p.setFont(bold_font, 16)
+            p.drawString(MARGIN, height - MARGIN - 12, f"{PART_TITLES[part]}: {content['exam_name']}")
+            p.setFont(font, 12)
+            p.drawString(MARGIN, height - MARGIN - 30, f"รายวิชา: {content['course']}")
+            p.line(MARGIN, height - MARGIN - 36, width - MARGIN, height - MARGIN - 36)
+            draw_page_number(p, doc)
+
+        doc = BaseDocTemplate(
+            io.BytesIO(), pagesize=PAGE_SIZE, leftMargin=MARGIN, rightMargin=MARGIN, topMargin=MARGIN,
+            bottomMargin=MARGIN, title=f"{PART_TITLES[part]}: {content['exam_name']}",
+        )
+        doc.addPageTemplates([
+            PageTemplate('first', _frames(part_layout, HEADER_HEIGHT), onPage=draw_header),
+            PageTemplate('later', _frames(part_layout), onPage=draw_page_number),
+        ])
+        return doc
+
+    documents = {part: make_document(part, KEY_LAYOUT if part == 'key' else layout) for part in parts}
+    stories = {part: [NextPageTemplate('later')] for part in parts}
+    column_width = _frames(layout)[0].width
+    images = _Images(column_width)
+
+    for i, question in enumerate(content['questions'], 1):
+        # ย่อหน้าคำถามและรูปสร้างครั้งเดียว ใช้ร่วมกันทั้งชุดข้อสอบและเล่มคำอธิบายเฉลย
+        shared = [Paragraph(escape(f"{i}. {question['text']}"), styles['ThaiQuestion']), Spacer(1, 4)]
+        if question['image'] and ('student' in stories or 'explanations' in stories):
+            try:
+                shared += _indented([images.flowable(question['image'])], QUESTION_INDENT) + [Spacer(1, 4)]
+            except Exception as e:
+                print(f"Error adding image to PDF: {e}")
+                shared.append(Paragraph(escape(f"[ไม่สามารถแทรกรูปภาพ: {question['image']}]"), styles['ThaiChoice']))
+
+        if 'student' in stories:
+            block = list(shared)
+            if question['type'] == 'MCQ':
+                labels = [f"{choice_label(j, choice_format)}. {choice['text']}" for j, choice in enumerate(question['choices'])]
+                block += _choice_flowables(labels, styles, column_width, layout['compact_choices'])
+            # ข้อเดียวกันไม่ถูกตัดข้ามคอลัมน์/หน้า (ยกเว้นข้อที่ยาวเกินหนึ่งคอลัมน์)
+            stories['student'] += [KeepTogether(block), Spacer(1, 10)]
+
+        if 'key' in stories:
+            answer = _answer_text(question, choice_format, with_choice_text=False)
+            stories['key'].append(Paragraph(escape(f"{i}. {answer}"), styles['ThaiBody']))
+
+        if 'explanations' in stories:
+            block = list(shared) + [Paragraph(escape(f"คำตอบ: {_answer_text(question, choice_format)}"), styles['ThaiAnswer'])]
+            if question['explanation']:
+                block.append(Paragraph(_multiline(question['explanation']), styles['ThaiExplanation']))
+            stories['explanations'] += [KeepTogether(block), Spacer(1, 10)]
+
+    outputs = {}
+    for part, doc in documents.items():
+        doc.build(stories[part])
+        doc.filename.seek(0)
+        outputs[part] = doc.filename
+    return outputs
+
+
+def generate_pdf_exam(exam, choice_format='thai', layout=DEFAULT_PDF_LAYOUT):
+    """
+    Generates an A4 PDF file (the student booklet) for a given Exam object,
+    including images, in one of ``PDF_LAYOUTS``.
+    The content comes from the exam's published snapshot.
+    """
+    return render_pdf_exam(get_exam_snapshot(exam), choice_format, layout, parts=['student'])['student']
+
+
+def generate_pdf_exam_set(exam, choice_format='thai', layout=DEFAULT_PDF_LAYOUT, parts=tuple(PDF_PARTS)):
+    """``{part: BytesIO}`` for the exam's published snapshot; see ``render_pdf_exam``."""
+    return render_pdf_exam(get_exam_snapshot(exam), choice_format, layout, parts)
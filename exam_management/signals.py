@@ -0,0 +1,15 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import Question
+from .storage import delete_if_orphaned
+
+
+@receiver(post_delete, sender=Question)
+def delete_orphaned_image(sender, instance, using, **kwargs):
+    """Removes the question's image file once no other question or published exam uses it."""
+    if instance.image:
+        transaction.on_commit(partial(delete_if_orphaned, instance.image.storage, instance.image.name), using=using)
@@ -0,0 +1,179 @@
+"""
+Published exam snapshots.
+
+An exam is read (detail page, PDF/Word export, answer sheets, grading keys
+and online delivery) from one frozen blob instead of the live question
+graph. The blob is zlib-compressed canonical JSON stored in ExamSnapshot
+under its SHA-256 digest, so identical content is stored once and a given
+snapshot never changes: decoded snapshots are cached by id forever.
+
+Snapshot layout::
+
+    {"format": 1, "exam_name": ..., "course": ...,
+     "questions": [{"id", "type", "text", "image", "explanation",
+                    "choices": [{"id", "text"}, ...], "key", "answer"}, ...]}
+
+``image`` is the storage name of the file, ``key`` the index of the correct
+choice (-1 for non-MCQ items) and ``answer`` the short answer text.
+"""
+import hashlib
+import json
+import zlib
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Max, Prefetch
+from django.utils import timezone
+
+from core.tenancy import current_database
+
+from .models import Choice, ExamRevision, ExamSnapshot, Question, SnapshotImage
+
+SNAPSHOT_FORMAT = 1
+NO_KEY = -1
+
+# ==============================================================================
+# Encoding
+# ==============================================================================
+
+def with_snapshot_data(questions):
+    """``questions`` ordered by id with what ``snapshot_item`` reads: short answers joined, choices prefetched."""
+    return questions.order_by('id').select_related('short_answer').prefetch_related(
+        Prefetch('choices', queryset=Choice.objects.order_by('id'))
+    )
+
+
+def snapshot_item(question):
+    """One question in the snapshot layout (see the module docstring)."""
+    choices = list(question.choices.all()) if question.question_type == Question.QuestionType.MCQ else []
+    short_answer = getattr(question, 'short_answer', None) if question.question_type == Question.QuestionType.SHORT else None
+    return {
+        'id': question.id,
+        'type': question.question_type,
+        'text': question.question_text,
+        'image': question.image.name if question.image else '',
+        'explanation': question.explanation or '',
+        'choices': [{'id': choice.id, 'text': choice.choice_text} for choice in choices],
+        'key': next((index for index, choice in enumerate(choices) if choice.is_correct), NO_KEY),
+        'answer': short_answer.answer_text if short_answer else '',
+    }
+
+
+def build_snapshot(exam):
+    """
+    Serializes the exam as it is right now: questions in printed order (by id)
+    with their choices, correct choice and short answer. Three queries.
+    """
+    return {
+        'format': SNAPSHOT_FORMAT,
+        'exam_name': exam.exam_name,
+        'course': str(exam.course),
+        'questions': [snapshot_item(question) for question in with_snapshot_data(exam.questions.all())],
+    }
+
+def encode_snapshot(content):
+    """Returns ``(digest, compressed blob, uncompressed size)`` of a snapshot dict."""
+    raw = json.dumps(content, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(raw).hexdigest(), zlib.compress(raw, 9), len(raw)
+
+
+def decode_snapshot(blob):
+    return json.loads(zlib.decompress(bytes(blob)).decode('utf-8'))
+
+
+def snapshot_images(content):
+    """Storage names of the images a snapshot refers to."""
+    return {question['image'] for question in content['questions'] if question['image']}
+
+
+def store_snapshot(content):
+    """Saves ``content`` once per digest and returns its ExamSnapshot (without loading ``data``)."""
+    digest, blob, size = encode_snapshot(content)
+    snapshot = ExamSnapshot.objects.defer('data').filter(digest=digest).first()
+    if snapshot is None:
+        try:
+            with transaction.atomic(using=current_database()):
+                snapshot = ExamSnapshot.objects.create(digest=digest, data=blob, size=size)
+                # บันทึกรูปที่ฉบับนี้ใช้ เพื่อไม่ให้ไฟล์ถูกลบตอนเก็บกวาดรูปที่ไม่มีคำถามใช้แล้ว
+                SnapshotImage.objects.bulk_create([
+                    SnapshotImage(snapshot=snapshot, name=name) for name in snapshot_images(content)
+                ])
+        except IntegrityError:
+            snapshot = ExamSnapshot.objects.defer('data').get(digest=digest)
+    return snapshot
+
+# ==============================================================================
+# Publishing
+# ==============================================================================
+
+def publish_exam(exam, user=None):
+    """
+    Freezes the exam's current content. A new ExamRevision is recorded only if
+    the content differs from the last published snapshot. Returns the snapshot.
+    """
+    snapshot = store_snapshot(build_snapshot(exam))
+    with transaction.atomic(using=current_database()):
+        if snapshot.pk != exam.snapshot_id:
+            last = exam.revisions.aggregate(last=Max('number'))['last'] or 0
+            ExamRevision.objects.create(exam=exam, snapshot=snapshot, number=last + 1, published_by=user)
+        exam.snapshot = snapshot
+        exam.published_at = timezone.now()
+        exam.save(update_fields=['snapshot', 'published_at'])
+    return snapshot
+
+
+def load_snapshot(snapshot_id):
+    """The decoded content of an ExamSnapshot. Snapshots are immutable, so the cache never expires."""
+    key = f'exam-snapshot:{snapshot_id}'
+    content = cache.get(key)
+    if content is None:
+        content = decode_snapshot(ExamSnapshot.objects.values_list('data', flat=True).get(pk=snapshot_id))
+        cache.set(key, content, None)
+    return content
+
+
+def get_exam_snapshot(exam):
+    """
+    The published content of an exam. Exams created before snapshots existed
+    are published on first access.
+    """
+    if exam.snapshot_id is None:
+        publish_exam(exam)
+    return load_snapshot(exam.snapshot_id)
+
+
+def has_unpublished_changes(exam, content):
+    """
+    True when the live exam no longer matches its published ``content``:
+    questions were added/removed or edited after publishing.
+    """
+    live_ids = set(exam.questions.values_list('id', flat=True))
+    if live_ids != {question['id'] for question in content['questions']}:
+        return True
+    return bool(exam.published_at) and exam.questions.filter(updated_at__gt=exam.published_at).exists()
+
+# ==============================================================================
+# Display Helpers
+# ==============================================================================
+
+def image_storage():
+    return Question._meta.get_field('image').storage
+
+
+def questions_for_display(content):
+    """
+    Snapshot questions decorated for templates: ``image_url`` and an
+    ``is_correct`` flag on each choice.
+    """
+    storage = image_storage()
+    questions = []
+    for question in content['questions']:
+        questions.append({
+            **question,
+            'image_url': storage.url(question['image']) if question['image'] else '',
+            'choices': [
+                {**choice, 'is_correct': index == question['key']}
+                for index, choice in enumerate(question['choices'])
+            ],
+        })
+    return questions
@@ -0,0 +1,202 @@
+"""
+Content-addressed storage for question images.
+
+An uploaded image is stored under the SHA-256 of its bytes, in sharded
+directories below the field's ``upload_to`` directory::
+
+    question_images/3f/a2/3fa2...e9.png
+
+Saving bytes that are already stored writes nothing and returns the existing
+name, so the same figure uploaded by many teachers, re-uploaded, imported or
+cloned costs disk space once, and names never collide.
+
+References are counted from the database rather than kept in a counter that
+bulk operations could skew: a file is in use while a Question or a published
+ExamSnapshot (``SnapshotImage``) of any school, in any database, refers to it.
+Files are removed when the last question using them is deleted
+(``exam_management.signals``), and ``manage.py question_images gc`` sweeps any
+remaining orphans.
+"""
+import hashlib
+import os
+import posixpath
+import re
+import time
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.core.files.utils import validate_file_name
+from django.core.signing import BadSignature, TimestampSigner, b62_encode
+from django.utils.deconstruct import deconstructible
+
+
+HASHED_NAME_RE = re.compile(r'(^|/)[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(\.[a-z0-9]+)?$')
+MAX_EXTENSION_LENGTH = 10
+
+
+def image_url_period():
+    """Seconds during which ``ContentAddressedStorage.url`` returns the same signed URL."""
+    return max(settings.QUESTION_IMAGE_URL_MAX_AGE // 2, 1)
+
+
+class _PeriodTimestampSigner(TimestampSigner):
+    """Timestamps rounded down to ``image_url_period()``: stable URLs, valid for at least one period."""
+
+    def timestamp(self):
+        period = image_url_period()
+        return b62_encode(int(time.time()) // period * period)
+
+
+_signer = _PeriodTimestampSigner(salt='question-image')
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that names files by the SHA-256 of their content."""
+
+    @staticmethod
+    def content_digest(content):
+        sha256 = hashlib.sha256()
+        for chunk in content.chunks():
+            sha256.update(chunk)
+        content.seek(0)
+        return sha256.hexdigest()
+
+    @staticmethod
+    def hashed_name(name, digest):
+        directory = posixpath.dirname(name.replace('\\', '/'))
+        extension = os.path.splitext(name)[1].lower()
+        if len(extension) > MAX_EXTENSION_LENGTH or not extension[1:].isalnum():
+            extension = ''
+        return posixpath.join(directory, digest[:2], digest[2:4], digest + extension)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, self.content_digest(content))
+        validate_file_name(name, allow_relative_path=True)
+        if self.exists(name):
+            return name
+        return self._save(name, content).replace('\\', '/')
+
+    def is_hashed_name(self, name):
+        return bool(HASHED_NAME_RE.search(name))
+
+    def url(self, name):
+        # URL ที่ลงลายเซ็น (มีอายุ): ผู้ที่เห็นหน้าที่มีรูปนี้ โหลดรูปได้โดยไม่ต้องตรวจสิทธิ์ซ้ำทุกรูป (exam_management.media)
+        # ลายเซ็นคือ "<timestamp>:<signature>" ส่วนท้ายของ sign(name)
+        return f'{super().url(name)}?s={_signer.sign(name)[len(name) + 1:]}'
+
+
+def has_valid_signature(name, signature):
+    """Whether ``signature`` (the ``s`` parameter of a URL from ``url``) is valid for ``name`` and not expired."""
+    try:
+        return bool(signature) and _signer.unsign(
+            f'{name}{_signer.sep}{signature}', max_age=settings.QUESTION_IMAGE_URL_MAX_AGE,
+        ) == name
+    except BadSignature:
+        return False
+
+
+def question_image_storage():
+    return ContentAddressedStorage()
+
+# ==============================================================================
+# References & Garbage Collection
+# ==============================================================================
+
+def _databases():
+    # ไฟล์หนึ่งไฟล์ใช้ร่วมกันได้ทุกโรงเรียน (รวมโรงเรียนที่มีฐานข้อมูลของตัวเอง) จึงนับการอ้างอิงจากทุกฐานข้อมูล
+    return list(settings.DATABASES)
+
+
+def image_reference_count(name):
+    """How many questions and published snapshots of every school and database use the stored file ``name``."""
+    from .models import Question, SnapshotImage
+
+    return sum(
+        Question.unscoped.using(db).filter(image=name).count()
+        + SnapshotImage.objects.using(db).filter(name=name).count()
+        for db in _databases()
+    )
+
+
+def delete_if_orphaned(storage, name):
+    """Deletes the file ``name`` if nothing refers to it any more. Returns True if deleted."""
+    if not name or image_reference_count(name):
+        return False
+    storage.delete(name)
+    return True
+
+
+def referenced_images():
+    """Storage names used by any question or published snapshot, in every database."""
+    from .models import Question, SnapshotImage
+
+    names = set()
+    for db in _databases():
+        names.update(
+            Question.unscoped.using(db).exclude(image='').exclude(image__isnull=True).values_list('image', flat=True)
+        )
+        names.update(SnapshotImage.objects.using(db).values_list('name', flat=True))
+    return names
+
+
+def stored_images(storage, directory):
+    """``(name, modified time)`` of every file below ``directory`` in ``storage``."""
+    root = storage.path(directory)
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            name = os.path.relpath(path, storage.location).replace(os.sep, '/')
+            yield name, os.path.getmtime(path)
+
+
+def collect_orphans(storage, directory, grace_seconds=24 * 60 * 60, dry_run=False):
+    """
+    Deletes files below ``directory`` that no question or snapshot refers to.
+    Files younger than ``grace_seconds`` are kept: they may belong to an
+    upload whose question is not saved yet. Returns the orphan names.
+    """
+    referenced = referenced_images()
+    cutoff = time.time() - grace_seconds
+    orphans = [
+        name for name, modified in stored_images(storage, directory)
+        if name not in referenced and modified < cutoff
+    ]
+    if not dry_run:
+        for name in orphans:
+            storage.delete(name)
+    return orphans
+
+
+def migrate_legacy_images(storage):
+    """
+    Moves question images stored under their upload names into content-addressed
+    names and repoints the questions. The old files stay until ``collect_orphans``
+    finds them unused (published snapshots may still refer to them).
+    Returns ``(questions updated, files moved)``.
+    """
+    from .models import Question
+
+    legacy = {
+        name
+        for db in _databases()
+        for name in Question.unscoped.using(db).exclude(image='').exclude(image__isnull=True)
+        .values_list('image', flat=True).distinct()
+        if not storage.is_hashed_name(name)
+    }
+    updated = moved = 0
+    for name in sorted(legacy):
+        if not storage.exists(name):
+            continue
+        with storage.open(name) as content:
+            new_name = storage.save(name, content)
+        # เนื้อหารูปไม่เปลี่ยน จึงไม่แตะ updated_at (ไม่ทำให้ชุดข้อสอบขึ้นว่ามีการแก้ไข)
+        for db in _databases():
+            updated += Question.unscoped.using(db).filter(image=name).update(image=new_name)
+        moved += 1
+    return updated, moved
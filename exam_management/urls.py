@@ -16,6 +16,8 @@ urlpatterns = [
     path('teacher/courses/new/', CourseCreateView.as_view(), name='course_create'),
     path('teacher/courses/<int:pk>/edit/', CourseUpdateView.as_view(), name='course_update'),
     path('teacher/courses/<int:pk>/delete/', CourseDeleteView.as_view(), name='course_delete'),
+    path('teacher/courses/<int:pk>/clone/', views.course_clone, name='course_clone'),
+    path('teacher/courses/<int:pk>/export/', views.course_export, name='course_export'),
 
     # --- 2. เพิ่ม URLs ใหม่สำหรับ Learning Unit Management ---
     path('teacher/units/', LearningUnitListView.as_view(), name='learning_unit_list'),
@@ -27,9 +29,11 @@ urlpatterns = [
     path('exam/<int:pk>/', views.exam_detail, name='exam_detail'),
     path('exam/create/auto/', views.create_exam_auto, name='create_exam_auto'),
     path('exam/<int:pk>/edit/', ExamUpdateView.as_view(), name='exam_update'),
+    path('exam/<int:pk>/publish/', views.exam_publish, name='exam_publish'),
     path('exam/<int:pk>/delete/', ExamDeleteView.as_view(), name='exam_delete'),
     path('exam/<int:pk>/export/pdf/', views.export_exam_pdf, name='export_pdf'),
     path('exam/<int:pk>/export/word/', views.export_exam_word, name='export_word'),
+    path('exam/<int:pk>/export/', views.export_exam, name='export_exam'),
 
     # ... URLs ของ Question ...
     path('teacher/questions/', views.question_list, name='question_list'),
@@ -37,6 +41,9 @@ urlpatterns = [
     path('teacher/questions/<int:pk>/edit/', views.question_manage_view, name='question_update'),
 
     path('teacher/questions/<int:pk>/delete/', views.question_delete, name='question_delete'),
+    path('teacher/questions/bulk/', views.question_bulk_action, name='question_bulk_action'),
+    path('teacher/questions/bulk/<int:pk>/', views.question_bulk_progress, name='question_bulk_progress'),
+    path('teacher/questions/bulk/<int:pk>/step/', views.question_bulk_step, name='question_bulk_step'),
     path('admin/questions/overview/', AdminQuestionListView.as_view(), name='admin_question_list'),
     path('admin/exams/overview/', AdminExamListView.as_view(), name='admin_exam_list'),
 ]
\ No newline at end of file
@@ -1,22 +1,35 @@
 import random
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse, JsonResponse, QueryDict
+from django.utils.http import content_disposition_header
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin # <-- ตรวจสอบ import
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.contrib import messages
 from django.forms import inlineformset_factory
 from django import forms
+from django.views.decorators.http import require_POST
 
-from .models import Exam, Question, Choice
+from .models import Exam, Question, Choice, BulkQuestionJob
 from core.models import Course, LearningUnit
 from .forms import (
     AutoGenerateExamForm, QuestionForm, ChoiceFormSet, ExamForm,
-    CourseForm, LearningUnitForm, BaseChoiceFormSet
+    CourseForm, CourseCloneForm, LearningUnitForm, BaseChoiceFormSet, BulkQuestionActionForm
 )
-from .utils import generate_pdf_exam, generate_word_exam
+from .utils import (
+    DEFAULT_PDF_LAYOUT, PDF_LAYOUTS, PDF_PARTS, generate_pdf_exam, generate_pdf_exam_set, generate_pdf_exam_zip,
+    generate_word_exam,
+)
+from .exporters import EXPORTERS, course_bank_source, exam_source, export_response
+from .snapshots import publish_exam, get_exam_snapshot, has_unpublished_changes, questions_for_display
 from .filters import QuestionFilter
+from .storage import image_url_period
+from .cloning import clone_course
+from .bulk import BULK_CHUNK_SIZE, selected_questions, create_bulk_job, run_bulk_chunk, run_bulk_job, job_status
+from feedback.profiling import profile_block
+from core.fragment_cache import cached_fragment, cached_value
+from core.lookup_cache import question_namespace, course_namespace, exams_namespace, exam_namespace
 
 # ==============================================================================
 # Mixins & Decorators for Authorization
@@ -60,17 +73,26 @@ def teacher_required(function):
 # Teacher Dashboard
 # ==============================================================================
 
+def teacher_dashboard_content(user):
+    """The stats cards and exam list of a teacher's dashboard, as a cached fragment."""
+    def dashboard_context():
+        return {
+            'exams': list(Exam.objects.filter(created_by=user).select_related('course').order_by('-created_at')),
+            'question_count': Question.objects.filter(created_by=user).count(),
+            'course_count': Course.objects.filter(teacher=user).count(),
+        }
+
+    # แสดงผลใหม่เฉพาะเมื่อชุดข้อสอบ รายวิชา หรือคำถามของครูคนนี้เปลี่ยน (core.signals)
+    return cached_fragment(
+        'teacher-dashboard', 'teacher/_dashboard_content.html', dashboard_context,
+        namespaces=[exams_namespace(user.pk), course_namespace(user.pk), question_namespace(user.pk)],
+        parts=[user.pk],
+    )
+
+
 @teacher_required
 def teacher_dashboard(request):
-    exams = Exam.objects.filter(created_by=request.user).order_by('-created_at')
-    question_count = Question.objects.filter(created_by=request.user).count()
-    course_count = Course.objects.filter(teacher=request.user).count()
-    context = {
-        'exams': exams,
-        'question_count': question_count,
-        'course_count': course_count,
-    }
-    return render(request, 'teacher/dashboard.html', context)
+    return render(request, 'teacher/dashboard.html', {'dashboard_content': teacher_dashboard_content(request.user)})
 
 
 # ==============================================================================
@@ -86,6 +108,11 @@ class CourseListView(TeacherRequiredMixin, ListView):
     def get_queryset(self):
         return Course.objects.filter(teacher=self.request.user).select_related('subject_template', 'grade_level').order_by('course_code')
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['exporters'] = EXPORTERS
+        return context
+
 class CourseCreateView(TeacherRequiredMixin, CreateView):
     model = Course
     form_class = CourseForm
@@ -139,6 +166,31 @@ class CourseDeleteView(TeacherRequiredMixin, DeleteView):
         context['cancel_url'] = self.success_url
         return context
 
+@teacher_required
+def course_clone(request, pk):
+    """
+    Copies one of the teacher's courses, with its learning units, questions,
+    choices and answers, into a new course of the same teacher.
+    """
+    source = get_object_or_404(Course.objects.select_related('subject_template', 'grade_level'), pk=pk, teacher=request.user)
+    if request.method == 'POST':
+        form = CourseCloneForm(request.user, source, request.POST)
+        if form.is_valid():
+            result = clone_course(source, request.user, **form.cleaned_data)
+            messages.success(
+                request,
+                f'คัดลอกรายวิชาเป็น "{result.course.course_code}" สำเร็จ '
+                f'({result.units} หน่วยการเรียนรู้, {result.questions} คำถาม)',
+            )
+            return redirect('course_list')
+    else:
+        form = CourseCloneForm(request.user, source)
+    context = {
+        'form': form,
+        'form_title': f'คัดลอกรายวิชา {source}',
+    }
+    return render(request, 'teacher/course_form.html', context)
+
 
 # ==============================================================================
 # Learning Unit Management (CRUD) Views for Teachers
@@ -228,6 +280,7 @@ def question_list(request):
     context = {
         'filter': question_filter,
         'questions': question_filter.qs,
+        'bulk_form': BulkQuestionActionForm(request.user, initial={'filter_query': request.GET.urlencode()}),
     }
     return render(request, 'teacher/question_list.html', context)
 
@@ -296,6 +349,77 @@ def question_delete(request, pk):
     }
     return render(request, 'teacher/confirm_delete_base.html', context)
 
+# ==============================================================================
+# Bulk Question Operations
+# ==============================================================================
+
+BULK_DONE_MESSAGES = {
+    BulkQuestionJob.Action.MOVE: 'ย้ายคำถาม {} ข้อไปยังหน่วยการเรียนรู้ใหม่แล้ว',
+    BulkQuestionJob.Action.BLOOM: 'เปลี่ยนระดับการเรียนรู้ของคำถาม {} ข้อแล้ว',
+    BulkQuestionJob.Action.DIFFICULTY: 'เปลี่ยนค่าความยากของคำถาม {} ข้อแล้ว',
+    BulkQuestionJob.Action.DELETE: 'ลบคำถาม {} ข้อแล้ว',
+}
+
+def _question_list_url(filter_query=''):
+    url = reverse('question_list')
+    return f'{url}?{filter_query}' if filter_query else url
+
+@teacher_required
+@require_POST
+def question_bulk_action(request):
+    """
+    Starts a bulk action from the question list. Small selections are applied
+    right away; larger ones go to a progress page that applies them chunk by
+    chunk. Clients sending ``Accept: application/json`` get the job status
+    back instead and drive ``question_bulk_step`` themselves.
+    """
+    wants_json = request.headers.get('Accept', '').startswith('application/json')
+    form = BulkQuestionActionForm(request.user, request.POST)
+    if not form.is_valid():
+        if wants_json:
+            return JsonResponse({'errors': form.errors}, status=400)
+        messages.error(request, next(iter(form.errors.values()))[0])
+        return redirect(_question_list_url(request.POST.get('filter_query', '')))
+
+    data = form.cleaned_data
+    if data['scope'] == BulkQuestionActionForm.SCOPE_FILTER:
+        questions = selected_questions(request.user, filter_params=QueryDict(data['filter_query']))
+    else:
+        questions = selected_questions(request.user, question_ids=data['question_ids'])
+    job = create_bulk_job(request.user, data['action'], form.job_value(), questions)
+
+    if wants_json:
+        return JsonResponse(job_status(job), status=201)
+    if job.total == 0:
+        messages.warning(request, 'ไม่พบคำถามตามที่เลือก')
+        return redirect(_question_list_url(data['filter_query']))
+    if job.total <= BULK_CHUNK_SIZE:
+        job = run_bulk_job(job)
+        messages.success(request, BULK_DONE_MESSAGES[job.action].format(job.affected))
+        return redirect(_question_list_url(data['filter_query']))
+    return redirect('question_bulk_progress', pk=job.pk)
+
+@teacher_required
+def question_bulk_progress(request, pk):
+    job = get_object_or_404(BulkQuestionJob, pk=pk, created_by=request.user)
+    context = {
+        'job': job,
+        'chunk_size': BULK_CHUNK_SIZE,
+        'done_message': BULK_DONE_MESSAGES[job.action].format(job.affected),
+    }
+    return render(request, 'teacher/question_bulk_progress.html', context)
+
+@teacher_required
+@require_POST
+def question_bulk_step(request, pk):
+    """Applies the next chunk of a bulk job and returns its status as JSON."""
+    job = get_object_or_404(BulkQuestionJob, pk=pk, created_by=request.user)
+    job = run_bulk_chunk(job)
+    status = job_status(job)
+    if job.is_done:
+        status['message'] = BULK_DONE_MESSAGES[job.action].format(job.affected)
+    return JsonResponse(status)
+
 
 # ==============================================================================
 # Exam Management Views
@@ -323,19 +447,20 @@ def create_exam_auto(request):
             if error_found:
                 return render(request, 'teacher/exam_auto_form.html', {'form': form})
 
-            base_query = Question.objects.filter(
-                learning_unit_id__in=selected_unit_ids,
-                created_by=request.user
-            )
-            
-            easy_qs = list(base_query.filter(difficulty_level__gte=0.70))
-            medium_qs = list(base_query.filter(difficulty_level__gte=0.30, difficulty_level__lt=0.70))
-            hard_qs = list(base_query.filter(difficulty_level__lt=0.30))
-
-            final_qs = []
-            final_qs.extend(random.sample(easy_qs, min(len(easy_qs), data['num_easy'])))
-            final_qs.extend(random.sample(medium_qs, min(len(medium_qs), data['num_medium'])))
-            final_qs.extend(random.sample(hard_qs, min(len(hard_qs), data['num_hard'])))
+            with profile_block(request, 'create_exam_auto_sampling'):
+                base_query = Question.objects.filter(
+                    learning_unit_id__in=selected_unit_ids,
+                    created_by=request.user
+                )
+
+                easy_qs = list(base_query.filter(difficulty_level__gte=0.70))
+                medium_qs = list(base_query.filter(difficulty_level__gte=0.30, difficulty_level__lt=0.70))
+                hard_qs = list(base_query.filter(difficulty_level__lt=0.30))
+
+                final_qs = []
+                final_qs.extend(random.sample(easy_qs, min(len(easy_qs), data['num_easy'])))
+                final_qs.extend(random.sample(medium_qs, min(len(medium_qs), data['num_medium'])))
+                final_qs.extend(random.sample(hard_qs, min(len(hard_qs), data['num_hard'])))
             
             if not final_qs:
                 messages.error(request, 'ไม่พบคำถามในคลังตามเงื่อนไขที่ระบุเลย')
@@ -350,6 +475,7 @@ def create_exam_auto(request):
                 created_by=request.user
             )
             exam.questions.set(final_qs)
+            publish_exam(exam, request.user)
             messages.success(request, f'สร้างชุดข้อสอบ "{exam.exam_name}" สำเร็จ')
             return redirect('exam_detail', pk=exam.pk)
     else:
@@ -360,16 +486,57 @@ def create_exam_auto(request):
 
 @teacher_required
 def exam_detail(request, pk):
+    """
+    Shows the published snapshot of an exam (not the live questions), and
+    whether questions were changed since it was published.
+
+    The sections are cached fragments: the question list per snapshot (which
+    never changes), the header and the "unpublished changes" flag until the
+    exam, its course or the teacher's questions change.
+    """
     exam = get_object_or_404(Exam, pk=pk, created_by=request.user)
-    questions = exam.questions.prefetch_related('choices').all()
-    choice_format = request.GET.get('format', 'thai')
+    if exam.snapshot_id is None:
+        publish_exam(exam, request.user)
+    choice_format = 'eng' if request.GET.get('format') == 'eng' else 'thai'
+    exam_namespaces = [exam_namespace(exam.pk), course_namespace(exam.created_by_id)]
+
+    header_content = cached_fragment(
+        'exam-header', 'teacher/_exam_header.html',
+        lambda: {'exam': exam, 'revisions': exam.revisions.all()[:1]},
+        namespaces=exam_namespaces, parts=[exam.pk],
+    )
+    unpublished = cached_value(
+        'exam-unpublished', lambda: has_unpublished_changes(exam, get_exam_snapshot(exam)),
+        namespaces=[*exam_namespaces, question_namespace(exam.created_by_id)], parts=[exam.pk, exam.snapshot_id],
+    )
+    questions_content = cached_fragment(
+        'exam-questions', 'teacher/_exam_questions.html',
+        lambda: {'questions': questions_for_display(get_exam_snapshot(exam)), 'choice_format': choice_format},
+        # มี URL รูปที่ลงลายเซ็นแบบมีอายุ: ห้าม cache นานกว่าช่วงที่ URL เดิมยังใช้ได้
+        parts=[exam.snapshot_id, choice_format], timeout=image_url_period(),
+    )
     context = {
         'exam': exam,
-        'questions': questions,
+        'header_content': header_content,
+        'questions_content': questions_content,
+        'has_unpublished_changes': unpublished,
         'choice_format': choice_format,
+        'pdf_layouts': PDF_LAYOUTS,
+        'pdf_parts': PDF_PARTS,
+        'exporters': EXPORTERS,
+        'default_pdf_layout': DEFAULT_PDF_LAYOUT,
     }
     return render(request, 'teacher/exam_detail.html', context)
 
+@teacher_required
+def exam_publish(request, pk):
+    """Publishes the current questions of an exam as a new snapshot."""
+    exam = get_object_or_404(Exam, pk=pk, created_by=request.user)
+    if request.method == 'POST':
+        publish_exam(exam, request.user)
+        messages.success(request, 'เผยแพร่ชุดข้อสอบฉบับล่าสุดแล้ว')
+    return redirect('exam_detail', pk=pk)
+
 class ExamUpdateView(TeacherRequiredMixin, UpdateView):
     model = Exam
     form_class = ExamForm
@@ -382,6 +549,11 @@ class ExamUpdateView(TeacherRequiredMixin, UpdateView):
     def get_queryset(self):
         return super().get_queryset().filter(created_by=self.request.user)
 
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        publish_exam(self.object, self.request.user)
+        return response
+
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
         kwargs['user'] = self.request.user
@@ -416,19 +588,74 @@ class ExamDeleteView(TeacherRequiredMixin, DeleteView):
 
 @teacher_required
 def export_exam_pdf(request, pk):
+    """
+    The student booklet, or with ``?part=`` the answer key / explanation
+    booklet (``PDF_PARTS``); ``part=all`` returns every part in one ZIP.
+    """
     exam = get_object_or_404(Exam, pk=pk, created_by=request.user)
     choice_format = request.GET.get('format', 'thai')
-    pdf_buffer = generate_pdf_exam(exam, choice_format)
-    
+    layout = request.GET.get('layout')
+    if layout not in PDF_LAYOUTS:
+        layout = DEFAULT_PDF_LAYOUT
+    part = request.GET.get('part', 'student')
+
+    if part == 'all':
+        with profile_block(request, 'generate_pdf_exam_zip'):
+            zip_buffer = generate_pdf_exam_zip(exam, choice_format, layout)
+        response = HttpResponse(zip_buffer, content_type='application/zip')
+        response['Content-Disposition'] = content_disposition_header(True, f'{exam.exam_name}.zip')
+        return response
+
+    if part not in PDF_PARTS:
+        part = 'student'
+    with profile_block(request, 'generate_pdf_exam'):
+        if part == 'student':
+            pdf_buffer = generate_pdf_exam(exam, choice_format, layout)
+        else:
+            pdf_buffer = generate_pdf_exam_set(exam, choice_format, layout, parts=[part])[part]
+
+    filename = exam.exam_name if part == 'student' else f'{exam.exam_name} - {PDF_PARTS[part]}'
     response = HttpResponse(pdf_buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{exam.exam_name}.pdf"'
+    # ชื่อไฟล์ภาษาไทยต้องส่งแบบ filename*=utf-8'' จึงจะแสดงถูกต้องในทุก browser
+    response['Content-Disposition'] = content_disposition_header(True, f'{filename}.pdf')
     return response
 
+def _export_options(request):
+    layout = request.GET.get('layout')
+    return {
+        'choice_format': 'eng' if request.GET.get('format') == 'eng' else 'thai',
+        'layout': layout if layout in PDF_LAYOUTS else DEFAULT_PDF_LAYOUT,
+    }
+
+
+@teacher_required
+def export_exam(request, pk):
+    """The exam in any registered export format (``?to=``, see ``exporters.EXPORTERS``)."""
+    exam = get_object_or_404(Exam, pk=pk, created_by=request.user)
+    name = request.GET.get('to')
+    if name not in EXPORTERS:
+        raise Http404
+    with profile_block(request, f'export_{name}'):
+        return export_response(exam_source(exam), name, exam.exam_name, _export_options(request))
+
+
+@teacher_required
+def course_export(request, pk):
+    """Every question of the course's bank in a registered export format; streamed where the format allows."""
+    course = get_object_or_404(Course, pk=pk, teacher=request.user)
+    name = request.GET.get('to')
+    if name not in EXPORTERS:
+        raise Http404
+    with profile_block(request, f'export_{name}'):
+        return export_response(course_bank_source(course), name, f'คลังข้อสอบ {course.course_code}', _export_options(request))
+
+
 @teacher_required
 def export_exam_word(request, pk):
     exam = get_object_or_404(Exam, pk=pk, created_by=request.user)
     choice_format = request.GET.get('format', 'thai')
-    doc_buffer = generate_word_exam(exam, choice_format)
+    with profile_block(request, 'generate_word_exam'):
+        doc_buffer = generate_word_exam(exam, choice_format)
     
     response = HttpResponse(doc_buffer, content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document')
     response['Content-Disposition'] = f'attachment; filename="{exam.exam_name}.docx"'
@@ -0,0 +1,191 @@
+"""
+Word (.docx) export of exams with python-docx. Imported on first use through
+``exam_management.utils``.
+
+* The template (``settings.WORD_EXAM_TEMPLATE`` or python-docx's default
+  document) gets the exam styles once per process and is kept as bytes; each
+  export opens a copy of it. Choices are indented by the ``Exam Choice``
+  style, not by formatting on every paragraph.
+* The questions are written as WordprocessingML text and parsed into the body
+  in one batch, instead of one python-docx proxy call per paragraph and run.
+* Each distinct image is read from storage and added to the package once;
+  every question using it refers to the same part.
+"""
+import io
+from functools import cache
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+from docx.oxml.shape import CT_Inline
+from docx.shared import Inches, Pt
+from lxml import etree
+
+from .snapshots import get_exam_snapshot, image_storage
+from .utils import choice_label
+
+IMAGE_WIDTH = Inches(4.0)
+
+# ฟอนต์ของ template เริ่มต้น (ใช้เมื่อไม่ได้กำหนด WORD_EXAM_TEMPLATE)
+DEFAULT_FONT = 'TH Sarabun New'
+DEFAULT_FONT_SIZE = Pt(16)
+
+# ==============================================================================
+# Template
+# ==============================================================================
+
+def _set_font(style, name=None, size=None):
+    """Sets the font of ``style`` for Latin and complex-script (Thai) text."""
+    rpr = style.element.get_or_add_rPr()
+    if name:
+        style.font.name = name
+        rpr.get_or_add_rFonts().set(qn('w:cs'), name)
+    if size:
+        style.font.size = size
+        size_cs = rpr.find(qn('w:szCs'))
+        if size_cs is None:
+            size_cs = rpr.makeelement(qn('w:szCs'), {})
+            rpr.sz.addnext(size_cs)
+        size_cs.set(qn('w:val'), str(int(size.pt * 2)))
+
+
+def _add_exam_styles(document):
+    """Adds the styles used by the export unless the template defines them. Returns whether questions are auto-numbered."""
+    styles = document.styles
+    names = {style.name for style in styles}
+    numbered = 'List Number' in names
+
+    if 'Exam Question' not in names:
+        question = styles.add_style('Exam Question', WD_STYLE_TYPE.PARAGRAPH)
+        question.base_style = styles['List Number' if numbered else 'Normal']
+    if 'Exam Choice' not in names:
+        choice = styles.add_style('Exam Choice', WD_STYLE_TYPE.PARAGRAPH)
+        choice.base_style = styles['Normal']
+        choice.paragraph_format.left_indent = Inches(0.5)
+    if 'Exam Spacer' not in names:
+        spacer = styles.add_style('Exam Spacer', WD_STYLE_TYPE.PARAGRAPH)
+        spacer.base_style = styles['Normal']
+        _set_font(spacer, size=Pt(6))
+    return numbered
+
+
+@cache
+def exam_template():
+    """``(docx bytes, question numbering is automatic)``: the template with the exam styles, built once per process."""
+    if settings.WORD_EXAM_TEMPLATE:
+        document = Document(settings.WORD_EXAM_TEMPLATE)
+    else:
+        document = Document()
+        _set_font(document.styles['Normal'], DEFAULT_FONT, DEFAULT_FONT_SIZE)
+    numbered = _add_exam_styles(document)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue(), numbered
+
+# ==============================================================================
+# Batched Body XML
+# ==============================================================================
+
+def _text_runs(text):
+    """``w:r`` elements for ``text``; line breaks become ``w:br`` like python-docx's ``add_run``."""
+    lines = [escape(line) for line in str(text).split('\n')]
+    return '<w:r><w:t xml:space="preserve">%s</w:t></w:r>' % (
+        '</w:t><w:br/><w:t xml:space="preserve">'.join(lines)
+    )
+
+
+def _paragraph(style_id, inner=''):
+    return f'<w:p><w:pPr><w:pStyle w:val="{style_id}"/></w:pPr>{inner}</w:p>'
+
+
+class _ImageEmbedder:
+    """Adds each image file to the package once and hands out ``w:drawing`` runs referring to it."""
+
+    def __init__(self, document):
+        self.part = document.part
+        self.storage = image_storage()
+        self.images = {}
+        self.next_shape_id = self.part.next_id
+
+    def _load(self, name):
+        if name not in self.images:
+            try:
+                with self.storage.open(name) as file:
+                    rId, image = self.part.get_or_add_image(file)
+                self.images[name] = (rId, image.filename, *image.scaled_dimensions(IMAGE_WIDTH, None))
+            except Exception as e:
+                print(f"Error adding image to Word: {e}")
+                self.images[name] = None
+        return self.images[name]
+
+    def run(self, name):
+        """The ``w:r`` holding the picture, or None if the file could not be read."""
+        loaded = self._load(name)
+        if loaded is None:
+            return None
+        rId, filename, cx, cy = loaded
+        inline = CT_Inline.new_pic_inline(self.next_shape_id, rId, filename, cx, cy)
+        self.next_shape_id += 1
+        return f'<w:r><w:drawing>{etree.tostring(inline, encoding="unicode")}</w:drawing></w:r>'
+
+# ==============================================================================
+# Word (.docx) Generation
+# ==============================================================================
+
+def generate_word_exam(exam, choice_format='thai'):
+    """
+    Generates a Word (.docx) file for a given Exam object, including images.
+    The content comes from the exam's published snapshot.
+    """
+    return render_word_exam(get_exam_snapshot(exam), choice_format)
+
+
+def render_word_exam(content, choice_format='thai'):
+    """The .docx (BytesIO) of snapshot-like ``content``: ``exam_name``, ``course`` and ``questions``."""
+    template, numbered = exam_template()
+    document = Document(io.BytesIO(template))
+    document.add_heading(f"ชุดข้อสอบ: {content['exam_name']}", level=1)
+    document.add_paragraph(f"รายวิชา: {content['course']}")
+    document.add_paragraph()
+
+    styles = document.styles
+    question_style = styles['Exam Question'].style_id
+    choice_style = styles['Exam Choice'].style_id
+    spacer_style = styles['Exam Spacer'].style_id
+    normal_style = styles['Normal'].style_id
+    images = _ImageEmbedder(document)
+
+    parts = []
+    for i, question in enumerate(content['questions'], 1):
+        text = question['text'] if numbered else f"{i}. {question['text']}"
+        parts.append(_paragraph(question_style, _text_runs(text)))
+
+        if question['image']:
+            picture = images.run(question['image'])
+            if picture is None:
+                picture = _text_runs(f"[ไม่สามารถแทรกรูปภาพ: {question['image']}]")
+            parts.append(_paragraph(normal_style, picture))
+
+        if question['type'] == 'MCQ':
+            for j, choice in enumerate(question['choices']):
+                parts.append(_paragraph(choice_style, _text_runs(f"{choice_label(j, choice_format)}. {choice['text']}")))
+
+        # เว้นบรรทัดเล็กน้อยหลังแต่ละข้อ
+        parts.append(_paragraph(spacer_style))
+
+    body = document.element.body
+    fragment = parse_xml(f'<w:body {nsdecls("w", "r", "wp", "a", "pic")}>{"".join(parts)}</w:body>')
+    sect_pr = body.sectPr
+    for paragraph in list(fragment):
+        if sect_pr is not None:
+            sect_pr.addprevious(paragraph)
+        else:
+            body.append(paragraph)
+
+    buffer = io.BytesIO()
+    document.save(buffer)
+    buffer.seek(0)
+    return buffer
@@ -1,6 +1,8 @@
 from django.contrib import admin
+from django.urls import reverse
+from django.utils.html import format_html
 # 1. แก้ไข import ให้นำเข้าโมเดลใหม่
-from .models import SurveyResponse, SurveyRating, UsageLog
+from .models import SurveyResponse, SurveyRating, UsageLog, UsageLogDailyRollup, ProfileRecord
 
 @admin.register(SurveyResponse)
 class SurveyResponseAdmin(admin.ModelAdmin):
@@ -36,4 +38,35 @@ class UsageLogAdmin(admin.ModelAdmin):
     search_fields = ('user__username', 'path', 'ip_address')
     readonly_fields = ('user', 'action', 'path', 'ip_address', 'action_time')
 
+@admin.register(UsageLogDailyRollup)
+class UsageLogDailyRollupAdmin(admin.ModelAdmin):
+    """
+    Admin view for the daily usage summaries that remain after raw logs are purged.
+    """
+    list_display = ('day', 'user', 'path', 'count')
+    list_filter = ('day',)
+    search_fields = ('user__username', 'path')
+    date_hierarchy = 'day'
+    readonly_fields = ('day', 'user', 'path', 'count')
+
+@admin.register(ProfileRecord)
+class ProfileRecordAdmin(admin.ModelAdmin):
+    """
+    Admin view for ProfileRecord.
+    Lists profiled requests with links to download the .prof and flame-graph stack files.
+    """
+    list_display = ('label', 'path', 'user', 'duration_ms', 'sample_count', 'created_at', 'download_links')
+    list_filter = ('label',)
+    search_fields = ('path', 'user__username')
+    readonly_fields = ('user', 'label', 'path', 'method', 'duration_ms', 'sample_count',
+                       'profile_file', 'stacks_file', 'created_at', 'download_links')
+
+    @admin.display(description='ดาวน์โหลด')
+    def download_links(self, obj):
+        return format_html(
+            '<a href="{}">.prof</a> | <a href="{}">flame graph stacks</a>',
+            reverse('feedback:download_profile', args=[obj.pk, 'prof']),
+            reverse('feedback:download_profile', args=[obj.pk, 'stacks']),
+        )
+
 # เราไม่ต้อง register SurveyRating แยกต่างหาก เพราะมันถูกจัดการผ่าน Inline แล้ว
\ No newline at end of file
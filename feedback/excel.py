@@ -0,0 +1,80 @@
+"""
+Excel workbooks of the admin reports. Imported on first use by the export
+views, so openpyxl is not loaded by every worker at startup.
+"""
+import openpyxl
+from openpyxl.utils import get_column_letter
+from openpyxl.styles import Font
+from openpyxl.cell import WriteOnlyCell
+
+from .forms import SURVEY_QUESTIONS
+
+
+def survey_results_workbook(responses):
+    """One row per SurveyResponse (with ``ratings`` prefetched) and one column per rating."""
+    workbook = openpyxl.Workbook()
+    worksheet = workbook.active
+    worksheet.title = 'Survey Results'
+
+    columns = ['ผู้ใช้งาน', 'โรงเรียน', 'กลุ่มสาระฯ', 'ระดับการสอน', 'ประสบการณ์', 'เวลาใช้งาน', 'วันที่ส่ง']
+    for category, questions in SURVEY_QUESTIONS.items():
+        for code, text in questions:
+            columns.append(f'คะแนน {code}')
+    columns.extend(['สิ่งที่ชื่นชอบ', 'สิ่งที่ควรปรับปรุง', 'ข้อเสนอแนะอื่นๆ'])
+
+    for col_num, column_title in enumerate(columns, 1):
+        cell = worksheet.cell(row=1, column=col_num)
+        cell.value = column_title
+        cell.font = Font(bold=True)
+        worksheet.column_dimensions[get_column_letter(col_num)].width = 20
+
+    for row_num, response in enumerate(responses, 2):
+        ratings_map = {rating.question_code: rating.rating for rating in response.ratings.all()}
+        
+        row_data = [
+            response.user.username if response.user else "N/A",
+            response.school_name, response.learning_area,
+            response.teaching_level, response.teaching_experience,
+            response.usage_duration, response.submitted_at.strftime('%Y-%m-%d %H:%M'),
+        ]
+        
+        for category, questions in SURVEY_QUESTIONS.items():
+            for code, text in questions:
+                row_data.append(ratings_map.get(code, ''))
+
+        row_data.extend([
+            response.suggestion_likes, response.suggestion_improvements, response.suggestion_future,
+        ])
+        
+        for col_num, cell_value in enumerate(row_data, 1):
+            worksheet.cell(row=row_num, column=col_num).value = cell_value
+    return workbook
+
+
+def usage_logs_workbook(rows, role_labels):
+    """
+    A write-only workbook of usage log ``rows`` (username, role, action, path,
+    ip_address, action_time), so memory stays flat however many rows stream in.
+    """
+    workbook = openpyxl.Workbook(write_only=True)
+    worksheet = workbook.create_sheet('Usage Logs')
+    columns = ['ผู้ใช้งาน', 'Role', 'กิจกรรม', 'Path', 'IP Address', 'เวลา']
+    for col_num in range(1, len(columns) + 1):
+        worksheet.column_dimensions[get_column_letter(col_num)].width = 25
+    header = []
+    for column_title in columns:
+        cell = WriteOnlyCell(worksheet, value=column_title)
+        cell.font = Font(bold=True)
+        header.append(cell)
+    worksheet.append(header)
+
+    for username, role, action, path, ip_address, action_time in rows:
+        worksheet.append([
+            username or "N/A",
+            role_labels.get(role, role) if username else "N/A",
+            action,
+            path,
+            ip_address or "-",
+            action_time.strftime('%Y-%m-%d %H:%M:%S'),
+        ])
+    return workbook
@@ -8,8 +8,9 @@ class LogFilter(django_filters.FilterSet):
     FilterSet สำหรับ UsageLog เพื่อให้ Admin สามารถกรองตามผู้ใช้และช่วงเวลาได้
     """
     # Filter ตาม User (Dropdown)
+    # queryset ต้องสร้างใหม่ทุกคำขอ เพื่อให้แสดงเฉพาะผู้ใช้ของโรงเรียนปัจจุบัน (core.tenancy)
     user = django_filters.ModelChoiceFilter(
-        queryset=CustomUser.objects.all(),
+        queryset=lambda request: CustomUser.objects.all(),
         label='ผู้ใช้งาน',
         widget=forms.Select(attrs={'class': 'w-full p-2 border border-gray-300 rounded-md shadow-sm'})
     )
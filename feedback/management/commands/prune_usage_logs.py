@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from feedback.retention import purge_usage_logs, rollup_usage_logs
+
+
+class Command(BaseCommand):
+    help = (
+        'Rolls up pending days of UsageLog into UsageLogDailyRollup and deletes raw logs '
+        'older than the retention window in small batches. Intended to run daily (cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-days', type=int, default=None,
+            help=f'Keep this many days of raw logs (default: USAGE_LOG_RETENTION_DAYS={settings.USAGE_LOG_RETENTION_DAYS}).',
+        )
+        parser.add_argument('--batch-size', type=int, default=None, help='Rows deleted per transaction.')
+        parser.add_argument('--rollup-only', action='store_true', help='Only build the daily rollups.')
+
+    def handle(self, *args, **options):
+        if options['rollup_only']:
+            days = rollup_usage_logs()
+            self.stdout.write(self.style.SUCCESS(f'Rolled up {days} school-day(s) of usage logs.'))
+            return
+
+        try:
+            removed = purge_usage_logs(options['retention_days'], options['batch_size'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(f'Removed {removed} expired usage log row(s).'))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from feedback import partitioning
+
+
+class Command(BaseCommand):
+    help = (
+        'PostgreSQL only: converts feedback_usagelog into a table partitioned by month on '
+        'action_time (--convert) and creates upcoming monthly partitions. Run monthly.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--convert', action='store_true',
+                            help='Rebuild the table as a partitioned table (locks it while copying rows).')
+        parser.add_argument('--months-ahead', type=int, default=3, help='Future months to pre-create.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Native partitioning is only supported on PostgreSQL; '
+                               'use "prune_usage_logs" for retention on this database.')
+
+        with transaction.atomic():
+            if options['convert']:
+                if partitioning.convert_to_partitioned(connection, options['months_ahead']):
+                    self.stdout.write(self.style.SUCCESS('feedback_usagelog is now partitioned by month.'))
+                else:
+                    self.stdout.write(self.style.WARNING('feedback_usagelog is already partitioned.'))
+            elif not partitioning.is_partitioned(connection):
+                raise CommandError('feedback_usagelog is not partitioned yet. Run with --convert first.')
+
+            created = partitioning.ensure_partitions(connection, timezone.localdate(), options['months_ahead'])
+
+        for name in created:
+            self.stdout.write(f'Created partition {name}')
+        partitions = partitioning.list_partitions(connection)
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(partitions)} monthly partition(s): '
+            + ', '.join(name for name, _ in partitions)
+        ))
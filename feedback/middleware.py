@@ -1,3 +1,6 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from core.write_queue import asave_later, save_later
 from .models import UsageLog
 
 def get_client_ip(request):
@@ -13,10 +16,18 @@ def get_client_ip(request):
     return ip
 
 class UsageLogMiddleware:
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
         response = self.get_response(request)
 
         if request.user.is_authenticated and not request.path.startswith('/admin/'):
@@ -25,11 +36,29 @@ class UsageLogMiddleware:
             # --- ดึง IP และเพิ่มเข้าไปตอนสร้าง Log ---
             client_ip = get_client_ip(request)
             
-            UsageLog.objects.create(
+            # ผ่าน write queue: บน SQLite production mode จะเขียนเป็นชุด ไม่แย่ง lock กับ request อื่น
+            save_later(UsageLog(
                 user=request.user,
+                school_id=request.user.school_id,
                 action=action_description,
                 path=request.path,
                 ip_address=client_ip # <-- เพิ่ม IP Address ที่นี่
-            )
+            ))
         
-        return response
\ No newline at end of file
+        return response
+
+    async def __acall__(self, request):
+        # เวอร์ชัน async สำหรับ ASGI: ไม่ต้องสลับไปใช้ thread ทุกคำขอ
+        response = await self.get_response(request)
+
+        user = await request.auser()
+        if user.is_authenticated and not request.path.startswith('/admin/'):
+            await asave_later(UsageLog(
+                user=user,
+                school_id=user.school_id,
+                action=f"{request.method} on {request.path}",
+                path=request.path,
+                ip_address=get_client_ip(request),
+            ))
+
+        return response
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.6 on 2026-10-19 14:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=100, verbose_name='ส่วนที่ถูก profile')),
+                ('path', models.CharField(max_length=255)),
+                ('method', models.CharField(max_length=10)),
+                ('duration_ms', models.FloatField(verbose_name='เวลาที่ใช้ (ms)')),
+                ('sample_count', models.IntegerField(default=0, verbose_name='จำนวน stack samples')),
+                ('profile_file', models.FileField(upload_to='profiles/%Y/%m/', verbose_name='ไฟล์ cProfile (.prof)')),
+                ('stacks_file', models.FileField(upload_to='profiles/%Y/%m/', verbose_name='ไฟล์ stack (.folded)')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
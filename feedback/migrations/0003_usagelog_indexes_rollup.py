@@ -0,0 +1,49 @@
+# Generated by Django 5.0.6 on 2026-10-19 14:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0002_profilerecord'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsageLogDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('path', models.CharField(max_length=255)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='usagelog',
+            index=models.Index(fields=['action_time'], name='usagelog_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usagelog',
+            index=models.Index(fields=['user', 'action_time'], name='usagelog_user_time_idx'),
+        ),
+        migrations.AddField(
+            model_name='usagelogdailyrollup',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='usagelogdailyrollup',
+            index=models.Index(fields=['user', 'day'], name='usagerollup_user_day_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='usagelogdailyrollup',
+            unique_together={('day', 'user', 'path')},
+        ),
+    ]
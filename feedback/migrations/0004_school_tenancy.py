@@ -0,0 +1,35 @@
+# Generated by Django 5.0.6 on 2026-10-19 15:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_schools'),
+        ('feedback', '0003_usagelog_indexes_rollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='surveyresponse',
+            name='school',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.school', verbose_name='โรงเรียน'),
+        ),
+        migrations.AddField(
+            model_name='usagelog',
+            name='school',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.school', verbose_name='โรงเรียน'),
+        ),
+        migrations.AddIndex(
+            model_name='surveyresponse',
+            index=models.Index(fields=['school', 'submitted_at'], name='survey_school_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usagelog',
+            index=models.Index(fields=['school', 'action_time'], name='usagelog_school_time_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.0.6 on 2026-10-19 15:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_rollup_schools(apps, schema_editor):
+    """Existing rollups take the school of their user, as the raw logs they summarize did."""
+    UsageLogDailyRollup = apps.get_model('feedback', 'UsageLogDailyRollup')
+    CustomUser = apps.get_model('accounts', 'CustomUser')
+    db = schema_editor.connection.alias
+    UsageLogDailyRollup.objects.using(db).filter(user__isnull=False).update(
+        school_id=Subquery(CustomUser.objects.using(db).filter(pk=OuterRef('user_id')).values('school_id')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_customuser_school'),
+        ('core', '0002_schools'),
+        ('feedback', '0004_school_tenancy'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='usagelogdailyrollup',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='usagelogdailyrollup',
+            name='school',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.school', verbose_name='โรงเรียน'),
+        ),
+        migrations.RunPython(fill_rollup_schools, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='usagelogdailyrollup',
+            unique_together={('day', 'school', 'user', 'path')},
+        ),
+        migrations.AddIndex(
+            model_name='usagelogdailyrollup',
+            index=models.Index(fields=['school', 'day'], name='usagerollup_school_day_idx'),
+        ),
+    ]
@@ -1,7 +1,8 @@
 from django.db import models
 from accounts.models import CustomUser
+from core.models import TenantModel
 
-class UsageLog(models.Model):
+class UsageLog(TenantModel):
     """
     Stores a log of user activities throughout the system.
     This is populated by the UsageLogMiddleware.
@@ -12,12 +13,45 @@ class UsageLog(models.Model):
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     action_time = models.DateTimeField(auto_now_add=True)
 
+    school_source = 'user__school'
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['action_time'], name='usagelog_time_idx'),
+            models.Index(fields=['user', 'action_time'], name='usagelog_user_time_idx'),
+            models.Index(fields=['school', 'action_time'], name='usagelog_school_time_idx'),
+        ]
+
     def __str__(self):
         user_info = self.user.username if self.user else "Anonymous"
         return f"{user_info} performed '{self.action}' at {self.action_time.strftime('%Y-%m-%d %H:%M')}"
 
+class UsageLogDailyRollup(TenantModel):
+    """
+    Daily summary of UsageLog rows (one row per day, school, user and path).
+    Filled by feedback.retention.rollup_usage_logs before raw logs are purged,
+    so activity statistics survive the retention window. Each school is
+    rolled up on its own, so a school's rollup never replaces another's.
+    """
+    day = models.DateField()
+    user = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True)
+    path = models.CharField(max_length=255)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('day', 'school', 'user', 'path')
+        indexes = [
+            models.Index(fields=['user', 'day'], name='usagerollup_user_day_idx'),
+            models.Index(fields=['school', 'day'], name='usagerollup_school_day_idx'),
+        ]
+        ordering = ['-day']
+
+    def __str__(self):
+        user_info = self.user.username if self.user else "Anonymous"
+        return f"{user_info} {self.path} on {self.day}: {self.count}"
+
 # --- สร้าง Model ใหม่ 2 ตัว ---
-class SurveyResponse(models.Model):
+class SurveyResponse(TenantModel):
     """
     เก็บข้อมูลทั่วไปและข้อเสนอแนะของผู้ตอบแบบสอบถามแต่ละคน
     """
@@ -36,6 +70,12 @@ class SurveyResponse(models.Model):
     
     submitted_at = models.DateTimeField(auto_now_add=True)
 
+    # school_name คือชื่อที่ผู้ตอบพิมพ์เอง ส่วน school คือโรงเรียนของบัญชีผู้ใช้ (ใช้แยกข้อมูล)
+    school_source = 'user__school'
+
+    class Meta:
+        indexes = [models.Index(fields=['school', 'submitted_at'], name='survey_school_time_idx')]
+
     def __str__(self):
         return f"Response from {self.school_name} on {self.submitted_at.strftime('%Y-%m-%d')}"
 
@@ -50,4 +90,25 @@ class SurveyRating(models.Model):
     rating = models.IntegerField(choices=RATING_CHOICES, verbose_name="คะแนน")
 
     def __str__(self):
-        return f"{self.response} - Q{self.question_code}: {self.rating} stars"
\ No newline at end of file
+        return f"{self.response} - Q{self.question_code}: {self.rating} stars"
+
+class ProfileRecord(models.Model):
+    """
+    เก็บผลการ profile ของโค้ดส่วนที่ทำงานหนัก (export PDF/Word, สุ่มข้อสอบ)
+    สร้างโดย feedback.profiling.profile_block เมื่อ Admin ขอหรือถูกสุ่มเลือก
+    """
+    user = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True)
+    label = models.CharField(max_length=100, verbose_name="ส่วนที่ถูก profile")
+    path = models.CharField(max_length=255)
+    method = models.CharField(max_length=10)
+    duration_ms = models.FloatField(verbose_name="เวลาที่ใช้ (ms)")
+    sample_count = models.IntegerField(default=0, verbose_name="จำนวน stack samples")
+    profile_file = models.FileField(upload_to='profiles/%Y/%m/', verbose_name="ไฟล์ cProfile (.prof)")
+    stacks_file = models.FileField(upload_to='profiles/%Y/%m/', verbose_name="ไฟล์ stack (.folded)")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.label} on {self.path} ({self.duration_ms:.0f} ms)"
@@ -0,0 +1,190 @@
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta
+
+from django.db import connection
+from django.db.models import Max, Min, Q, Sum
+from django.utils import timezone
+
+from .models import UsageLog, UsageLogDailyRollup
+
+# Raw logs not covered by a daily rollup are counted up to this many rows; a
+# larger tail (no rollup has run yet) is shown as "at least" instead of scanned.
+ESTIMATE_TAIL_LIMIT = 10_000
+
+# ==============================================================================
+# Keyset (cursor) Pagination
+# ==============================================================================
+
+class KeysetPage:
+    """
+    One page of a KeysetPaginator. Mirrors the parts of Django's Page that the
+    templates use (iteration, has_next/has_previous, number) and adds cursors.
+    """
+    def __init__(self, object_list, number, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.number = number
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginates a queryset ordered by (``time_field`` DESC, id DESC) with
+    "seek" queries (WHERE (time, id) < (last_time, last_id) LIMIT n), so every
+    page costs the same no matter how deep it is and no COUNT(*) is needed.
+    """
+    def __init__(self, queryset, per_page, time_field='action_time'):
+        self.queryset = queryset.order_by()
+        self.per_page = per_page
+        self.time_field = time_field
+
+    # --- Cursor encoding: "<direction>:<iso time>:<id>:<page number>" in URL-safe base64 ---
+
+    @staticmethod
+    def encode_cursor(direction, obj_time, obj_id, number):
+        raw = json.dumps([direction, obj_time.isoformat(), obj_id, number])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, obj_time, obj_id, number = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if direction not in ('next', 'prev'):
+                return None
+            return direction, datetime.fromisoformat(obj_time), int(obj_id), max(int(number), 1)
+        except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+            return None
+
+    def get_page(self, cursor=None):
+        """Returns the page addressed by ``cursor`` (or the first page for a missing/invalid cursor)."""
+        decoded = self.decode_cursor(cursor) if cursor else None
+        time_field = self.time_field
+        if decoded is None:
+            direction, number = 'next', 1
+            queryset = self.queryset.order_by(f'-{time_field}', '-id')
+        else:
+            direction, obj_time, obj_id, number = decoded
+            if direction == 'next':
+                seek = Q(**{f'{time_field}__lt': obj_time}) | Q(**{time_field: obj_time, 'id__lt': obj_id})
+                queryset = self.queryset.filter(seek).order_by(f'-{time_field}', '-id')
+            else:
+                seek = Q(**{f'{time_field}__gt': obj_time}) | Q(**{time_field: obj_time, 'id__gt': obj_id})
+                queryset = self.queryset.filter(seek).order_by(time_field, 'id')
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == 'prev':
+            rows.reverse()
+
+        if not rows:
+            return KeysetPage([], number, None, None)
+
+        first, last = rows[0], rows[-1]
+        more_after = has_more if direction == 'next' else True
+        more_before = number > 1 and (has_more if direction == 'prev' else True)
+        next_cursor = self.encode_cursor('next', getattr(last, time_field), last.id, number + 1) if more_after else None
+        previous_cursor = (
+            self.encode_cursor('prev', getattr(first, time_field), first.id, number - 1) if more_before else None
+        )
+        return KeysetPage(rows, number, next_cursor, previous_cursor)
+
+# ==============================================================================
+# Count Estimation
+# ==============================================================================
+
+def planner_estimate(queryset):
+    """
+    PostgreSQL only: the row estimate from EXPLAIN, which costs no table scan.
+    Returns None on other databases.
+    """
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def _tail_condition(last_rolled):
+    """
+    Raw logs not covered by the rollups: each school is rolled up on its own,
+    so per school the logs after its last rolled-up day (``last_rolled``:
+    ``{school_id: day}``), and every log of a school never rolled up (e.g.
+    before the first ``prune_usage_logs``).
+    """
+    rolled = [school_id for school_id in last_rolled if school_id is not None]
+    condition = Q(school__isnull=False) & ~Q(school_id__in=rolled) if rolled else Q(school__isnull=False)
+    if None not in last_rolled:
+        condition |= Q(school__isnull=True)
+    for school_id, day in last_rolled.items():
+        start = timezone.make_aware(datetime.combine(day + timedelta(days=1), datetime.min.time()))
+        school = Q(school_id=school_id) if school_id is not None else Q(school__isnull=True)
+        condition |= school & Q(action_time__gte=start)
+    return condition
+
+
+def rollup_estimate(user=None, start_date=None, end_date=None):
+    """
+    Estimates the number of UsageLog rows for a user/date filter from the daily
+    rollups plus the (small) not-yet-rolled-up tail of raw logs. Returns
+    ``(estimate, capped)``: the tail is counted up to ``ESTIMATE_TAIL_LIMIT``
+    rows, and ``capped`` says the estimate is only a lower bound (e.g. before
+    the first rollup, when every log is in the tail).
+    """
+    earliest = UsageLog.objects.aggregate(first=Min('action_time'))['first']
+    if earliest is None:
+        return 0, False
+    # ทั้งสองตารางถูกจำกัดเฉพาะโรงเรียนปัจจุบัน (TenantManager) เมื่อผู้ดูเป็นผู้ดูแลของโรงเรียน
+    rollups = UsageLogDailyRollup.objects.filter(day__gte=timezone.localtime(earliest).date())
+    last_rolled = dict(rollups.order_by().values('school_id').annotate(last=Max('day')).values_list('school_id', 'last'))
+    tail = UsageLog.objects.filter(_tail_condition(last_rolled))
+
+    if user is not None:
+        rollups = rollups.filter(user=user)
+        tail = tail.filter(user=user)
+    if start_date:
+        rollups = rollups.filter(day__gte=start_date)
+        tail = tail.filter(action_time__gte=start_date)
+    if end_date:
+        # LogFilter ใช้ action_time <= end_date (เที่ยงคืน) จึงนับถึงวันก่อนหน้า end_date
+        rollups = rollups.filter(day__lt=end_date)
+        tail = tail.filter(action_time__lte=end_date)
+    # COUNT ของ subquery ที่มี LIMIT: หยุดสแกนเมื่อครบ ESTIMATE_TAIL_LIMIT แถว
+    tail_count = tail.order_by().values('pk')[:ESTIMATE_TAIL_LIMIT].count()
+    total = (rollups.aggregate(total=Sum('count'))['total'] or 0) + tail_count
+    return total, tail_count >= ESTIMATE_TAIL_LIMIT
+
+
+def estimate_usage_log_count(log_filter):
+    """
+    Estimated number of rows matched by a LogFilter, used for the
+    "page X of about Y" indicator instead of an exact COUNT(*).
+    Returns ``(estimate, capped)`` as ``rollup_estimate`` does.
+    """
+    estimate = planner_estimate(log_filter.qs)
+    if estimate is not None:
+        return estimate, False
+    data = log_filter.form.cleaned_data if log_filter.is_bound and log_filter.form.is_valid() else {}
+    return rollup_estimate(data.get('user'), data.get('start_date'), data.get('end_date'))
@@ -0,0 +1,185 @@
+"""
+Optional native range partitioning of the UsageLog table on PostgreSQL.
+
+The table is partitioned by month on ``action_time``. Nothing here runs on
+other databases: every public function checks ``connection.vendor`` first.
+Use ``manage.py usage_log_partitions`` to convert the table and to create
+upcoming partitions (run it monthly, e.g. from cron, before the month starts).
+"""
+from datetime import date, datetime, time
+
+from django.utils import timezone
+
+TABLE = 'feedback_usagelog'
+LEGACY_TABLE = 'feedback_usagelog_unpartitioned'
+SEQUENCE = 'feedback_usagelog_id_seq_partitioned'
+DEFAULT_PARTITION = f'{TABLE}_default'
+# Same names as UsageLog.Meta.indexes so later Django migrations still find them.
+INDEXES = {
+    'usagelog_time_idx': 'action_time',
+    'usagelog_user_time_idx': 'user_id, action_time',
+    'usagelog_school_time_idx': 'school_id, action_time',
+}
+
+
+def _month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def _next_month(day):
+    return date(day.year + (day.month == 12), day.month % 12 + 1, 1)
+
+
+def _bound(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def partition_name(month):
+    return f'{TABLE}_p{month:%Y%m}'
+
+
+def is_partitioned(connection):
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relkind FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE c.relname = %s AND n.nspname = current_schema()",
+            [TABLE],
+        )
+        row = cursor.fetchone()
+    return bool(row and row[0] == 'p')
+
+
+def list_partitions(connection):
+    """Returns ``[(name, lower_bound_month), ...]`` for the monthly partitions, oldest first."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = %s",
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = []
+    for name in names:
+        suffix = name.rsplit('_p', 1)[-1]
+        if name != DEFAULT_PARTITION and suffix.isdigit() and len(suffix) == 6:
+            partitions.append((name, date(int(suffix[:4]), int(suffix[4:]), 1)))
+    return sorted(partitions, key=lambda item: item[1])
+
+
+def _default_has_rows(cursor, lower, upper):
+    cursor.execute(
+        f'SELECT EXISTS (SELECT 1 FROM "{DEFAULT_PARTITION}" WHERE action_time >= %s AND action_time < %s)',
+        [lower, upper],
+    )
+    return cursor.fetchone()[0]
+
+
+def _create_partition(cursor, name, lower, upper):
+    """
+    Creates the partition ``name`` for ``[lower, upper)``. PostgreSQL refuses
+    ``PARTITION OF`` while the default partition holds rows of that range (the
+    command was not run for longer than ``months_ahead``), so those rows are
+    first moved into a standalone table that is then attached; attaching
+    builds the partition's indexes and primary key.
+    """
+    if not _default_has_rows(cursor, lower, upper):
+        cursor.execute(
+            f'CREATE TABLE "{name}" PARTITION OF "{TABLE}" FOR VALUES FROM (%s) TO (%s)', [lower, upper],
+        )
+        return
+    cursor.execute(f'CREATE TABLE "{name}" (LIKE "{TABLE}" INCLUDING DEFAULTS)')
+    cursor.execute(
+        f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" WHERE action_time >= %s AND action_time < %s RETURNING *) '
+        f'INSERT INTO "{name}" SELECT * FROM moved',
+        [lower, upper],
+    )
+    cursor.execute(f'ALTER TABLE "{TABLE}" ATTACH PARTITION "{name}" FOR VALUES FROM (%s) TO (%s)', [lower, upper])
+
+
+def ensure_partitions(connection, start, months_ahead=3):
+    """
+    Creates the monthly partitions from ``start`` up to ``months_ahead`` months
+    after today, moving rows that already landed in the default partition.
+    Run it inside a transaction (``usage_log_partitions`` does).
+    """
+    if not is_partitioned(connection):
+        return []
+    existing = {name for name, _ in list_partitions(connection)}
+    month = _month_start(start)
+    last = _month_start(timezone.localdate())
+    for _ in range(months_ahead):
+        last = _next_month(last)
+
+    created = []
+    with connection.cursor() as cursor:
+        while month <= last:
+            name = partition_name(month)
+            if name not in existing:
+                _create_partition(cursor, name, _bound(month), _bound(_next_month(month)))
+                created.append(name)
+            month = _next_month(month)
+    return created
+
+
+def drop_partitions_before(connection, cutoff):
+    """
+    Drops the monthly partitions that end on or before ``cutoff``.
+    Returns the (planner-estimated) number of rows removed.
+    """
+    removed = 0
+    with connection.cursor() as cursor:
+        for name, month in list_partitions(connection):
+            if _bound(_next_month(month)) > cutoff:
+                break
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [name])
+            removed += max(cursor.fetchone()[0], 0)
+            cursor.execute(f'DROP TABLE "{name}"')
+    return removed
+
+
+def convert_to_partitioned(connection, months_ahead=3):
+    """
+    Rebuilds ``feedback_usagelog`` as a table partitioned by month on
+    ``action_time`` and copies the existing rows into it, in one transaction.
+    The primary key becomes ``(id, action_time)`` as PostgreSQL requires the
+    partition key in every unique constraint; ``id`` stays unique in practice
+    because it keeps coming from a single sequence.
+    """
+    if connection.vendor != 'postgresql':
+        raise RuntimeError('Native partitioning is only available on PostgreSQL.')
+    if is_partitioned(connection):
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT MIN(action_time), COALESCE(MAX(id), 0) FROM "{TABLE}"')
+        oldest, max_id = cursor.fetchone()
+
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{LEGACY_TABLE}"')
+        for index_name in INDEXES:
+            cursor.execute(f'ALTER INDEX IF EXISTS "{index_name}" RENAME TO "{index_name}_legacy"')
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{LEGACY_TABLE}" INCLUDING DEFAULTS) '
+            f'PARTITION BY RANGE (action_time)'
+        )
+        cursor.execute(f'ALTER TABLE "{TABLE}" ADD PRIMARY KEY (id, action_time)')
+        cursor.execute(f'CREATE SEQUENCE IF NOT EXISTS "{SEQUENCE}"')
+        cursor.execute("SELECT setval(%s, %s)", [SEQUENCE, max_id + 1])
+        cursor.execute(f'ALTER TABLE "{TABLE}" ALTER COLUMN id SET DEFAULT nextval(\'"{SEQUENCE}"\')')
+        cursor.execute(
+            f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_user_id_fk" FOREIGN KEY (user_id) '
+            f'REFERENCES accounts_customuser (id) DEFERRABLE INITIALLY DEFERRED'
+        )
+        for index_name, columns in INDEXES.items():
+            cursor.execute(f'CREATE INDEX "{index_name}" ON "{TABLE}" ({columns})')
+        cursor.execute(f'CREATE TABLE "{DEFAULT_PARTITION}" PARTITION OF "{TABLE}" DEFAULT')
+
+    ensure_partitions(connection, timezone.localtime(oldest).date() if oldest else timezone.localdate(), months_ahead)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{LEGACY_TABLE}"')
+        cursor.execute(f'DROP TABLE "{LEGACY_TABLE}"')
+    return True
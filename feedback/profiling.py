@@ -0,0 +1,143 @@
+import cProfile
+import logging
+import marshal
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+from .models import ProfileRecord
+
+logger = logging.getLogger(__name__)
+
+PROFILE_QUERY_PARAM = 'profile'
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+
+# ==============================================================================
+# Trigger Rules
+# ==============================================================================
+
+def can_request_profile(user):
+    """
+    Only admins (or Django staff accounts) may force profiling with the
+    query flag / header; everyone else is only profiled through sampling.
+    """
+    return bool(user and user.is_authenticated and (user.role == 'ADMIN' or user.is_staff))
+
+
+def should_profile(request):
+    """
+    Decides whether the current request should be profiled.
+    Triggered by ``?profile=1`` or ``X-Profile: 1`` for admins,
+    or randomly according to ``settings.PROFILING_SAMPLE_RATE``.
+    """
+    if request is None:
+        return False
+    flagged = request.GET.get(PROFILE_QUERY_PARAM) == '1' or request.META.get(PROFILE_HEADER) == '1'
+    if flagged and can_request_profile(getattr(request, 'user', None)):
+        return True
+    sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+    return sample_rate > 0 and random.random() < sample_rate
+
+# ==============================================================================
+# Statistical Stack Sampler (flame-graph output)
+# ==============================================================================
+
+class StackSampler:
+    """
+    Samples the call stack of one thread at a fixed interval and counts
+    identical stacks. The result is written in the "collapsed stack" format
+    (``frame;frame;frame count``) understood by flamegraph.pl and speedscope.
+    """
+    def __init__(self, thread_id, interval=None):
+        self.thread_id = thread_id
+        self.interval = interval or getattr(settings, 'PROFILING_SAMPLE_INTERVAL', 0.005)
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join()
+
+    @property
+    def sample_count(self):
+        return sum(self.stacks.values())
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(names))] += 1
+
+    def collapsed(self):
+        return '\n'.join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+# ==============================================================================
+# Public Helper
+# ==============================================================================
+
+@contextmanager
+def profile_block(request, label):
+    """
+    Wraps a block of code in cProfile plus the stack sampler when the
+    request is selected for profiling, and stores the result as a
+    ProfileRecord. Does nothing (zero overhead) otherwise.
+
+    Usage:
+        with profile_block(request, 'generate_pdf_exam'):
+            pdf_buffer = generate_pdf_exam(exam, choice_format)
+    """
+    if not should_profile(request):
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    sampler = StackSampler(threading.get_ident())
+    sampler.start()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        duration_ms = (time.perf_counter() - started) * 1000
+        sampler.stop()
+        try:
+            _save_record(request, label, profiler, sampler, duration_ms)
+        except Exception:
+            # การบันทึกผล profile ต้องไม่ทำให้ request ของผู้ใช้ล้มเหลว
+            logger.exception("Could not store profile for %s", label)
+
+
+def _save_record(request, label, profiler, sampler, duration_ms):
+    profiler.create_stats()
+    user = request.user if request.user.is_authenticated else None
+    record = ProfileRecord(
+        user=user,
+        label=label,
+        path=request.path[:255],
+        method=request.method,
+        duration_ms=duration_ms,
+        sample_count=sampler.sample_count,
+    )
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    # ไฟล์ .prof เปิดได้ด้วย pstats / snakeviz, ไฟล์ .folded ใช้ทำ flame graph
+    record.profile_file.save(f"{label}-{stamp}.prof", ContentFile(marshal.dumps(profiler.stats)), save=False)
+    record.stacks_file.save(f"{label}-{stamp}.folded", ContentFile(sampler.collapsed().encode('utf-8')), save=False)
+    record.save()
+    return record
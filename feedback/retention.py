@@ -0,0 +1,140 @@
+import logging
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+
+from core.tenancy import current_database, current_school_id
+from . import partitioning
+from .models import UsageLog, UsageLogDailyRollup
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# Helpers
+# ==============================================================================
+
+def local_midnight(day):
+    """Start of ``day`` (a date) in the project time zone, as an aware datetime."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def delete_in_batches(queryset, batch_size=None):
+    """
+    Deletes the rows of ``queryset`` in short transactions of ``batch_size`` rows
+    instead of one huge DELETE, so other requests can keep writing logs meanwhile.
+    Returns the number of deleted rows.
+    """
+    batch_size = batch_size or settings.USAGE_LOG_PURGE_BATCH_SIZE
+    model = queryset.model
+    total = 0
+    while True:
+        ids = list(queryset.order_by().values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return total
+        with transaction.atomic(using=current_database()):
+            deleted, _ = model.objects.filter(pk__in=ids).delete()
+        total += deleted
+
+# ==============================================================================
+# Daily Rollup
+# ==============================================================================
+
+def school_rows(queryset, school_id):
+    """The rows of ``queryset`` (an unscoped queryset) that belong to ``school_id`` (None: rows without a school)."""
+    return queryset.filter(school_id=school_id) if school_id is not None else queryset.filter(school__isnull=True)
+
+
+def rollup_day(day, school_id):
+    """
+    (Re)computes the UsageLogDailyRollup rows of one school (None: the logs
+    without a school) for one local day with a single grouped query. Safe to
+    run more than once for the same day.
+    """
+    start = local_midnight(day)
+    rows = (
+        school_rows(UsageLog.unscoped, school_id)
+        .filter(action_time__gte=start, action_time__lt=local_midnight(day + timedelta(days=1)))
+        .order_by()
+        .values('user_id', 'path')
+        .annotate(count=Count('id'))
+    )
+    with transaction.atomic(using=current_database()):
+        school_rows(UsageLogDailyRollup.unscoped, school_id).filter(day=day).delete()
+        created = UsageLogDailyRollup.unscoped.bulk_create(
+            [
+                UsageLogDailyRollup(day=day, school_id=school_id, user_id=row['user_id'], path=row['path'], count=row['count'])
+                for row in rows
+            ],
+            batch_size=1000,
+        )
+    return len(created)
+
+
+def rollup_usage_logs(until=None):
+    """
+    Rolls up every complete day that has not been rolled up yet, up to and
+    including ``until`` (default: yesterday): of the current school, or of
+    every school when none is set. Each school continues from its own last
+    rolled-up day (a school admin may have rolled up and cleared its logs
+    earlier than the others). Returns the number of school-days processed.
+    """
+    until = until or (timezone.localdate() - timedelta(days=1))
+    school_id = current_school_id()
+    if school_id is not None:
+        school_ids = [school_id]
+    else:
+        school_ids = list(UsageLog.unscoped.order_by().values_list('school_id', flat=True).distinct())
+
+    processed = 0
+    for school_id in school_ids:
+        last_day = school_rows(UsageLogDailyRollup.unscoped, school_id).aggregate(last=Max('day'))['last']
+        if last_day is not None:
+            day = last_day + timedelta(days=1)
+        else:
+            first_log = school_rows(UsageLog.unscoped, school_id).aggregate(first=Min('action_time'))['first']
+            if first_log is None:
+                continue
+            day = timezone.localtime(first_log).date()
+        while day <= until:
+            rollup_day(day, school_id)
+            day += timedelta(days=1)
+            processed += 1
+    return processed
+
+# ==============================================================================
+# Retention
+# ==============================================================================
+
+def purge_usage_logs(retention_days=None, batch_size=None):
+    """
+    Applies the retention policy: rolls up pending days, then removes raw logs
+    older than ``retention_days`` whole days. On a partitioned PostgreSQL table
+    expired monthly partitions are dropped first (no row-by-row delete at all);
+    the remainder is deleted in batches. Returns the number of removed rows.
+    """
+    retention_days = settings.USAGE_LOG_RETENTION_DAYS if retention_days is None else retention_days
+    if retention_days < 1:
+        raise ValueError("retention_days must be at least 1 so the current day is never purged.")
+
+    rollup_usage_logs()
+    cutoff = local_midnight(timezone.localdate() - timedelta(days=retention_days))
+
+    removed = 0
+    if partitioning.is_partitioned(connection):
+        removed += partitioning.drop_partitions_before(connection, cutoff)
+    removed += delete_in_batches(UsageLog.objects.filter(action_time__lt=cutoff), batch_size)
+    logger.info("Purged %s usage log rows older than %s", removed, cutoff)
+    return removed
+
+
+def clear_all_usage_logs(batch_size=None):
+    """
+    Deletes every raw UsageLog row in batches. Pending complete days are rolled
+    up first, as in ``purge_usage_logs``, so their history stays in the daily
+    rollups; only the rows of the current (not yet complete) day are lost.
+    """
+    rollup_usage_logs()
+    return delete_in_batches(UsageLog.objects.all(), batch_size)
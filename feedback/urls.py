@@ -8,7 +8,9 @@ from .views import (
     export_logs_excel,
     manage_survey_requests,
     unlock_survey,
-    clear_logs_view
+    clear_logs_view,
+    download_profile,
+    cache_stats_view
 )
 
 # กำหนด Namespace สำหรับ URL ทั้งหมดในแอปฯ นี้
@@ -30,4 +32,10 @@ urlpatterns = [
     path('admin/logs/export/excel/', export_logs_excel, name='export_logs_excel'),
     
     path('admin/logs/clear/', clear_logs_view, name='clear_logs'),
+
+    # Admin URL for downloading profiling results
+    path('admin/profiles/<int:pk>/<str:kind>/', download_profile, name='download_profile'),
+
+    # Admin URL for page-fragment cache statistics
+    path('admin/cache/', cache_stats_view, name='cache_stats'),
 ]
\ No newline at end of file
@@ -1,18 +1,22 @@
-import openpyxl
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Font
-
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.db.models import Avg
-from django.http import HttpResponse
+from django.http import HttpResponse, FileResponse, Http404
 from django.contrib import messages
-from django.core.paginator import Paginator
 
+from accounts.models import CustomUser
 from accounts.views import is_admin
 from .filters import LogFilter
-from .models import UsageLog, SurveyResponse, SurveyRating
+from .models import UsageLog, SurveyResponse, SurveyRating, ProfileRecord
 from .forms import FullSurveyForm, SURVEY_QUESTIONS
+from .retention import clear_all_usage_logs
+from .pagination import KeysetPaginator, estimate_usage_log_count
+from core.fragment_cache import fragment_stats, reset_fragment_stats
+from core.db_pool.pool import pool_stats
+from core.write_queue import run_serialized
+
+USAGE_LOG_PAGE_SIZE = 50
 
 # ==============================================================================
 # Teacher-facing Views
@@ -44,22 +48,26 @@ def survey_view(request):
             response_instance = form.save(commit=False)
             response_instance.user = request.user
             response_instance.is_locked = True  # Lock the response upon saving
-            response_instance.save()
-            
-            # Clear previous ratings for this response before saving new ones
-            SurveyRating.objects.filter(response=response_instance).delete()
 
-            # Save the new individual ratings
+            # The new individual ratings
+            ratings = []
             for category, questions in SURVEY_QUESTIONS.items():
                 for code, question_text in questions:
                     field_name = f'rating_{code}'
                     rating_value = form.cleaned_data.get(field_name)
                     if rating_value:
-                        SurveyRating.objects.create(
-                            response=response_instance,
-                            question_code=code,
-                            rating=int(rating_value)
-                        )
+                        ratings.append(SurveyRating(question_code=code, rating=int(rating_value)))
+
+            def save_survey():
+                response_instance.save()
+                # Clear previous ratings for this response before saving new ones
+                SurveyRating.objects.filter(response=response_instance).delete()
+                for rating in ratings:
+                    rating.response = response_instance
+                SurveyRating.objects.bulk_create(ratings)
+
+            # บันทึกคำตอบและคะแนนทั้งหมดใน transaction เดียว (ผ่าน writer ของ SQLite production mode ถ้าเปิดไว้)
+            run_serialized(save_survey)
             
             messages.success(request, 'ขอบคุณสำหรับความคิดเห็นและการประเมินของท่าน!')
             return redirect('teacher_dashboard')
@@ -168,43 +176,9 @@ def export_surveys_excel(request):
     """
     Exports all detailed survey results to an Excel file.
     """
-    workbook = openpyxl.Workbook()
-    worksheet = workbook.active
-    worksheet.title = 'Survey Results'
-
-    columns = ['ผู้ใช้งาน', 'โรงเรียน', 'กลุ่มสาระฯ', 'ระดับการสอน', 'ประสบการณ์', 'เวลาใช้งาน', 'วันที่ส่ง']
-    for category, questions in SURVEY_QUESTIONS.items():
-        for code, text in questions:
-            columns.append(f'คะแนน {code}')
-    columns.extend(['สิ่งที่ชื่นชอบ', 'สิ่งที่ควรปรับปรุง', 'ข้อเสนอแนะอื่นๆ'])
-
-    for col_num, column_title in enumerate(columns, 1):
-        cell = worksheet.cell(row=1, column=col_num)
-        cell.value = column_title
-        cell.font = Font(bold=True)
-        worksheet.column_dimensions[get_column_letter(col_num)].width = 20
-
     responses = SurveyResponse.objects.prefetch_related('ratings').select_related('user').all().order_by('-submitted_at')
-    for row_num, response in enumerate(responses, 2):
-        ratings_map = {rating.question_code: rating.rating for rating in response.ratings.all()}
-        
-        row_data = [
-            response.user.username if response.user else "N/A",
-            response.school_name, response.learning_area,
-            response.teaching_level, response.teaching_experience,
-            response.usage_duration, response.submitted_at.strftime('%Y-%m-%d %H:%M'),
-        ]
-        
-        for category, questions in SURVEY_QUESTIONS.items():
-            for code, text in questions:
-                row_data.append(ratings_map.get(code, ''))
-
-        row_data.extend([
-            response.suggestion_likes, response.suggestion_improvements, response.suggestion_future,
-        ])
-        
-        for col_num, cell_value in enumerate(row_data, 1):
-            worksheet.cell(row=row_num, column=col_num).value = cell_value
+    from .excel import survey_results_workbook  # openpyxl โหลดเมื่อส่งออกจริงเท่านั้น
+    workbook = survey_results_workbook(responses)
 
     response = HttpResponse(
         content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
@@ -216,17 +190,26 @@ def export_surveys_excel(request):
 @user_passes_test(is_admin)
 def usage_log_view(request):
     """
-    Displays a filterable and paginated list of user activities.
+    Displays a filterable list of user activities.
+    Uses keyset (cursor) pagination over (action_time, id) and an estimated
+    total, so the page opens in constant time however large the log grows.
     """
     log_list = UsageLog.objects.select_related('user').all().order_by('-action_time')
     log_filter = LogFilter(request.GET, queryset=log_list)
-    paginator = Paginator(log_filter.qs, 50)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = KeysetPaginator(log_filter.qs, USAGE_LOG_PAGE_SIZE)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
+
+    estimated_count, estimate_capped = estimate_usage_log_count(log_filter)
+    filter_params = request.GET.copy()
+    filter_params.pop('cursor', None)
 
     context = {
         'filter': log_filter,
         'page_obj': page_obj,
+        'estimated_count': estimated_count,
+        'estimate_capped': estimate_capped,
+        'estimated_pages': max(page_obj.number, -(-estimated_count // USAGE_LOG_PAGE_SIZE)),
+        'filter_query': filter_params.urlencode(),
     }
     return render(request, 'admin/usage_log.html', context)
 
@@ -235,28 +218,18 @@ def usage_log_view(request):
 def export_logs_excel(request):
     """
     Exports the filtered usage log data to an Excel file.
+    Rows are streamed from the database in chunks into a write-only workbook,
+    so memory stays flat even for very large log tables.
     """
-    log_list = UsageLog.objects.select_related('user').all().order_by('-action_time')
+    log_list = UsageLog.objects.all().order_by('-action_time')
     log_filter = LogFilter(request.GET, queryset=log_list)
-    filtered_logs = log_filter.qs
-
-    workbook = openpyxl.Workbook()
-    worksheet = workbook.active
-    worksheet.title = 'Usage Logs'
-    columns = ['ผู้ใช้งาน', 'Role', 'กิจกรรม', 'Path', 'IP Address', 'เวลา']
-    for col_num, column_title in enumerate(columns, 1):
-        cell = worksheet.cell(row=1, column=col_num)
-        cell.value = column_title
-        cell.font = Font(bold=True)
-        worksheet.column_dimensions[get_column_letter(col_num)].width = 25
-
-    for row_num, log in enumerate(filtered_logs, 2):
-        worksheet.cell(row=row_num, column=1).value = log.user.username if log.user else "N/A"
-        worksheet.cell(row=row_num, column=2).value = log.user.get_role_display() if log.user else "N/A"
-        worksheet.cell(row=row_num, column=3).value = log.action
-        worksheet.cell(row=row_num, column=4).value = log.path
-        worksheet.cell(row=row_num, column=5).value = log.ip_address or "-"
-        worksheet.cell(row=row_num, column=6).value = log.action_time.strftime('%Y-%m-%d %H:%M:%S')
+    filtered_logs = log_filter.qs.values_list(
+        'user__username', 'user__role', 'action', 'path', 'ip_address', 'action_time'
+    )
+    role_labels = dict(CustomUser.Role.choices)
+
+    from .excel import usage_logs_workbook  # openpyxl โหลดเมื่อส่งออกจริงเท่านั้น
+    workbook = usage_logs_workbook(filtered_logs.iterator(chunk_size=2000), role_labels)
 
     response = HttpResponse(
         content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
@@ -273,8 +246,8 @@ def clear_logs_view(request):
     """
     # ถ้าเป็นการกดปุ่ม "ยืนยันการลบ" (POST request)
     if request.method == 'POST':
-        # ลบข้อมูล Log ทั้งหมดโดยไม่มีเงื่อนไข
-        count, _ = UsageLog.objects.all().delete()
+        # สรุปรายวัน (rollup) วันที่ยังค้างก่อน แล้วลบข้อมูล Log ทั้งหมดทีละชุด (batch) เพื่อไม่ให้ล็อกตารางนานเกินไป
+        count = clear_all_usage_logs()
         
         # สร้างข้อความแจ้งเตือน
         messages.success(request, f'ข้อมูล Log ทั้งหมดจำนวน {count} รายการ ถูกลบเรียบร้อยแล้ว')
@@ -284,4 +257,41 @@ def clear_logs_view(request):
 
     # ถ้าเป็นการเข้ามาครั้งแรก (GET request) ให้แสดงหน้ายืนยัน
     # เราไม่จำเป็นต้องส่ง 'form' เข้าไปใน context อีกแล้ว
-    return render(request, 'admin/log_clear_confirm.html')
\ No newline at end of file
+    return render(request, 'admin/log_clear_confirm.html')
+
+@user_passes_test(is_admin)
+def download_profile(request, pk, kind):
+    """
+    Downloads the stored cProfile dump (kind='prof') or the collapsed
+    stack file for flame graphs (kind='stacks') of a ProfileRecord.
+    """
+    record = get_object_or_404(ProfileRecord, pk=pk)
+    file_field = {'prof': record.profile_file, 'stacks': record.stacks_file}.get(kind)
+    if not file_field:
+        raise Http404("ไม่พบไฟล์ profile ที่ต้องการ")
+    return FileResponse(file_field.open('rb'), as_attachment=True, filename=file_field.name.rsplit('/', 1)[-1])
+
+@user_passes_test(is_admin)
+def cache_stats_view(request):
+    """
+    Hit rates of the cached page fragments (core.fragment_cache) and, when
+    enabled, the database connection pool of the worker serving the page.
+    A POST resets the fragment counters, e.g. before measuring a change.
+    """
+    if request.method == 'POST':
+        reset_fragment_stats()
+        messages.success(request, 'รีเซ็ตสถิติการใช้ cache เรียบร้อยแล้ว')
+        return redirect('feedback:cache_stats')
+
+    stats = fragment_stats()
+    hits = sum(row['hits'] for row in stats)
+    total = sum(row['total'] for row in stats)
+    context = {
+        'stats': stats,
+        'total_hits': hits,
+        'total_requests': total,
+        'overall_hit_rate': round(hits * 100 / total, 1) if total else None,
+        'pool_stats': pool_stats(),
+        'fragment_cache_enabled': settings.FRAGMENT_CACHE,
+    }
+    return render(request, 'admin/cache_stats.html', context)
@@ -0,0 +1,37 @@
+from django.contrib import admin
+from .models import GradingSession, StudentResult, ItemResult, QuestionStatistics, ChoiceStatistics
+
+@admin.register(GradingSession)
+class GradingSessionAdmin(admin.ModelAdmin):
+    """
+    Admin view for GradingSession with read-only per-item results inline.
+    """
+    class ItemResultInline(admin.TabularInline):
+        model = ItemResult
+        extra = 0
+        can_delete = False
+        readonly_fields = ('position', 'question', 'answered_count', 'correct_count', 'p_value', 'discrimination', 'point_biserial', 'choice_counts')
+
+    list_display = ('name', 'exam', 'student_count', 'mean_score', 'max_score', 'created_by', 'created_at', 'analyzed_at')
+    list_filter = ('created_by',)
+    search_fields = ('name', 'exam__exam_name')
+    readonly_fields = ('question_ids', 'answer_key', 'choice_ids', 'student_count', 'mean_score', 'max_score', 'created_at', 'analyzed_at', 'group_size')
+    inlines = [ItemResultInline]
+
+@admin.register(StudentResult)
+class StudentResultAdmin(admin.ModelAdmin):
+    list_display = ('student_code', 'student_name', 'score', 'session')
+    search_fields = ('student_code', 'student_name', 'session__name')
+    list_select_related = ('session',)
+
+@admin.register(QuestionStatistics)
+class QuestionStatisticsAdmin(admin.ModelAdmin):
+    list_display = ('question', 'session_count', 'student_count', 'p_value', 'discrimination', 'point_biserial', 'updated_at')
+    list_select_related = ('question',)
+    search_fields = ('question__question_text',)
+
+@admin.register(ChoiceStatistics)
+class ChoiceStatisticsAdmin(admin.ModelAdmin):
+    list_display = ('choice', 'selected_count', 'student_count', 'selection_rate', 'discrimination', 'updated_at')
+    list_select_related = ('choice',)
+    search_fields = ('choice__choice_text',)
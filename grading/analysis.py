@@ -0,0 +1,270 @@
+"""
+Classical item analysis over graded answer sheets.
+
+Each GradingSession is analyzed once, as a whole (students x items) matrix:
+p-value, upper/lower 27% discrimination, corrected point-biserial and
+per-choice picks of the upper and lower groups. The per-session numbers are
+kept on ItemResult and folded into the running QuestionStatistics /
+ChoiceStatistics, from which ``Question.difficulty_level`` is written back.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.lazy import lazy_import
+from core.lookup_cache import invalidate_question_counts
+from exam_management.models import Choice, Question
+from .engine import decode_responses, tally_choices
+from .models import GradingSession, StudentResult, ItemResult, QuestionStatistics, ChoiceStatistics
+
+np = lazy_import('numpy')  # โหลดเมื่อเริ่มคำนวณจริง ไม่ใช่ตอน import view
+
+GROUP_FRACTION = 0.27
+
+# ==============================================================================
+# Vectorized Statistics
+# ==============================================================================
+
+@dataclass
+class ItemAnalysis:
+    p_values: np.ndarray          # (n_items,), NaN for non-MCQ items
+    discrimination: np.ndarray    # (n_items,), NaN when it cannot be computed
+    point_biserial: np.ndarray    # (n_items,), NaN when it cannot be computed
+    upper_counts: np.ndarray      # (n_items, max_choices)
+    lower_counts: np.ndarray      # (n_items, max_choices)
+    group_size: int
+
+
+def analyze_matrix(responses, key, max_choices):
+    """
+    Computes the item statistics of one response matrix at once.
+
+    The upper and lower groups are the top and bottom 27% of students by
+    total score (ties at the cut are broken by row order). The point-biserial
+    correlates each item with the total score *without* that item, so an item
+    does not correlate with itself.
+    """
+    n_students, n_items = responses.shape
+    gradable = key >= 0
+    correct = ((responses == key[np.newaxis, :]) & gradable[np.newaxis, :]).astype(np.float32)
+    totals = correct.sum(axis=1, dtype=np.float64)
+    p_values = correct.mean(axis=0, dtype=np.float64)
+
+    group_size = max(1, int(round(n_students * GROUP_FRACTION)))
+    order = np.argsort(totals, kind='stable')
+    lower, upper = order[:group_size], order[-group_size:]
+    discrimination = correct[upper].mean(axis=0, dtype=np.float64) - correct[lower].mean(axis=0, dtype=np.float64)
+
+    rest = totals[:, np.newaxis] - correct
+    item_dev = correct - p_values
+    rest_dev = rest - rest.mean(axis=0)
+    covariance = (item_dev * rest_dev).mean(axis=0, dtype=np.float64)
+    spread = item_dev.std(axis=0, dtype=np.float64) * rest_dev.std(axis=0, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        point_biserial = np.where(spread > 0, covariance / spread, np.nan)
+
+    if n_students < 2:
+        discrimination[:] = np.nan
+        point_biserial[:] = np.nan
+    p_values[~gradable] = np.nan
+    discrimination[~gradable] = np.nan
+    point_biserial[~gradable] = np.nan
+
+    return ItemAnalysis(
+        p_values=p_values,
+        discrimination=discrimination,
+        point_biserial=point_biserial,
+        upper_counts=tally_choices(responses[upper], max_choices),
+        lower_counts=tally_choices(responses[lower], max_choices),
+        group_size=group_size,
+    )
+
+
+def _or_none(value):
+    return None if np.isnan(value) else float(value)
+
+# ==============================================================================
+# Running Statistics
+# ==============================================================================
+
+def _session_choice_ids(session):
+    """Choice ids per item; older sessions without a snapshot use the current choices."""
+    if session.choice_ids:
+        return session.choice_ids
+    by_question = {}
+    for choice_id, question_id in Choice.objects.filter(question_id__in=session.question_ids).order_by('id').values_list('id', 'question_id'):
+        by_question.setdefault(question_id, []).append(choice_id)
+    return [by_question.get(question_id, []) for question_id in session.question_ids]
+
+
+def _fold_session(session, items, sign):
+    """
+    Adds (sign=1) or removes (sign=-1) one analyzed session's ItemResults
+    to/from the running statistics. Returns the ids of the touched questions.
+    """
+    n_students = session.student_count
+    now = timezone.now()
+    gradable = [item for item in items if item.question_id and item.p_value is not None]
+    question_ids = [item.question_id for item in gradable]
+
+    existing = {s.question_id: s for s in QuestionStatistics.objects.select_for_update().filter(question_id__in=question_ids)}
+    new_stats = []
+    for item in gradable:
+        stats = existing.get(item.question_id)
+        if stats is None:
+            stats = QuestionStatistics(question_id=item.question_id)
+            new_stats.append(stats)
+        stats.updated_at = now
+        stats.session_count += sign
+        stats.student_count += sign * n_students
+        stats.correct_count += sign * item.correct_count
+        if item.discrimination is not None:
+            stats.discrimination_sum += sign * item.discrimination * n_students
+            stats.discrimination_weight += sign * n_students
+        if item.point_biserial is not None:
+            stats.point_biserial_sum += sign * item.point_biserial * n_students
+            stats.point_biserial_weight += sign * n_students
+    QuestionStatistics.objects.bulk_update(
+        [stats for stats in existing.values()],
+        ['session_count', 'student_count', 'correct_count', 'discrimination_sum',
+         'discrimination_weight', 'point_biserial_sum', 'point_biserial_weight', 'updated_at'],
+        batch_size=1000,
+    )
+    if sign > 0:
+        QuestionStatistics.objects.bulk_create(new_stats, batch_size=1000)
+
+    # --- Distractor statistics per Choice ---
+    choice_ids = _session_choice_ids(session)
+    picks = {}
+    for item in gradable:
+        ids = choice_ids[item.position - 1] if item.position <= len(choice_ids) else []
+        for index, choice_id in enumerate(ids):
+            picks[choice_id] = (
+                item.choice_counts[index] if index < len(item.choice_counts) else 0,
+                item.upper_choice_counts[index] if index < len(item.upper_choice_counts) else 0,
+                item.lower_choice_counts[index] if index < len(item.lower_choice_counts) else 0,
+            )
+    live_choices = set(Choice.objects.filter(id__in=picks).values_list('id', flat=True))
+    existing = {s.choice_id: s for s in ChoiceStatistics.objects.select_for_update().filter(choice_id__in=live_choices)}
+    new_stats = []
+    for choice_id in live_choices:
+        stats = existing.get(choice_id)
+        if stats is None:
+            stats = ChoiceStatistics(choice_id=choice_id)
+            new_stats.append(stats)
+        stats.updated_at = now
+        selected, upper_selected, lower_selected = picks[choice_id]
+        stats.selected_count += sign * selected
+        stats.student_count += sign * n_students
+        stats.upper_selected += sign * upper_selected
+        stats.upper_count += sign * session.group_size
+        stats.lower_selected += sign * lower_selected
+        stats.lower_count += sign * session.group_size
+    ChoiceStatistics.objects.bulk_update(
+        [stats for stats in existing.values()],
+        ['selected_count', 'student_count', 'upper_selected', 'upper_count', 'lower_selected', 'lower_count', 'updated_at'],
+        batch_size=1000,
+    )
+    if sign > 0:
+        ChoiceStatistics.objects.bulk_create(new_stats, batch_size=1000)
+    return question_ids
+
+
+def update_question_difficulty(question_ids):
+    """
+    Writes the observed p-value back to ``Question.difficulty_level`` for the
+    given questions, once enough students have answered them
+    (``settings.ITEM_ANALYSIS_MIN_STUDENTS``). Returns the number updated.
+    """
+    stats = list(QuestionStatistics.objects.filter(
+        question_id__in=question_ids, student_count__gte=settings.ITEM_ANALYSIS_MIN_STUDENTS,
+    ).values_list('question_id', 'correct_count', 'student_count', 'question__created_by_id'))
+    questions = [
+        Question(id=question_id, difficulty_level=round(correct / students, 2))
+        for question_id, correct, students, _ in stats
+    ]
+    Question.objects.bulk_update(questions, ['difficulty_level'], batch_size=1000)
+    # bulk_update ไม่ส่ง signal: ล้าง cache จำนวนข้อสอบตามระดับความยากของครูเจ้าของข้อสอบเอง
+    invalidate_question_counts(teacher_id for _, _, _, teacher_id in stats)
+    return len(questions)
+
+# ==============================================================================
+# Pipeline
+# ==============================================================================
+
+def analyze_session(session):
+    """
+    Analyzes one not-yet-analyzed GradingSession and folds it into the running
+    statistics. Returns False when another process already analyzed it.
+    """
+    with transaction.atomic():
+        session = GradingSession.objects.select_for_update().filter(pk=session.pk, analyzed_at__isnull=True).first()
+        if session is None:
+            return False
+
+        encoded = list(StudentResult.objects.filter(session=session).values_list('responses', flat=True).iterator(chunk_size=5000))
+        key = np.array(session.answer_key, dtype=np.int16)
+        items = list(session.item_results.all())
+        if encoded and len(key):
+            responses = decode_responses(encoded, len(key))
+            max_choices = max([len(item.choice_counts) for item in items] or [1])
+            result = analyze_matrix(responses, key, max_choices)
+            for item in items:
+                index = item.position - 1
+                item.discrimination = _or_none(result.discrimination[index])
+                item.point_biserial = _or_none(result.point_biserial[index])
+                item.upper_choice_counts = result.upper_counts[index].tolist()
+                item.lower_choice_counts = result.lower_counts[index].tolist()
+            ItemResult.objects.bulk_update(
+                items, ['discrimination', 'point_biserial', 'upper_choice_counts', 'lower_choice_counts'], batch_size=1000,
+            )
+            session.group_size = result.group_size
+
+        question_ids = _fold_session(session, items, sign=1)
+        session.analyzed_at = timezone.now()
+        session.save(update_fields=['analyzed_at', 'group_size'])
+        update_question_difficulty(question_ids)
+    return True
+
+
+def unanalyze_session(session):
+    """
+    Takes an analyzed session back out of the running statistics (used before
+    deleting it) and re-derives the difficulty of the affected questions.
+    """
+    with transaction.atomic():
+        session = GradingSession.objects.select_for_update().filter(pk=session.pk, analyzed_at__isnull=False).first()
+        if session is None:
+            return False
+        question_ids = _fold_session(session, list(session.item_results.all()), sign=-1)
+        session.analyzed_at = None
+        session.save(update_fields=['analyzed_at'])
+        update_question_difficulty(question_ids)
+    return True
+
+
+def analyze_pending_sessions(limit=None):
+    """
+    Incremental run: analyzes every session that has not been analyzed yet,
+    oldest first, one transaction per session. Returns the number analyzed.
+    """
+    pending = GradingSession.objects.filter(analyzed_at__isnull=True).order_by('created_at', 'pk')
+    if limit:
+        pending = pending[:limit]
+    analyzed = 0
+    for session in pending.only('pk'):
+        analyzed += analyze_session(session)
+    return analyzed
+
+
+def rebuild_statistics():
+    """Discards the running statistics and re-analyzes every session from scratch."""
+    with transaction.atomic():
+        QuestionStatistics.objects.all().delete()
+        ChoiceStatistics.objects.all().delete()
+        GradingSession.objects.update(analyzed_at=None)
+    return analyze_pending_sessions()
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import csv
+import io
+from dataclasses import dataclass
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from core.lazy import lazy_import
+from exam_management.models import Question
+from exam_management.snapshots import get_exam_snapshot
+from exam_management.utils import THAI_CHOICE_CHARS
+from .models import GradingSession, StudentResult, ItemResult
+
+np = lazy_import('numpy')  # โหลดเมื่อเริ่มคำนวณจริง ไม่ใช่ตอน import view
+
+BLANK = -1
+# รหัสคำตอบที่รับได้: A, B, C..., ก, ข, ค..., หรือ 1, 2, 3... (เริ่มที่ 1)
+_ANSWER_CODES = {}
+for _index in range(26):
+    _ANSWER_CODES[chr(ord('A') + _index)] = _index
+    _ANSWER_CODES[chr(ord('a') + _index)] = _index
+    _ANSWER_CODES[str(_index + 1)] = _index
+for _index, _char in enumerate(THAI_CHOICE_CHARS):
+    _ANSWER_CODES[_char] = _index
+
+# ==============================================================================
+# Answer Key
+# ==============================================================================
+
+@dataclass
+class AnswerKey:
+    question_ids: list
+    key: np.ndarray          # shape (n_items,), correct choice index or BLANK for non-MCQ items
+    choice_counts: list      # number of choices per item
+    choice_ids: list         # Choice ids per item, in bubble order
+
+    @property
+    def gradable(self):
+        return self.key >= 0
+
+
+def build_answer_key(exam):
+    """
+    Returns the AnswerKey of the exam's published snapshot, i.e. of exactly
+    what was printed on the question paper and answer sheet.
+    """
+    return answer_key_from_snapshot(get_exam_snapshot(exam))
+
+
+def answer_key_from_snapshot(content):
+    questions = content['questions']
+    return AnswerKey(
+        question_ids=[q['id'] for q in questions],
+        key=np.array([q['key'] for q in questions], dtype=np.int16).reshape(len(questions)),
+        choice_counts=[len(q['choices']) for q in questions],
+        choice_ids=[[c['id'] for c in q['choices']] for q in questions],
+    )
+
+# ==============================================================================
+# Response Parsing
+# ==============================================================================
+
+def _read_rows(uploaded_file):
+    name = uploaded_file.name.lower()
+    if name.endswith('.xlsx'):
+        import openpyxl
+        workbook = openpyxl.load_workbook(uploaded_file, read_only=True, data_only=True)
+        for row in workbook.active.iter_rows(values_only=True):
+            yield ['' if value is None else str(value).strip() for value in row]
+        workbook.close()
+    else:
+        text = io.StringIO(uploaded_file.read().decode('utf-8-sig'))
+        for row in csv.reader(text):
+            yield [value.strip() for value in row]
+
+
+def parse_responses(uploaded_file, n_items):
+    """
+    Parses an uploaded CSV/XLSX of student responses.
+
+    Expected layout (header row required):
+        student_code, student_name, 1, 2, 3, ..., n
+    Each answer cell may be A/B/C..., ก/ข/ค... or 1/2/3...; empty or
+    unrecognised cells count as blank. Returns (codes, names, matrix) where
+    ``matrix`` is an int16 array of shape (n_students, n_items).
+    """
+    rows = _read_rows(uploaded_file)
+    header = next(rows, None)
+    if not header or len(header) < 3:
+        raise ValidationError('ไฟล์ต้องมีแถวหัวตาราง: รหัสนักเรียน, ชื่อ, และคำตอบข้อ 1 ถึงข้อสุดท้าย')
+
+    codes, names, answers = [], [], []
+    seen = set()
+    for line_number, row in enumerate(rows, 2):
+        if not row or not row[0]:
+            continue
+        code = row[0]
+        if code in seen:
+            raise ValidationError(f'รหัสนักเรียน "{code}" ซ้ำกัน (บรรทัดที่ {line_number})')
+        seen.add(code)
+        codes.append(code)
+        names.append(row[1] if len(row) > 1 else '')
+        cells = row[2:2 + n_items]
+        answers.append([_ANSWER_CODES.get(cell, BLANK) for cell in cells] + [BLANK] * (n_items - len(cells)))
+
+    if not codes:
+        raise ValidationError('ไม่พบข้อมูลคำตอบของนักเรียนในไฟล์')
+    return codes, names, np.array(answers, dtype=np.int16).reshape(len(codes), n_items)
+
+# ==============================================================================
+# Vectorized Scoring
+# ==============================================================================
+
+@dataclass
+class ScoreResult:
+    scores: np.ndarray          # (n_students,)
+    correct: np.ndarray         # (n_students, n_items) bool
+    item_correct: np.ndarray    # (n_items,)
+    item_answered: np.ndarray   # (n_items,)
+    choice_counts: np.ndarray   # (n_items, max_choices)
+
+
+def score_matrix(responses, key, max_choices=None):
+    """
+    Scores a whole class at once: compares the (students x items) response
+    matrix with the key row by broadcasting. Non-MCQ items (key = BLANK)
+    never count as correct.
+    """
+    gradable = key >= 0
+    correct = (responses == key[np.newaxis, :]) & gradable[np.newaxis, :]
+    answered = responses >= 0
+
+    if max_choices is None:
+        max_choices = int(max(responses.max(initial=BLANK), key.max(initial=BLANK))) + 1
+
+    return ScoreResult(
+        scores=correct.sum(axis=1),
+        correct=correct,
+        item_correct=correct.sum(axis=0),
+        item_answered=answered.sum(axis=0),
+        choice_counts=tally_choices(responses, max_choices),
+    )
+
+
+def tally_choices(responses, max_choices):
+    """
+    Counts how many students picked each choice of each item with a single
+    bincount. Returns an array of shape (n_items, max_choices).
+    """
+    n_items = responses.shape[1]
+    max_choices = max(max_choices, 1)
+    item_index = np.broadcast_to(np.arange(n_items), responses.shape)
+    valid = (responses >= 0) & (responses < max_choices)
+    flat = item_index[valid] * max_choices + responses[valid]
+    return np.bincount(flat, minlength=n_items * max_choices).reshape(n_items, max_choices)
+
+
+def encode_responses(responses):
+    """Encodes each row of the matrix as a compact string ('A' = choice 0, '-' = blank)."""
+    chars = np.where(responses >= 0, responses + ord('A'), ord('-')).astype(np.uint8)
+    return [row.tobytes().decode('ascii') for row in chars]
+
+
+def decode_responses(encoded, n_items=None):
+    """Inverse of encode_responses: list of strings -> int16 matrix."""
+    if not encoded:
+        return np.empty((0, n_items or 0), dtype=np.int16)
+    raw = np.frombuffer(''.join(encoded).encode('ascii'), dtype=np.uint8).reshape(len(encoded), -1)
+    return np.where(raw == ord('-'), BLANK, raw.astype(np.int16) - ord('A')).astype(np.int16)
+
+# ==============================================================================
+# Pipeline
+# ==============================================================================
+
+def grade_upload(exam, name, uploaded_file, user):
+    """
+    Full pipeline: answer key -> parse -> vectorized scoring -> bulk insert
+    of per-student and per-item results. Returns the new GradingSession.
+    """
+    answer_key = build_answer_key(exam)
+    if not answer_key.gradable.any():
+        raise ValidationError('ชุดข้อสอบนี้ไม่มีข้อปรนัยที่มีเฉลย จึงไม่สามารถตรวจอัตโนมัติได้')
+
+    codes, names, responses = parse_responses(uploaded_file, len(answer_key.question_ids))
+    uploaded_file.seek(0)
+    return save_grading_session(exam, name, user, answer_key, codes, names, responses, uploaded_file)
+
+
+def save_grading_session(exam, name, user, answer_key, codes, names, responses, source_file=None):
+    """
+    Scores an already-built response matrix against ``answer_key`` and stores
+    the GradingSession with its per-student and per-item results in bulk.
+    """
+    result = score_matrix(responses, answer_key.key, max(answer_key.choice_counts, default=0) or None)
+    n_students = len(codes)
+    # คำถามที่ถูกลบไปแล้วหลังออกข้อสอบยังคงมีผลรายข้อ แต่ไม่ผูกกับ Question
+    live_questions = set(Question.objects.filter(id__in=answer_key.question_ids).values_list('id', flat=True))
+
+    with transaction.atomic():
+        session = GradingSession(
+            exam=exam, name=name, created_by=user,
+            question_ids=answer_key.question_ids,
+            answer_key=answer_key.key.tolist(),
+            choice_ids=answer_key.choice_ids,
+            student_count=n_students,
+            mean_score=float(result.scores.mean()) if n_students else 0,
+            max_score=int(answer_key.gradable.sum()),
+        )
+        if source_file is not None:
+            session.source_file.save(source_file.name, source_file, save=False)
+        session.save()
+
+        StudentResult.objects.bulk_create([
+            StudentResult(session=session, student_code=code, student_name=student_name, responses=encoded, score=int(score))
+            for code, student_name, encoded, score in zip(codes, names, encode_responses(responses), result.scores)
+        ], batch_size=1000)
+        ItemResult.objects.bulk_create([
+            ItemResult(
+                session=session, question_id=question_id if question_id in live_questions else None, position=position + 1,
+                answered_count=int(result.item_answered[position]),
+                correct_count=int(result.item_correct[position]),
+                choice_counts=result.choice_counts[position].tolist(),
+                p_value=float(result.item_correct[position]) / n_students if answer_key.key[position] >= 0 and n_students else None,
+            )
+            for position, question_id in enumerate(answer_key.question_ids)
+        ], batch_size=1000)
+    return session
@@ -0,0 +1,18 @@
+from django import forms
+from django.core.validators import FileExtensionValidator
+
+class GradingUploadForm(forms.Form):
+    """
+    Upload form for a batch of student responses (CSV or Excel).
+    """
+    name = forms.CharField(
+        label="ชื่อรอบการตรวจ / ห้องเรียน",
+        max_length=255,
+        widget=forms.TextInput(attrs={'class': 'w-full p-2 border border-gray-300 rounded-md', 'placeholder': 'เช่น ม.2/1 สอบกลางภาค'})
+    )
+    responses_file = forms.FileField(
+        label="ไฟล์คำตอบนักเรียน (.csv หรือ .xlsx)",
+        validators=[FileExtensionValidator(allowed_extensions=['csv', 'xlsx'])],
+        help_text="คอลัมน์: รหัสนักเรียน, ชื่อ, ข้อ 1, ข้อ 2, ... (คำตอบเป็น ก/ข/ค, A/B/C หรือ 1/2/3)",
+        widget=forms.ClearableFileInput(attrs={'class': 'w-full'})
+    )
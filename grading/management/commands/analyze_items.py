@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from grading.analysis import analyze_pending_sessions, rebuild_statistics
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs item analysis (p-value, discrimination, point-biserial, distractors) on grading '
+        'sessions that have not been analyzed yet and writes Question.difficulty_level back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help='Analyze at most this many pending sessions.')
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='Discard the running statistics and re-analyze every session from scratch.',
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            analyzed = rebuild_statistics()
+        else:
+            analyzed = analyze_pending_sessions(options['limit'])
+        self.stdout.write(self.style.SUCCESS(f'Analyzed {analyzed} grading session(s).'))
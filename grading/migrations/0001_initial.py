@@ -0,0 +1,69 @@
+# Generated by Django 5.0.6 on 2026-10-19 14:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('exam_management', '0002_question_image_alter_question_question_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradingSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, verbose_name='ชื่อรอบการตรวจ / ห้องเรียน')),
+                ('source_file', models.FileField(blank=True, upload_to='grading_uploads/%Y/%m/', verbose_name='ไฟล์คำตอบที่อัปโหลด')),
+                ('question_ids', models.JSONField(default=list)),
+                ('answer_key', models.JSONField(default=list, help_text='ดัชนีตัวเลือกที่ถูกต้องของแต่ละข้อ (-1 = ไม่ใช่ข้อปรนัย)')),
+                ('student_count', models.PositiveIntegerField(default=0)),
+                ('mean_score', models.FloatField(default=0)),
+                ('max_score', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grading_sessions', to='exam_management.exam', verbose_name='ชุดข้อสอบ')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ItemResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('answered_count', models.PositiveIntegerField(default=0)),
+                ('correct_count', models.PositiveIntegerField(default=0)),
+                ('choice_counts', models.JSONField(default=list)),
+                ('p_value', models.FloatField(blank=True, help_text='สัดส่วนผู้ตอบถูกต่อผู้เข้าสอบทั้งหมด', null=True)),
+                ('question', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='item_results', to='exam_management.question')),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='item_results', to='grading.gradingsession')),
+            ],
+            options={
+                'ordering': ['session', 'position'],
+                'unique_together': {('session', 'position')},
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('student_code', models.CharField(max_length=50, verbose_name='รหัสนักเรียน')),
+                ('student_name', models.CharField(blank=True, max_length=255, verbose_name='ชื่อนักเรียน')),
+                ('responses', models.TextField()),
+                ('score', models.PositiveIntegerField(default=0)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_results', to='grading.gradingsession')),
+            ],
+            options={
+                'ordering': ['session', 'student_code'],
+                'unique_together': {('session', 'student_code')},
+            },
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.0.6 on 2026-10-19 14:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exam_management', '0002_question_image_alter_question_question_type'),
+        ('grading', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gradingsession',
+            name='analyzed_at',
+            field=models.DateTimeField(blank=True, help_text='เวลาที่นำผลรอบนี้ไปรวมในสถิติข้อสอบ (ว่าง = ยังไม่วิเคราะห์)', null=True),
+        ),
+        migrations.AddField(
+            model_name='gradingsession',
+            name='choice_ids',
+            field=models.JSONField(default=list, help_text='รหัสตัวเลือก (Choice) ของแต่ละข้อตามลำดับบนกระดาษคำตอบ'),
+        ),
+        migrations.AddField(
+            model_name='gradingsession',
+            name='group_size',
+            field=models.PositiveIntegerField(default=0, help_text='จำนวนนักเรียนในกลุ่มสูง/กลุ่มต่ำ (27%)'),
+        ),
+        migrations.AddField(
+            model_name='itemresult',
+            name='discrimination',
+            field=models.FloatField(blank=True, help_text='อำนาจจำแนก (กลุ่มสูง 27% - กลุ่มต่ำ 27%)', null=True),
+        ),
+        migrations.AddField(
+            model_name='itemresult',
+            name='lower_choice_counts',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name='itemresult',
+            name='point_biserial',
+            field=models.FloatField(blank=True, help_text='สหสัมพันธ์พอยต์ไบซีเรียลกับคะแนนรวม (ไม่รวมข้อนี้)', null=True),
+        ),
+        migrations.AddField(
+            model_name='itemresult',
+            name='upper_choice_counts',
+            field=models.JSONField(default=list),
+        ),
+        migrations.CreateModel(
+            name='ChoiceStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('selected_count', models.PositiveIntegerField(default=0)),
+                ('student_count', models.PositiveIntegerField(default=0)),
+                ('upper_selected', models.PositiveIntegerField(default=0)),
+                ('upper_count', models.PositiveIntegerField(default=0)),
+                ('lower_selected', models.PositiveIntegerField(default=0)),
+                ('lower_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('choice', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='statistics', to='exam_management.choice')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QuestionStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_count', models.PositiveIntegerField(default=0)),
+                ('student_count', models.PositiveIntegerField(default=0)),
+                ('correct_count', models.PositiveIntegerField(default=0)),
+                ('discrimination_sum', models.FloatField(default=0)),
+                ('discrimination_weight', models.PositiveIntegerField(default=0)),
+                ('point_biserial_sum', models.FloatField(default=0)),
+                ('point_biserial_weight', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='statistics', to='exam_management.question')),
+            ],
+        ),
+    ]
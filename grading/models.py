@@ -0,0 +1,133 @@
+from django.db import models
+from accounts.models import CustomUser
+from exam_management.models import Exam, Question, Choice
+
+class GradingSession(models.Model):
+    """
+    One batch of answer sheets scored against an Exam's answer key
+    (usually one class or one upload of scanner output).
+    The key and question order are copied in, so results stay reproducible
+    even if the exam is edited later.
+    """
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE, related_name='grading_sessions', verbose_name="ชุดข้อสอบ")
+    name = models.CharField(max_length=255, verbose_name="ชื่อรอบการตรวจ / ห้องเรียน")
+    source_file = models.FileField(upload_to='grading_uploads/%Y/%m/', blank=True, verbose_name="ไฟล์คำตอบที่อัปโหลด")
+    question_ids = models.JSONField(default=list)
+    answer_key = models.JSONField(default=list, help_text="ดัชนีตัวเลือกที่ถูกต้องของแต่ละข้อ (-1 = ไม่ใช่ข้อปรนัย)")
+    choice_ids = models.JSONField(default=list, help_text="รหัสตัวเลือก (Choice) ของแต่ละข้อตามลำดับบนกระดาษคำตอบ")
+    student_count = models.PositiveIntegerField(default=0)
+    mean_score = models.FloatField(default=0)
+    max_score = models.PositiveIntegerField(default=0)
+    created_by = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+    analyzed_at = models.DateTimeField(null=True, blank=True, help_text="เวลาที่นำผลรอบนี้ไปรวมในสถิติข้อสอบ (ว่าง = ยังไม่วิเคราะห์)")
+    group_size = models.PositiveIntegerField(default=0, help_text="จำนวนนักเรียนในกลุ่มสูง/กลุ่มต่ำ (27%)")
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.name} - {self.exam.exam_name}"
+
+class StudentResult(models.Model):
+    """
+    Score of one student in a GradingSession.
+    ``responses`` stores one character per item: 'A' = first choice,
+    'B' = second choice, ... and '-' = blank / unreadable.
+    """
+    session = models.ForeignKey(GradingSession, on_delete=models.CASCADE, related_name='student_results')
+    student_code = models.CharField(max_length=50, verbose_name="รหัสนักเรียน")
+    student_name = models.CharField(max_length=255, blank=True, verbose_name="ชื่อนักเรียน")
+    responses = models.TextField()
+    score = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('session', 'student_code')
+        ordering = ['session', 'student_code']
+
+    def __str__(self):
+        return f"{self.student_code}: {self.score}"
+
+class ItemResult(models.Model):
+    """
+    Per-item statistics of a GradingSession: how many students answered,
+    how many were correct and how often each choice was picked.
+    """
+    session = models.ForeignKey(GradingSession, on_delete=models.CASCADE, related_name='item_results')
+    question = models.ForeignKey(Question, on_delete=models.SET_NULL, null=True, blank=True, related_name='item_results')
+    position = models.PositiveIntegerField()
+    answered_count = models.PositiveIntegerField(default=0)
+    correct_count = models.PositiveIntegerField(default=0)
+    choice_counts = models.JSONField(default=list)
+    p_value = models.FloatField(null=True, blank=True, help_text="สัดส่วนผู้ตอบถูกต่อผู้เข้าสอบทั้งหมด")
+    discrimination = models.FloatField(null=True, blank=True, help_text="อำนาจจำแนก (กลุ่มสูง 27% - กลุ่มต่ำ 27%)")
+    point_biserial = models.FloatField(null=True, blank=True, help_text="สหสัมพันธ์พอยต์ไบซีเรียลกับคะแนนรวม (ไม่รวมข้อนี้)")
+    upper_choice_counts = models.JSONField(default=list)
+    lower_choice_counts = models.JSONField(default=list)
+
+    class Meta:
+        unique_together = ('session', 'position')
+        ordering = ['session', 'position']
+
+    def __str__(self):
+        return f"Item {self.position} ({self.correct_count}/{self.answered_count})"
+
+class QuestionStatistics(models.Model):
+    """
+    Running item statistics of a Question over every analyzed GradingSession.
+    Everything is stored as sums (discrimination and point-biserial weighted
+    by each session's student count), so a session can be folded in, or
+    taken out again, without re-reading the other sessions.
+    """
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, related_name='statistics')
+    session_count = models.PositiveIntegerField(default=0)
+    student_count = models.PositiveIntegerField(default=0)
+    correct_count = models.PositiveIntegerField(default=0)
+    discrimination_sum = models.FloatField(default=0)
+    discrimination_weight = models.PositiveIntegerField(default=0)
+    point_biserial_sum = models.FloatField(default=0)
+    point_biserial_weight = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def p_value(self):
+        return self.correct_count / self.student_count if self.student_count else None
+
+    @property
+    def discrimination(self):
+        return self.discrimination_sum / self.discrimination_weight if self.discrimination_weight else None
+
+    @property
+    def point_biserial(self):
+        return self.point_biserial_sum / self.point_biserial_weight if self.point_biserial_weight else None
+
+    def __str__(self):
+        return f"Stats of question {self.question_id} (n={self.student_count})"
+
+class ChoiceStatistics(models.Model):
+    """
+    Running distractor statistics of a Choice: how often it was picked overall
+    and by the upper and lower 27% groups.
+    """
+    choice = models.OneToOneField(Choice, on_delete=models.CASCADE, related_name='statistics')
+    selected_count = models.PositiveIntegerField(default=0)
+    student_count = models.PositiveIntegerField(default=0)
+    upper_selected = models.PositiveIntegerField(default=0)
+    upper_count = models.PositiveIntegerField(default=0)
+    lower_selected = models.PositiveIntegerField(default=0)
+    lower_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def selection_rate(self):
+        return self.selected_count / self.student_count if self.student_count else None
+
+    @property
+    def discrimination(self):
+        """Upper minus lower selection rate; should be negative for a working distractor."""
+        if not self.upper_count or not self.lower_count:
+            return None
+        return self.upper_selected / self.upper_count - self.lower_selected / self.lower_count
+
+    def __str__(self):
+        return f"Stats of choice {self.choice_id} ({self.selected_count}/{self.student_count})"
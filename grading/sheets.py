@@ -0,0 +1,78 @@
+import io
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfgen import canvas
+
+from exam_management.pdf_export import register_thai_fonts
+from exam_management.utils import THAI_CHOICE_CHARS
+
+BUBBLE_RADIUS = 2.6 * mm
+BUBBLE_GAP = 7.5 * mm
+ROW_HEIGHT = 7.5 * mm
+ROWS_PER_COLUMN = 30
+COLUMNS_PER_PAGE = 3
+
+
+def _choice_label(index, choice_format):
+    if choice_format == 'eng':
+        return chr(ord('A') + index)
+    return THAI_CHOICE_CHARS[index] if index < len(THAI_CHOICE_CHARS) else '?'
+
+
+def generate_answer_sheet(exam, answer_key, choice_format='thai', show_key=False):
+    """
+    Generates an OMR-style answer sheet PDF (A4) for an exam: a header with
+    name/code boxes and one row of bubbles per item, laid out in columns.
+    With ``show_key=True`` the correct bubbles are filled in, which gives the
+    teacher a transparent overlay / reference key for hand or scanner checking.
+    """
+    buffer = io.BytesIO()
+    p = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    fonts_ok = register_thai_fonts()
+    font = 'ThaiFont' if fonts_ok else 'Helvetica'
+    bold_font = 'ThaiFont-Bold' if fonts_ok else 'Helvetica-Bold'
+    n_items = len(answer_key.question_ids)
+    max_choices = max([count for count in answer_key.choice_counts if count] or [4])
+    column_width = (width - 30 * mm) / COLUMNS_PER_PAGE
+    items_per_page = ROWS_PER_COLUMN * COLUMNS_PER_PAGE
+
+    def draw_header(page_number):
+        p.setFont(bold_font, 18)
+        title = "เฉลยกระดาษคำตอบ" if show_key else "กระดาษคำตอบ"
+        p.drawString(15 * mm, height - 18 * mm, f"{title}: {exam.exam_name}")
+        p.setFont(font, 13)
+        p.drawString(15 * mm, height - 26 * mm, f"รายวิชา: {exam.course}")
+        p.drawRightString(width - 15 * mm, height - 18 * mm, f"หน้า {page_number}")
+        p.drawString(15 * mm, height - 36 * mm, "ชื่อ-นามสกุล ................................................................")
+        p.drawString(width / 2 + 10 * mm, height - 36 * mm, "รหัสนักเรียน ..............................")
+        p.line(15 * mm, height - 41 * mm, width - 15 * mm, height - 41 * mm)
+
+    for start in range(0, max(n_items, 1), items_per_page):
+        draw_header(start // items_per_page + 1)
+        for offset in range(min(items_per_page, n_items - start)):
+            position = start + offset
+            column, row = divmod(offset, ROWS_PER_COLUMN)
+            x = 15 * mm + column * column_width
+            y = height - 50 * mm - row * ROW_HEIGHT
+            p.setFont(font, 12)
+            p.drawRightString(x + 8 * mm, y - 1.5 * mm, f"{position + 1}.")
+
+            n_choices = answer_key.choice_counts[position]
+            if not n_choices:
+                # ข้ออัตนัย: เว้นบรรทัดให้เขียนคำตอบแทนวงกลม
+                p.line(x + 11 * mm, y - 2 * mm, x + 11 * mm + max_choices * BUBBLE_GAP, y - 2 * mm)
+                continue
+            for index in range(n_choices):
+                cx = x + 14 * mm + index * BUBBLE_GAP
+                filled = show_key and answer_key.key[position] == index
+                p.circle(cx, y, BUBBLE_RADIUS, stroke=1, fill=1 if filled else 0)
+                if not filled:
+                    p.setFont(font, 9)
+                    p.drawCentredString(cx, y - 1.2 * mm, _choice_label(index, choice_format))
+        p.showPage()
+
+    p.save()
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,145 @@
+import io
+
+import numpy as np
+import openpyxl
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase
+
+from accounts.models import CustomUser
+from core.models import Course, GradeLevel, LearningArea, LearningUnit, SubjectTemplate
+from exam_management.models import Choice, Exam, Question, ShortAnswer
+from .analysis import analyze_session
+from .engine import BLANK, build_answer_key, parse_responses, save_grading_session, score_matrix
+from .models import QuestionStatistics
+
+# คำตอบของนักเรียน 4 คน 3 ข้อ (ข้อ 3 เป็นอัตนัย): ตัวอักษรไทย อังกฤษ และตัวเลข
+ROWS = [
+    ['รหัส', 'ชื่อ', '1', '2', '3'],
+    ['001', 'สมชาย', 'A', 'C', '?'],
+    ['002', 'สมหญิง', 'ข', 'ค', ''],
+    ['', '', '', '', ''],
+    ['003', 'Somsak', 'ก', '', ''],
+    ['004', 'Malee', '1', '4'],
+]
+# A/ก/1 = ตัวเลือกแรก (0), ข = 1, C/ค = 2, 4 = 3; ช่องว่างและรหัสที่ไม่รู้จัก = BLANK
+EXPECTED_RESPONSES = [
+    [0, 2, BLANK],
+    [1, 2, BLANK],
+    [0, BLANK, BLANK],
+    [0, 3, BLANK],
+]
+KEY = [0, 2, BLANK]
+
+
+def csv_upload(rows, name='responses.csv'):
+    text = '\n'.join(','.join(row) for row in rows)
+    return SimpleUploadedFile(name, text.encode('utf-8-sig'))
+
+
+def xlsx_upload(rows, name='responses.xlsx'):
+    workbook = openpyxl.Workbook()
+    for row in rows:
+        # ตัวเลขเก็บเป็นตัวเลขจริงแบบที่ Excel บันทึก ไม่ใช่ข้อความ
+        workbook.active.append([int(cell) if cell.isdigit() and len(cell) == 1 else cell or None for cell in row])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+class ParseResponsesTests(SimpleTestCase):
+    def assertParsed(self, upload):
+        codes, names, matrix = parse_responses(upload, 3)
+        self.assertEqual(codes, ['001', '002', '003', '004'])
+        self.assertEqual(names, ['สมชาย', 'สมหญิง', 'Somsak', 'Malee'])
+        self.assertEqual(matrix.dtype, np.int16)
+        self.assertEqual(matrix.tolist(), EXPECTED_RESPONSES)
+
+    def test_csv(self):
+        self.assertParsed(csv_upload(ROWS))
+
+    def test_xlsx(self):
+        self.assertParsed(xlsx_upload(ROWS))
+
+    def test_duplicate_student_codes_are_rejected(self):
+        rows = ROWS + [['002', 'ซ้ำ', 'A', 'A', '']]
+        for upload in (csv_upload(rows), xlsx_upload(rows)):
+            with self.assertRaisesMessage(ValidationError, '"002" ซ้ำกัน (บรรทัดที่ 7)'):
+                parse_responses(upload, 3)
+
+    def test_file_without_students_is_rejected(self):
+        with self.assertRaises(ValidationError):
+            parse_responses(csv_upload(ROWS[:1]), 3)
+
+
+class ScoreMatrixTests(SimpleTestCase):
+    def test_scores_match_hand_computed_matrix(self):
+        result = score_matrix(np.array(EXPECTED_RESPONSES, dtype=np.int16), np.array(KEY, dtype=np.int16), 4)
+        self.assertEqual(result.correct.astype(int).tolist(), [[1, 1, 0], [0, 1, 0], [1, 0, 0], [1, 0, 0]])
+        self.assertEqual(result.scores.tolist(), [2, 1, 1, 1])
+        self.assertEqual(result.item_correct.tolist(), [3, 2, 0])
+        self.assertEqual(result.item_answered.tolist(), [4, 3, 0])
+        self.assertEqual(result.choice_counts.tolist(), [[3, 1, 0, 0], [0, 0, 2, 1], [0, 0, 0, 0]])
+
+
+class GradingPipelineTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        teacher = CustomUser.objects.create_user('teacher', password='secret-pass', role='TEACHER', is_approved=True)
+        area = LearningArea.objects.create(area_name='คณิตศาสตร์')
+        course = Course.objects.create(
+            course_code='ค21101',
+            subject_template=SubjectTemplate.objects.create(subject_name='คณิตศาสตร์พื้นฐาน', learning_area=area),
+            grade_level=GradeLevel.objects.create(grade_name='ม.1'),
+            teacher=teacher,
+        )
+        unit = LearningUnit.objects.create(course=course, unit_name='หน่วยที่ 1')
+        cls.questions = []
+        for text, correct, difficulty in [('ข้อ 1', 0, 0.5), ('ข้อ 2', 2, 0.9)]:
+            question = Question.objects.create(
+                question_text=text, question_type='MCQ', difficulty_level=difficulty,
+                learning_unit=unit, created_by=teacher,
+            )
+            Choice.objects.bulk_create([
+                Choice(question=question, choice_text=f'ตัวเลือก {index + 1}', is_correct=index == correct)
+                for index in range(4)
+            ])
+            cls.questions.append(question)
+        short = Question.objects.create(
+            question_text='ข้อ 3', question_type='SHORT', learning_unit=unit, created_by=teacher,
+        )
+        ShortAnswer.objects.create(question=short, answer_text='42')
+        cls.questions.append(short)
+        cls.exam = Exam.objects.create(exam_name='สอบย่อย', course=course, created_by=teacher)
+        cls.exam.questions.set(cls.questions)
+        cls.teacher = teacher
+
+    def grade(self):
+        answer_key = build_answer_key(self.exam)
+        codes, names, responses = parse_responses(csv_upload(ROWS), len(answer_key.question_ids))
+        return save_grading_session(self.exam, 'ม.1/1', self.teacher, answer_key, codes, names, responses)
+
+    def test_session_stores_scores_and_item_results(self):
+        session = self.grade()
+        self.assertEqual(session.answer_key, KEY)
+        self.assertEqual((session.student_count, session.max_score, session.mean_score), (4, 2, 1.25))
+        self.assertEqual(
+            list(session.student_results.order_by('student_code').values_list('responses', 'score')),
+            [('AC-', 2), ('BC-', 1), ('A--', 1), ('AD-', 1)],
+        )
+        items = session.item_results.order_by('position')
+        self.assertEqual([item.p_value for item in items], [0.75, 0.5, None])
+        self.assertEqual([item.choice_counts for item in items][:2], [[3, 1, 0, 0], [0, 0, 2, 1]])
+
+    def test_analysis_writes_difficulty_back(self):
+        with self.settings(ITEM_ANALYSIS_MIN_STUDENTS=4):
+            self.assertTrue(analyze_session(self.grade()))
+        difficulty = dict(Question.objects.values_list('question_text', 'difficulty_level'))
+        self.assertEqual(difficulty, {'ข้อ 1': 0.75, 'ข้อ 2': 0.5, 'ข้อ 3': 0.5})
+        stats = QuestionStatistics.objects.get(question=self.questions[0])
+        self.assertEqual((stats.student_count, stats.correct_count, stats.session_count), (4, 3, 1))
+
+    def test_difficulty_waits_for_enough_students(self):
+        with self.settings(ITEM_ANALYSIS_MIN_STUDENTS=5):
+            analyze_session(self.grade())
+        self.assertEqual(Question.objects.get(pk=self.questions[1].pk).difficulty_level, 0.9)
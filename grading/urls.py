@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+app_name = 'grading'
+
+urlpatterns = [
+    path('exam/<int:exam_pk>/answer-sheet/', views.answer_sheet_pdf, name='answer_sheet'),
+    path('exam/<int:exam_pk>/grading/', views.grading_upload, name='upload'),
+    path('grading/<int:pk>/', views.grading_session_detail, name='session_detail'),
+    path('grading/<int:pk>/delete/', views.grading_session_delete, name='session_delete'),
+]
@@ -0,0 +1,101 @@
+from django.shortcuts import render, redirect, get_object_or_404
+from django.http import HttpResponse
+from django.contrib import messages
+from django.urls import reverse
+from django.core.exceptions import ValidationError
+
+from exam_management.models import Exam
+from exam_management.views import teacher_required
+from feedback.profiling import profile_block
+from .analysis import analyze_session, unanalyze_session
+from .engine import build_answer_key, grade_upload
+from .forms import GradingUploadForm
+from .models import GradingSession
+
+# ==============================================================================
+# Answer Sheets
+# ==============================================================================
+
+@teacher_required
+def answer_sheet_pdf(request, exam_pk):
+    """
+    Downloads the OMR-style answer sheet of an exam.
+    ``?key=1`` returns the same sheet with the correct bubbles filled in.
+    """
+    exam = get_object_or_404(Exam, pk=exam_pk, created_by=request.user)
+    choice_format = request.GET.get('format', 'thai')
+    show_key = request.GET.get('key') == '1'
+    from .sheets import generate_answer_sheet  # ReportLab โหลดเมื่อสร้างกระดาษคำตอบจริงเท่านั้น
+    pdf_buffer = generate_answer_sheet(exam, build_answer_key(exam), choice_format, show_key)
+
+    filename = f"{exam.exam_name}-{'answer-key' if show_key else 'answer-sheet'}.pdf"
+    response = HttpResponse(pdf_buffer, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+# ==============================================================================
+# Bulk Grading
+# ==============================================================================
+
+@teacher_required
+def grading_upload(request, exam_pk):
+    """
+    Uploads a CSV/XLSX of student responses and scores the whole batch.
+    Also lists the previous grading sessions of the exam.
+    """
+    exam = get_object_or_404(Exam, pk=exam_pk, created_by=request.user)
+    if request.method == 'POST':
+        form = GradingUploadForm(request.POST, request.FILES)
+        if form.is_valid():
+            try:
+                with profile_block(request, 'grade_upload'):
+                    session = grade_upload(exam, form.cleaned_data['name'], form.cleaned_data['responses_file'], request.user)
+                    analyze_session(session)
+            except ValidationError as exc:
+                form.add_error('responses_file', exc)
+            else:
+                messages.success(request, f'ตรวจคำตอบของนักเรียน {session.student_count} คนเรียบร้อยแล้ว')
+                return redirect('grading:session_detail', pk=session.pk)
+    else:
+        form = GradingUploadForm()
+
+    context = {
+        'exam': exam,
+        'form': form,
+        'sessions': exam.grading_sessions.all(),
+    }
+    return render(request, 'teacher/grading_upload.html', context)
+
+
+@teacher_required
+def grading_session_detail(request, pk):
+    """
+    Shows per-student scores and per-item statistics of one grading session.
+    """
+    session = get_object_or_404(
+        GradingSession.objects.select_related('exam', 'exam__course'),
+        pk=pk, exam__created_by=request.user,
+    )
+    context = {
+        'session': session,
+        'students': session.student_results.all(),
+        'items': session.item_results.all(),
+    }
+    return render(request, 'teacher/grading_session_detail.html', context)
+
+
+@teacher_required
+def grading_session_delete(request, pk):
+    session = get_object_or_404(GradingSession, pk=pk, exam__created_by=request.user)
+    if request.method == 'POST':
+        exam_pk = session.exam_id
+        unanalyze_session(session)
+        session.delete()
+        messages.success(request, 'ลบผลการตรวจสำเร็จ')
+        return redirect('grading:upload', exam_pk=exam_pk)
+    context = {
+        'object_name': session,
+        'title': 'ยืนยันการลบผลการตรวจ',
+        'cancel_url': reverse('grading:session_detail', args=[session.pk]),
+    }
+    return render(request, 'teacher/confirm_delete_base.html', context)
@@ -0,0 +1,17 @@
+from django.contrib import admin
+from .models import ExamSitting, ExamAttempt
+
+@admin.register(ExamSitting)
+class ExamSittingAdmin(admin.ModelAdmin):
+    list_display = ('title', 'exam', 'access_code', 'is_open', 'closes_at', 'created_by', 'created_at')
+    list_filter = ('is_open',)
+    search_fields = ('title', 'access_code', 'exam__exam_name')
+    readonly_fields = ('access_code', 'snapshot', 'grading_session', 'created_at')
+
+@admin.register(ExamAttempt)
+class ExamAttemptAdmin(admin.ModelAdmin):
+    list_display = ('student_code', 'student_name', 'sitting', 'started_at', 'submitted_at', 'score')
+    list_filter = ('sitting',)
+    search_fields = ('student_code', 'student_name')
+    list_select_related = ('sitting',)
+    readonly_fields = ('token', 'started_at', 'submitted_at', 'responses', 'score')
@@ -0,0 +1,202 @@
+"""
+Hot path of online exam delivery.
+
+Everything a student request needs is either a single indexed query or comes
+from the cache: the sitting (by access code), the rendered question list and
+the answer key are built once from the sitting's exam snapshot and shared by
+every student, so a whole grade starting at the same minute does not walk
+the question graph 1,000 times.
+"""
+import secrets
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from core.lazy import lazy_import
+from core.tenancy import current_database
+from exam_management.snapshots import get_exam_snapshot, load_snapshot, questions_for_display
+from exam_management.storage import image_url_period
+from grading.engine import BLANK, answer_key_from_snapshot, encode_responses, decode_responses, save_grading_session
+from .models import ExamSitting, ExamAttempt, AnswerEvent
+
+np = lazy_import('numpy')  # โหลดเมื่อเริ่มคำนวณจริง ไม่ใช่ตอน import view
+
+ACCESS_CODE_ALPHABET = 'ABCDEFGHJKLMNPQRSTUVWXYZ23456789'
+ACCESS_CODE_LENGTH = 6
+SITTING_CACHE_TIMEOUT = 300
+# เผื่อเวลาให้คำขอที่ส่งมาช้าเล็กน้อยหลังหมดเวลา (เครือข่ายช้า / autosave ครั้งสุดท้าย)
+SUBMIT_GRACE_SECONDS = 60
+
+# ==============================================================================
+# Sittings
+# ==============================================================================
+
+def generate_access_code():
+    while True:
+        code = ''.join(secrets.choice(ACCESS_CODE_ALPHABET) for _ in range(ACCESS_CODE_LENGTH))
+        if not ExamSitting.objects.filter(access_code=code).exists():
+            return code
+
+
+def create_sitting(exam, user, **fields):
+    """Opens a sitting on the exam's currently published snapshot."""
+    get_exam_snapshot(exam)
+    return ExamSitting.objects.create(
+        exam=exam, created_by=user, access_code=generate_access_code(), snapshot_id=exam.snapshot_id, **fields,
+    )
+
+# ==============================================================================
+# Cache
+# ==============================================================================
+
+def _sitting_key(code):
+    return f'online-exam:sitting:{code}'
+
+
+def _questions_key(snapshot_id):
+    # :2 — ส่วนที่ cache ไว้ก่อนหน้านี้ใช้ชื่อไฟล์รูปแทน URL
+    return f'online-exam:questions-html:2:{snapshot_id}'
+
+
+def get_sitting(code):
+    """
+    Returns the ExamSitting for an access code, cached for a few minutes.
+    ``forget_sitting`` drops the entry on changes.
+    """
+    code = code.upper()
+    sitting = cache.get(_sitting_key(code))
+    if sitting is None:
+        sitting = ExamSitting.objects.filter(access_code=code).first()
+        if sitting is None:
+            return None
+        cache.set(_sitting_key(code), sitting, SITTING_CACHE_TIMEOUT)
+    return sitting
+
+
+def forget_sitting(sitting):
+    cache.delete(_sitting_key(sitting.access_code))
+
+
+def get_questions_html(sitting):
+    """
+    The rendered question list of a sitting, without correct answers.
+    Snapshots never change, so the fragment is cached per snapshot and shared
+    by every student (and every sitting of that snapshot); only for one image
+    URL period, as the signed image URLs in it expire.
+    """
+    html = cache.get(_questions_key(sitting.snapshot_id))
+    if html is None:
+        content = load_snapshot(sitting.snapshot_id)
+        html = render_to_string('online_exam/_questions.html', {'questions': questions_for_display(content)})
+        cache.set(_questions_key(sitting.snapshot_id), html, image_url_period())
+    return html
+
+
+def get_answer_key(sitting):
+    """Compact, cached answer key of a sitting: ``[(correct index, choice count), ...]``."""
+    key = cache.get(f'online-exam:key:{sitting.snapshot_id}')
+    if key is None:
+        content = load_snapshot(sitting.snapshot_id)
+        key = [(q['key'], len(q['choices'])) for q in content['questions']]
+        cache.set(f'online-exam:key:{sitting.snapshot_id}', key, None)
+    return key
+
+# ==============================================================================
+# Attempts (append-only answers)
+# ==============================================================================
+
+def attempt_deadline(sitting, attempt):
+    deadlines = []
+    if sitting.duration_minutes:
+        deadlines.append(attempt.started_at + timedelta(minutes=sitting.duration_minutes))
+    if sitting.closes_at:
+        deadlines.append(sitting.closes_at)
+    return min(deadlines) if deadlines else None
+
+
+def can_still_answer(sitting, attempt):
+    if attempt.submitted_at or not sitting.is_open:
+        return False
+    deadline = attempt_deadline(sitting, attempt)
+    return deadline is None or timezone.now() <= deadline + timedelta(seconds=SUBMIT_GRACE_SECONDS)
+
+
+def clean_answers(raw_answers, n_items):
+    """Keeps only ``{position: value}`` pairs for existing positions (1-based), as strings."""
+    answers = {}
+    for position, value in raw_answers.items():
+        try:
+            position = int(position)
+        except (TypeError, ValueError):
+            continue
+        if 1 <= position <= n_items:
+            answers[position] = str(value)[:500]
+    return answers
+
+
+def append_answers(attempt, answers):
+    """Autosave: one multi-row INSERT, no reads and no updates."""
+    AnswerEvent.objects.bulk_create([
+        AnswerEvent(attempt=attempt, position=position, value=value) for position, value in answers.items()
+    ])
+    return len(answers)
+
+
+def latest_answers(attempt):
+    """``{position: value}`` of the latest event per position."""
+    answers = {}
+    for position, value in attempt.answer_events.order_by('id').values_list('position', 'value'):
+        answers[position] = value
+    return answers
+
+
+def submit_attempt(sitting, attempt, final_answers):
+    """
+    Appends the final answers, then scores the attempt from the cached key and
+    marks it submitted with a single conditional UPDATE, so a double submit
+    cannot overwrite the first one. Returns the score, or None if the attempt
+    was already submitted.
+    """
+    key = get_answer_key(sitting)
+    with transaction.atomic(using=current_database()):
+        append_answers(attempt, final_answers)
+        answers = latest_answers(attempt)
+        row = np.full(len(key), BLANK, dtype=np.int16)
+        for position, (_, n_choices) in enumerate(key, 1):
+            value = answers.get(position, '')
+            if value.isdigit() and int(value) < n_choices:
+                row[position - 1] = int(value)
+        correct_key = np.array([correct for correct, _ in key], dtype=np.int16)
+        score = int(((row == correct_key) & (correct_key >= 0)).sum())
+        updated = ExamAttempt.objects.filter(pk=attempt.pk, submitted_at__isnull=True).update(
+            submitted_at=timezone.now(), responses=encode_responses(row[np.newaxis, :])[0], score=score,
+        )
+        if not updated:
+            transaction.set_rollback(True, using=current_database())
+    return score if updated else None
+
+# ==============================================================================
+# Results
+# ==============================================================================
+
+def grade_sitting(sitting, user):
+    """
+    Turns the submitted attempts of a sitting into a GradingSession (scored
+    against the sitting's frozen key), so online and paper sittings share the
+    same result pages and item analysis.
+    """
+    answer_key = answer_key_from_snapshot(load_snapshot(sitting.snapshot_id))
+    attempts = list(
+        sitting.attempts.filter(submitted_at__isnull=False).values_list('student_code', 'student_name', 'responses')
+    )
+    codes = [code for code, _, _ in attempts]
+    names = [name for _, name, _ in attempts]
+    responses = decode_responses([encoded for _, _, encoded in attempts], len(answer_key.question_ids))
+    with transaction.atomic(using=current_database()):
+        session = save_grading_session(sitting.exam, sitting.title, user, answer_key, codes, names, responses)
+        ExamSitting.objects.filter(pk=sitting.pk).update(grading_session=session)
+    forget_sitting(sitting)
+    return session
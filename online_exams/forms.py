@@ -0,0 +1,37 @@
+from django import forms
+from .models import ExamSitting
+
+class ExamSittingForm(forms.ModelForm):
+    """
+    Form for opening an online sitting of an exam.
+    """
+    class Meta:
+        model = ExamSitting
+        fields = ['title', 'duration_minutes', 'closes_at']
+        widgets = {
+            'title': forms.TextInput(attrs={'class': 'w-full p-2 border border-gray-300 rounded-md', 'placeholder': 'เช่น ม.3 สอบกลางภาค (ออนไลน์)'}),
+            'duration_minutes': forms.NumberInput(attrs={'min': '1', 'class': 'w-full p-2 border border-gray-300 rounded-md'}),
+            'closes_at': forms.DateTimeInput(attrs={'type': 'datetime-local', 'class': 'w-full p-2 border border-gray-300 rounded-md'}, format='%Y-%m-%dT%H:%M'),
+        }
+        help_texts = {
+            'duration_minutes': 'เว้นว่างไว้หากไม่จำกัดเวลา',
+            'closes_at': 'เว้นว่างไว้หากต้องการปิดรอบสอบด้วยตนเอง',
+        }
+
+class StudentStartForm(forms.Form):
+    """
+    Identification form shown to students before they start an online exam.
+    """
+    student_code = forms.CharField(
+        label="รหัสนักเรียน",
+        max_length=50,
+        widget=forms.TextInput(attrs={'class': 'w-full p-2 border border-gray-300 rounded-md', 'autocomplete': 'off'})
+    )
+    student_name = forms.CharField(
+        label="ชื่อ-นามสกุล",
+        max_length=255,
+        widget=forms.TextInput(attrs={'class': 'w-full p-2 border border-gray-300 rounded-md'})
+    )
+
+    def clean_student_code(self):
+        return self.cleaned_data['student_code'].strip()
@@ -0,0 +1,70 @@
+# Generated by Django 5.0.6 on 2026-10-19 14:33
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('exam_management', '0002_question_image_alter_question_question_type'),
+        ('grading', '0002_item_analysis'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamSitting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255, verbose_name='ชื่อรอบสอบ')),
+                ('access_code', models.CharField(max_length=12, unique=True, verbose_name='รหัสเข้าสอบ')),
+                ('snapshot', models.JSONField(default=dict)),
+                ('duration_minutes', models.PositiveIntegerField(blank=True, null=True, verbose_name='เวลาทำข้อสอบ (นาที)')),
+                ('closes_at', models.DateTimeField(blank=True, null=True, verbose_name='ปิดรับคำตอบเมื่อ')),
+                ('is_open', models.BooleanField(default=True, verbose_name='เปิดให้เข้าสอบ')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sittings', to='exam_management.exam', verbose_name='ชุดข้อสอบ')),
+                ('grading_session', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='grading.gradingsession')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ExamAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('student_code', models.CharField(max_length=50, verbose_name='รหัสนักเรียน')),
+                ('student_name', models.CharField(max_length=255, verbose_name='ชื่อ-นามสกุล')),
+                ('token', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('submitted_at', models.DateTimeField(blank=True, null=True)),
+                ('responses', models.TextField(blank=True, help_text="คำตอบข้อปรนัย: 'A' = ตัวเลือกแรก ... '-' = ไม่ได้ตอบ")),
+                ('score', models.PositiveIntegerField(blank=True, null=True)),
+                ('sitting', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attempts', to='online_exams.examsitting')),
+            ],
+            options={
+                'ordering': ['sitting', 'student_code'],
+                'unique_together': {('sitting', 'student_code')},
+            },
+        ),
+        migrations.CreateModel(
+            name='AnswerEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('value', models.CharField(blank=True, max_length=500)),
+                ('saved_at', models.DateTimeField(auto_now_add=True)),
+                ('attempt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answer_events', to='online_exams.examattempt')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['attempt', 'position', 'id'], name='answerevent_latest_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+import hashlib
+import json
+import zlib
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Frozen copies of exam_management.snapshots.SNAPSHOT_FORMAT and encode_snapshot(),
+# so later changes to that module cannot change what this migration writes.
+SNAPSHOT_FORMAT = 1
+
+
+def encode_snapshot(content):
+    raw = json.dumps(content, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(raw).hexdigest(), zlib.compress(raw, 9), len(raw)
+
+
+def move_snapshots(apps, schema_editor):
+    """Stores each sitting's inline JSON snapshot as a content-addressed ExamSnapshot."""
+    ExamSitting = apps.get_model('online_exams', 'ExamSitting')
+    ExamSnapshot = apps.get_model('exam_management', 'ExamSnapshot')
+    db = schema_editor.connection.alias
+    for sitting in ExamSitting.objects.using(db):
+        content = dict(sitting.legacy_snapshot)
+        content['format'] = SNAPSHOT_FORMAT
+        for question in content.get('questions', []):
+            image = question.get('image', '')
+            # The inline snapshots stored image URLs; snapshots store storage names.
+            if image.startswith(settings.MEDIA_URL):
+                question['image'] = image[len(settings.MEDIA_URL):]
+            question.setdefault('explanation', '')
+        digest, blob, size = encode_snapshot(content)
+        snapshot, _ = ExamSnapshot.objects.using(db).get_or_create(digest=digest, defaults={'data': blob, 'size': size})
+        sitting.snapshot = snapshot
+        sitting.save(update_fields=['snapshot'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exam_management', '0003_exam_snapshots'),
+        ('online_exams', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='examsitting',
+            old_name='snapshot',
+            new_name='legacy_snapshot',
+        ),
+        migrations.AddField(
+            model_name='examsitting',
+            name='snapshot',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='sittings', to='exam_management.examsnapshot'),
+        ),
+        migrations.RunPython(move_snapshots, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='examsitting',
+            name='legacy_snapshot',
+        ),
+        migrations.AlterField(
+            model_name='examsitting',
+            name='snapshot',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='sittings', to='exam_management.examsnapshot'),
+        ),
+    ]
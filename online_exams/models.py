@@ -0,0 +1,78 @@
+import uuid
+
+from django.db import models
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from exam_management.models import Exam, ExamSnapshot
+
+class ExamSitting(models.Model):
+    """
+    One online sitting of an Exam. Students join with ``access_code``.
+    ``snapshot`` is the exam's published snapshot at the time the sitting was
+    created, so editing or republishing the exam later never changes what
+    students see or how they are scored.
+    """
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE, related_name='sittings', verbose_name="ชุดข้อสอบ")
+    title = models.CharField(max_length=255, verbose_name="ชื่อรอบสอบ")
+    access_code = models.CharField(max_length=12, unique=True, verbose_name="รหัสเข้าสอบ")
+    snapshot = models.ForeignKey(ExamSnapshot, on_delete=models.PROTECT, related_name='sittings')
+    duration_minutes = models.PositiveIntegerField(null=True, blank=True, verbose_name="เวลาทำข้อสอบ (นาที)")
+    closes_at = models.DateTimeField(null=True, blank=True, verbose_name="ปิดรับคำตอบเมื่อ")
+    is_open = models.BooleanField(default=True, verbose_name="เปิดให้เข้าสอบ")
+    grading_session = models.ForeignKey(
+        'grading.GradingSession', on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+    )
+    created_by = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.title} ({self.access_code})"
+
+    @property
+    def accepting_answers(self):
+        return self.is_open and (self.closes_at is None or timezone.now() < self.closes_at)
+
+class ExamAttempt(models.Model):
+    """
+    A student's attempt in an ExamSitting. Students do not have accounts; the
+    attempt is identified by ``token``, kept in a signed cookie.
+    ``responses`` and ``score`` are written once, on submission.
+    """
+    sitting = models.ForeignKey(ExamSitting, on_delete=models.CASCADE, related_name='attempts')
+    student_code = models.CharField(max_length=50, verbose_name="รหัสนักเรียน")
+    student_name = models.CharField(max_length=255, verbose_name="ชื่อ-นามสกุล")
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    started_at = models.DateTimeField(auto_now_add=True)
+    submitted_at = models.DateTimeField(null=True, blank=True)
+    responses = models.TextField(blank=True, help_text="คำตอบข้อปรนัย: 'A' = ตัวเลือกแรก ... '-' = ไม่ได้ตอบ")
+    score = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('sitting', 'student_code')
+        ordering = ['sitting', 'student_code']
+
+    def __str__(self):
+        return f"{self.student_code} - {self.sitting}"
+
+class AnswerEvent(models.Model):
+    """
+    Append-only answer log of an attempt: every autosave and the final submit
+    insert new rows and never update old ones. The latest event per
+    ``position`` is the student's answer.
+    """
+    attempt = models.ForeignKey(ExamAttempt, on_delete=models.CASCADE, related_name='answer_events')
+    position = models.PositiveIntegerField()
+    value = models.CharField(max_length=500, blank=True)
+    saved_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['attempt', 'position', 'id'], name='answerevent_latest_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.attempt_id}#{self.position}: {self.value}"
@@ -0,0 +1,19 @@
+from django.urls import path
+from . import views
+
+app_name = 'online_exams'
+
+urlpatterns = [
+    # Teacher
+    path('exam/<int:exam_pk>/sittings/', views.sitting_list, name='sitting_list'),
+    path('sittings/<int:pk>/', views.sitting_detail, name='sitting_detail'),
+    path('sittings/<int:pk>/toggle/', views.sitting_toggle, name='sitting_toggle'),
+    path('sittings/<int:pk>/grade/', views.sitting_grade, name='sitting_grade'),
+
+    # Student
+    path('take/<str:code>/', views.take_start, name='take_start'),
+    path('take/<str:code>/exam/', views.take_exam, name='take_exam'),
+    path('take/<str:code>/autosave/', views.take_autosave, name='take_autosave'),
+    path('take/<str:code>/submit/', views.take_submit, name='take_submit'),
+    path('take/<str:code>/done/', views.take_done, name='take_done'),
+]
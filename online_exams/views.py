@@ -0,0 +1,222 @@
+import json
+import uuid
+
+from django.contrib import messages
+from django.db import IntegrityError
+from django.db.models import Count, Q
+from django.http import Http404, JsonResponse
+from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+from django.views.decorators.http import require_POST
+
+from exam_management.models import Exam
+from exam_management.views import teacher_required
+from grading.analysis import analyze_session
+from .delivery import (
+    attempt_deadline, can_still_answer, clean_answers, append_answers, latest_answers, submit_attempt,
+    create_sitting, forget_sitting, get_sitting, get_questions_html, get_answer_key, grade_sitting,
+)
+from .forms import ExamSittingForm, StudentStartForm
+from .models import ExamSitting, ExamAttempt
+
+ATTEMPT_COOKIE = 'exam_attempt_{}'
+ATTEMPT_COOKIE_SALT = 'online-exam'
+ATTEMPT_COOKIE_MAX_AGE = 24 * 60 * 60
+
+# ==============================================================================
+# Teacher: Sittings
+# ==============================================================================
+
+@teacher_required
+def sitting_list(request, exam_pk):
+    """
+    Lists the online sittings of an exam and opens a new one.
+    The exam content is frozen into the sitting when it is created.
+    """
+    exam = get_object_or_404(Exam, pk=exam_pk, created_by=request.user)
+    if request.method == 'POST':
+        form = ExamSittingForm(request.POST)
+        if form.is_valid():
+            sitting = create_sitting(exam, request.user, **form.cleaned_data)
+            messages.success(request, f'เปิดรอบสอบออนไลน์แล้ว รหัสเข้าสอบ: {sitting.access_code}')
+            return redirect('online_exams:sitting_detail', pk=sitting.pk)
+    else:
+        form = ExamSittingForm()
+
+    sittings = exam.sittings.annotate(
+        attempt_count=Count('attempts'),
+        submitted_count=Count('attempts', filter=Q(attempts__submitted_at__isnull=False)),
+    )
+    context = {
+        'exam': exam,
+        'form': form,
+        'sittings': sittings,
+    }
+    return render(request, 'teacher/sitting_list.html', context)
+
+
+@teacher_required
+def sitting_detail(request, pk):
+    sitting = get_object_or_404(
+        ExamSitting.objects.select_related('exam', 'exam__course'),
+        pk=pk, created_by=request.user,
+    )
+    context = {
+        'sitting': sitting,
+        'attempts': sitting.attempts.all(),
+        'join_url': request.build_absolute_uri(reverse('online_exams:take_start', args=[sitting.access_code])),
+    }
+    return render(request, 'teacher/sitting_detail.html', context)
+
+
+@teacher_required
+@require_POST
+def sitting_toggle(request, pk):
+    sitting = get_object_or_404(ExamSitting, pk=pk, created_by=request.user)
+    sitting.is_open = not sitting.is_open
+    sitting.save(update_fields=['is_open'])
+    forget_sitting(sitting)
+    messages.success(request, 'เปิดรับคำตอบแล้ว' if sitting.is_open else 'ปิดรับคำตอบแล้ว')
+    return redirect('online_exams:sitting_detail', pk=pk)
+
+
+@teacher_required
+@require_POST
+def sitting_grade(request, pk):
+    """Sends the submitted attempts to the grading pages as a GradingSession."""
+    sitting = get_object_or_404(ExamSitting, pk=pk, created_by=request.user)
+    if not sitting.attempts.filter(submitted_at__isnull=False).exists():
+        messages.error(request, 'ยังไม่มีนักเรียนส่งคำตอบในรอบสอบนี้')
+        return redirect('online_exams:sitting_detail', pk=pk)
+    session = grade_sitting(sitting, request.user)
+    analyze_session(session)
+    messages.success(request, f'สรุปผลคะแนนของนักเรียน {session.student_count} คนเรียบร้อยแล้ว')
+    return redirect('grading:session_detail', pk=session.pk)
+
+# ==============================================================================
+# Student: Taking an Exam
+# ==============================================================================
+
+def _get_sitting_or_404(code):
+    sitting = get_sitting(code)
+    if sitting is None:
+        raise Http404('ไม่พบรอบสอบนี้')
+    return sitting
+
+
+def _current_attempt(request, sitting):
+    token = request.get_signed_cookie(ATTEMPT_COOKIE.format(sitting.pk), default=None, salt=ATTEMPT_COOKIE_SALT)
+    try:
+        token = uuid.UUID(token) if token else None
+    except ValueError:
+        return None
+    if token is None:
+        return None
+    return ExamAttempt.objects.filter(sitting_id=sitting.pk, token=token).only(
+        'id', 'token', 'started_at', 'submitted_at', 'student_code', 'student_name',
+    ).first()
+
+
+def take_start(request, code):
+    """
+    Entry page of an online exam: the student enters their code and name.
+    The attempt token is kept in a signed cookie (no session row per student).
+    """
+    sitting = _get_sitting_or_404(code)
+    attempt = _current_attempt(request, sitting)
+    if attempt is not None:
+        return redirect('online_exams:take_done' if attempt.submitted_at else 'online_exams:take_exam', code=sitting.access_code)
+
+    form = StudentStartForm(request.POST or None)
+    if request.method == 'POST' and sitting.accepting_answers and form.is_valid():
+        try:
+            attempt = ExamAttempt.objects.create(
+                sitting_id=sitting.pk,
+                student_code=form.cleaned_data['student_code'],
+                student_name=form.cleaned_data['student_name'],
+            )
+        except IntegrityError:
+            form.add_error('student_code', 'รหัสนักเรียนนี้เริ่มทำข้อสอบไปแล้ว กรุณาใช้เครื่องเดิมหรือแจ้งครูผู้คุมสอบ')
+        else:
+            response = redirect('online_exams:take_exam', code=sitting.access_code)
+            response.set_signed_cookie(
+                ATTEMPT_COOKIE.format(sitting.pk), str(attempt.token), salt=ATTEMPT_COOKIE_SALT,
+                max_age=ATTEMPT_COOKIE_MAX_AGE, httponly=True, samesite='Lax',
+            )
+            return response
+
+    context = {
+        'sitting': sitting,
+        'form': form,
+    }
+    return render(request, 'online_exam/start.html', context)
+
+
+def take_exam(request, code):
+    sitting = _get_sitting_or_404(code)
+    attempt = _current_attempt(request, sitting)
+    if attempt is None:
+        return redirect('online_exams:take_start', code=sitting.access_code)
+    if not can_still_answer(sitting, attempt):
+        return redirect('online_exams:take_done', code=sitting.access_code)
+
+    deadline = attempt_deadline(sitting, attempt)
+    context = {
+        'sitting': sitting,
+        'attempt': attempt,
+        'questions_html': mark_safe(get_questions_html(sitting)),
+        'saved_answers': {str(position): value for position, value in latest_answers(attempt).items()},
+        'deadline': deadline.isoformat() if deadline else '',
+    }
+    return render(request, 'online_exam/take.html', context)
+
+
+@require_POST
+def take_autosave(request, code):
+    """
+    Autosave endpoint: ``{"answers": {"<position>": "<value>", ...}}`` with only
+    the answers changed since the last save. Each call is a single INSERT.
+    """
+    sitting = _get_sitting_or_404(code)
+    attempt = _current_attempt(request, sitting)
+    if attempt is None or not can_still_answer(sitting, attempt):
+        return JsonResponse({'error': 'หมดเวลาหรือส่งคำตอบแล้ว'}, status=403)
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'error': 'invalid JSON'}, status=400)
+    if not isinstance(payload, dict) or not isinstance(payload.get('answers'), dict):
+        return JsonResponse({'error': 'invalid payload'}, status=400)
+
+    saved = append_answers(attempt, clean_answers(payload['answers'], len(get_answer_key(sitting))))
+    return JsonResponse({'saved': saved, 'saved_at': timezone.now().isoformat()})
+
+
+@require_POST
+def take_submit(request, code):
+    sitting = _get_sitting_or_404(code)
+    attempt = _current_attempt(request, sitting)
+    if attempt is None:
+        return redirect('online_exams:take_start', code=sitting.access_code)
+    if can_still_answer(sitting, attempt):
+        raw = {key[2:]: value for key, value in request.POST.items() if key.startswith('q_') and value != ''}
+        submit_attempt(sitting, attempt, clean_answers(raw, len(get_answer_key(sitting))))
+    else:
+        # หมดเวลาแล้ว: ปิดการทำข้อสอบด้วยคำตอบที่บันทึกอัตโนมัติไว้ล่าสุด
+        submit_attempt(sitting, attempt, {})
+    return redirect('online_exams:take_done', code=sitting.access_code)
+
+
+def take_done(request, code):
+    sitting = _get_sitting_or_404(code)
+    attempt = _current_attempt(request, sitting)
+    if attempt is None:
+        return redirect('online_exams:take_start', code=sitting.access_code)
+    if attempt.submitted_at is None:
+        if can_still_answer(sitting, attempt):
+            return redirect('online_exams:take_exam', code=sitting.access_code)
+        # หมดเวลาโดยยังไม่ได้กดส่ง: ใช้คำตอบที่บันทึกอัตโนมัติไว้เป็นคำตอบสุดท้าย
+        submit_attempt(sitting, attempt, {})
+    return render(request, 'online_exam/done.html', {'sitting': sitting, 'attempt': attempt})